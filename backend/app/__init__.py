@@ -1,21 +1,40 @@
 from flask import Flask
 from app.config import config
-from app.extensions import db, migrate, jwt, cors
+from app.extensions import db, migrate, jwt, cors, cache, limiter
 from app.routes.auth import auth_bp
 from app.routes.tasks import tasks_bp
 from app.routes.calendar import calendar_bp
 from app.routes.voice import voice_bp
+from app.cli import users_cli, sync_cli, stats_cli, tasks_cli
+from app.utils.json_provider import OrjsonProvider
+from app.utils.compression import init_compression
+from app.utils.uploads import SpoolingRequest
+from app.services.archive_service import ArchiveService
 
 def create_app(config_name='default'):
     app = Flask(__name__)
+    app.request_class = SpoolingRequest
     app.config.from_object(config[config_name])
 
+    if app.config.get('JSON_USE_ORJSON') and OrjsonProvider.available():
+        app.json = OrjsonProvider(app)
+
+    binds = app.config.get('SQLALCHEMY_BINDS') or {}
+    if 'replica' in binds and app.config.get('CACHE_BACKEND') != 'redis':
+        # Read-your-writes stickiness is kept in the cache: in a per-worker cache the
+        # user's next request, served by another worker, would read a lagging replica
+        print("DEBUG: REPLICA_DATABASE_URL requires CACHE_BACKEND=redis; all reads use the primary")
+        app.config['SQLALCHEMY_BINDS'] = {name: url for name, url in binds.items() if name != 'replica'}
+
     # Initialize extensions
     db.init_app(app)
     migrate.init_app(app, db)
     jwt.init_app(app)
     # Enable CORS for frontend URL
     cors.init_app(app, resources={r"/api/*": {"origins": "*"}})
+    cache.init_app(app)
+    limiter.init_app(app)
+    init_compression(app)
 
     # Register blueprints
     app.register_blueprint(auth_bp)
@@ -23,4 +42,13 @@ def create_app(config_name='default'):
     app.register_blueprint(calendar_bp)
     app.register_blueprint(voice_bp)
 
+    # CLI commands
+    app.cli.add_command(users_cli)
+    app.cli.add_command(sync_cli)
+    app.cli.add_command(stats_cli)
+    app.cli.add_command(tasks_cli)
+
+    # Background archiver, when ARCHIVE_INTERVAL is set
+    ArchiveService.start(app)
+
     return app
@@ -0,0 +1,130 @@
+import csv
+import json
+import os
+import click
+from flask.cli import AppGroup
+from app.extensions import db
+from app.models.user import User
+from app.services.password_service import PasswordService
+from app.services.sync_service import SyncService
+from app.services.stats_service import StatsService
+from app.services.ordering_service import OrderingService
+from app.services.archive_service import ArchiveService
+
+users_cli = AppGroup('users', help='User management commands.')
+sync_cli = AppGroup('sync', help='Delta sync maintenance.')
+stats_cli = AppGroup('stats', help='Task counter maintenance.')
+tasks_cli = AppGroup('tasks', help='Task ordering and archive maintenance.')
+
+def _read_rows(path, file_format):
+    """Yields dicts with name, email and password or password_hash."""
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        if file_format == 'csv':
+            for row in csv.DictReader(f):
+                yield row
+        else:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
+def _insert_batch(batch):
+    """Inserts one batch with a single executemany; returns (inserted, skipped)."""
+    emails = [row['email'] for row in batch]
+    existing = {
+        email for (email,) in db.session.query(User.email).filter(User.email.in_(emails))
+    }
+    batch = [row for row in batch if row['email'] not in existing]
+    if not batch:
+        return 0, len(emails)
+
+    plain = [row for row in batch if not row.get('password_hash')]
+    if plain:
+        hashes = PasswordService.hash_many([row['password'] for row in plain])
+        for row, pwhash in zip(plain, hashes):
+            row['password_hash'] = pwhash
+
+    db.session.execute(User.__table__.insert(), [
+        {"name": row['name'], "email": row['email'], "password_hash": row['password_hash']}
+        for row in batch
+    ])
+    db.session.commit()
+    return len(batch), len(emails) - len(batch)
+
+@users_cli.command('import')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'file_format', type=click.Choice(['csv', 'jsonl']), default=None,
+              help='Input format. Defaults to the file extension.')
+@click.option('--batch-size', default=500, show_default=True, help='Rows per INSERT.')
+def import_users(path, file_format, batch_size):
+    """
+    Bulk-provisions users from a CSV or JSONL file.
+
+    Each row needs name, email and either password or a pre-computed password_hash.
+    Emails that already exist (or repeat inside the file) are skipped.
+    """
+    if file_format is None:
+        file_format = 'jsonl' if os.path.splitext(path)[1].lower() in ('.jsonl', '.ndjson') else 'csv'
+
+    inserted = skipped = invalid = 0
+    seen = set()
+    batch = []
+    for row in _read_rows(path, file_format):
+        email = (row.get('email') or '').strip()
+        if not email or not row.get('name') or not (row.get('password') or row.get('password_hash')):
+            invalid += 1
+            continue
+        if email in seen:
+            skipped += 1
+            continue
+        seen.add(email)
+        batch.append({**row, "email": email})
+
+        if len(batch) >= batch_size:
+            done, dup = _insert_batch(batch)
+            inserted += done
+            skipped += dup
+            batch = []
+
+    if batch:
+        done, dup = _insert_batch(batch)
+        inserted += done
+        skipped += dup
+
+    click.echo(f"Imported {inserted} users ({skipped} duplicates skipped, {invalid} invalid rows).")
+
+@sync_cli.command('compact')
+@click.option('--days', default=30, show_default=True, help='Keep tombstones newer than this.')
+def compact_tombstones(days):
+    """
+    Deletes old task tombstones. Clients whose sync token predates the removed
+    tombstones get a full reset on their next sync.
+    """
+    removed = SyncService.compact_tombstones(older_than_days=days)
+    click.echo(f"Removed {removed} tombstones older than {days} days.")
+
+@stats_cli.command('reconcile')
+@click.option('--user-id', type=int, multiple=True, help='Only these users (repeatable). Defaults to all.')
+def reconcile_stats(user_id):
+    """Rebuilds the per-user task counters from the tasks table and reports drift."""
+    drifted = StatsService.reconcile(list(user_id) or None)
+    if drifted:
+        click.echo(f"Fixed counters for {len(drifted)} users: {', '.join(map(str, drifted))}.")
+    else:
+        click.echo("All counters were consistent.")
+
+@tasks_cli.command('rebalance')
+@click.option('--min-length', type=int, default=None,
+              help='Rebalance columns with keys longer than this. Defaults to ORDERING_MAX_KEY_LENGTH; 0 rebalances every column.')
+def rebalance_positions(min_length):
+    """Rewrites long Kanban ordering keys with short, evenly spaced ones, keeping the order."""
+    columns = OrderingService.rebalance_all(min_length)
+    click.echo(f"Rebalanced {len(columns)} columns.")
+
+@tasks_cli.command('archive')
+@click.option('--days', type=int, default=None, help='Archive completed tasks unchanged for this long. Defaults to ARCHIVE_AFTER_DAYS.')
+@click.option('--batch-size', type=int, default=None, help='Tasks moved per transaction. Defaults to ARCHIVE_BATCH_SIZE.')
+def archive_tasks(days, batch_size):
+    """Moves old completed tasks to tasks_archive. They stay readable with include_archived."""
+    archived = ArchiveService.archive(older_than_days=days, batch_size=batch_size)
+    click.echo(f"Archived {archived} completed tasks.")
@@ -4,8 +4,120 @@ from datetime import timedelta
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY', 'dev_key')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Optional read replica (needs CACHE_BACKEND=redis): read-only endpoints and voice listings query it, except
+    # for REPLICA_STICKY_SECONDS after the user's own writes or while it lags over REPLICA_MAX_LAG
+    REPLICA_DATABASE_URL = os.environ.get('REPLICA_DATABASE_URL')
+    SQLALCHEMY_BINDS = {'replica': REPLICA_DATABASE_URL} if REPLICA_DATABASE_URL else {}
+    REPLICA_STICKY_SECONDS = int(os.environ.get('REPLICA_STICKY_SECONDS', 5))
+    REPLICA_MAX_LAG = float(os.environ.get('REPLICA_MAX_LAG', 2))
+    REPLICA_LAG_CHECK_INTERVAL = 5
+    # Use orjson for JSON responses when it is installed
+    JSON_USE_ORJSON = os.environ.get('JSON_USE_ORJSON', '1') == '1'
+    # Shared cache: 'memory' (per worker) or 'redis' (any Redis-protocol server, shared by all workers)
+    CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'memory')
+    CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL', 'redis://localhost:6379/0')
+    CACHE_REDIS_TIMEOUT = 0.5
+    CACHE_KEY_PREFIX = os.environ.get('CACHE_KEY_PREFIX', 'ocastro')
+    CACHE_DEFAULT_TTL = 300
+    CACHE_MAX_ENTRIES = int(os.environ.get('CACHE_MAX_ENTRIES', 10000))
+    # How long concurrent misses wait for the one computing the value
+    CACHE_LOCK_TIMEOUT = 5
+    CALENDAR_CACHE_TTL = 300
+    # Idempotency-Key on POST /api/tasks and /api/voice/command: responses kept for IDEMPOTENCY_TTL;
+    # a retry waits up to IDEMPOTENCY_WAIT for the original, which may run for IDEMPOTENCY_LOCK_TIMEOUT
+    IDEMPOTENCY_TTL = int(os.environ.get('IDEMPOTENCY_TTL', 86400))
+    IDEMPOTENCY_WAIT = 30
+    IDEMPOTENCY_LOCK_TIMEOUT = 120
+    # Memory backend only: stored responses (which may carry TTS audio) get their own LRU
+    IDEMPOTENCY_CACHE_MAX_ENTRIES = int(os.environ.get('IDEMPOTENCY_CACHE_MAX_ENTRIES', 5000))
+    IDEMPOTENCY_CACHE_MAX_BYTES = int(os.environ.get('IDEMPOTENCY_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+    VOCABULARY_CACHE_TTL = 300
+    TTS_CACHE_TTL = int(os.environ.get('TTS_CACHE_TTL', 86400))
+    # Memory backend only: namespaces with their own LRU, capped by entries and/or bytes
+    TTS_CACHE_MAX_BYTES = int(os.environ.get('TTS_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+    CACHE_NAMESPACE_LIMITS = {
+        'tts': {'maxbytes': TTS_CACHE_MAX_BYTES},
+        'idempotency': {'maxsize': IDEMPOTENCY_CACHE_MAX_ENTRIES, 'maxbytes': IDEMPOTENCY_CACHE_MAX_BYTES},
+    }
+    # Kanban ordering: columns with a longer key get rekeyed after the commit (in a background thread)
+    ORDERING_MAX_KEY_LENGTH = int(os.environ.get('ORDERING_MAX_KEY_LENGTH', 12))
+    ORDERING_BACKGROUND_REBALANCE = os.environ.get('ORDERING_BACKGROUND_REBALANCE', '1') == '1'
+    # Completed tasks unchanged for ARCHIVE_AFTER_DAYS move to tasks_archive.
+    # ARCHIVE_INTERVAL (seconds) runs the archiver in the background; 0 = only `flask tasks archive`
+    ARCHIVE_AFTER_DAYS = int(os.environ.get('ARCHIVE_AFTER_DAYS', 90))
+    ARCHIVE_BATCH_SIZE = int(os.environ.get('ARCHIVE_BATCH_SIZE', 500))
+    ARCHIVE_INTERVAL = int(os.environ.get('ARCHIVE_INTERVAL', 0))
+    # Response compression (brotli is used when installed, gzip otherwise)
+    COMPRESS_ENABLED = os.environ.get('COMPRESS_ENABLED', '1') == '1'
+    COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 1024))
+    COMPRESS_LEVEL = 6
+    COMPRESS_BR_LEVEL = 4
+    # 0 = clients must revalidate with the ETag on every read
+    READ_CACHE_MAX_AGE = int(os.environ.get('READ_CACHE_MAX_AGE', 0))
+    # Voice uploads: kept in memory up to the spool size, rejected above the limits
+    UPLOAD_SPOOL_MAX_MEMORY = int(os.environ.get('UPLOAD_SPOOL_MAX_MEMORY', 2 * 1024 * 1024))
+    VOICE_MAX_UPLOAD_BYTES = int(os.environ.get('VOICE_MAX_UPLOAD_BYTES', 5 * 1024 * 1024))
+    VOICE_MAX_DURATION_MS = int(os.environ.get('VOICE_MAX_DURATION_MS', 60000))
+    # Per-user token buckets (requests per minute + burst); voice = POSTs to /api/voice.
+    # RATE_LIMIT_STORAGE: 'memory' (per worker) or 'redis' (CACHE_REDIS_URL, shared)
+    RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', '1') == '1'
+    RATE_LIMIT_STORAGE = os.environ.get('RATE_LIMIT_STORAGE', CACHE_BACKEND)
+    RATE_LIMIT_REST_PER_MINUTE = int(os.environ.get('RATE_LIMIT_REST_PER_MINUTE', 300))
+    RATE_LIMIT_REST_BURST = int(os.environ.get('RATE_LIMIT_REST_BURST', 60))
+    RATE_LIMIT_VOICE_PER_MINUTE = int(os.environ.get('RATE_LIMIT_VOICE_PER_MINUTE', 20))
+    RATE_LIMIT_VOICE_BURST = int(os.environ.get('RATE_LIMIT_VOICE_BURST', 5))
+    # Audio pipeline (STT/TTS) slots per process; extra requests queue briefly, then get 503
+    VOICE_MAX_CONCURRENCY = int(os.environ.get('VOICE_MAX_CONCURRENCY', 4))
+    VOICE_QUEUE_DEPTH = int(os.environ.get('VOICE_QUEUE_DEPTH', 8))
+    VOICE_QUEUE_WAIT = float(os.environ.get('VOICE_QUEUE_WAIT', 2.0))
+    VOICE_BUSY_RETRY_AFTER = 2
+    # Silence trimming before STT (RMS on 16-bit samples)
+    VOICE_VAD_ENABLED = os.environ.get('VOICE_VAD_ENABLED', '1') == '1'
+    VOICE_VAD_MIN_RMS = int(os.environ.get('VOICE_VAD_MIN_RMS', 300))
+    VOICE_VAD_PADDING_MS = 200
+    TRANSCRIPTION_CACHE_TTL = int(os.environ.get('TRANSCRIPTION_CACHE_TTL', 3600))
+    # Voice latency budget (seconds): the whole request, then STT and TTS (edge + gTTS) stages within it.
+    # With less than VOICE_TTS_MIN_BUDGET left the reply goes out as text only
+    VOICE_DEADLINE = float(os.environ.get('VOICE_DEADLINE', 12))
+    VOICE_STT_TIMEOUT = float(os.environ.get('VOICE_STT_TIMEOUT', 6))
+    VOICE_TTS_TIMEOUT = float(os.environ.get('VOICE_TTS_TIMEOUT', 4))
+    VOICE_TTS_MIN_BUDGET = 0.5
+    # External STT/TTS providers are skipped for CIRCUIT_COOLDOWN seconds after this many failures in a row
+    CIRCUIT_FAILURE_THRESHOLD = int(os.environ.get('CIRCUIT_FAILURE_THRESHOLD', 3))
+    CIRCUIT_COOLDOWN = int(os.environ.get('CIRCUIT_COOLDOWN', 30))
+    # Fallback intent classifier for unmatched utterances: '' (off), 'classifier', 'llm' or 'stub'
+    NLU_BACKEND = os.environ.get('NLU_BACKEND', '')
+    NLU_LLM_URL = os.environ.get('NLU_LLM_URL', 'http://localhost:11434/api/generate')
+    NLU_LLM_MODEL = os.environ.get('NLU_LLM_MODEL', 'qwen2.5:0.5b')
+    NLU_TIMEOUT = float(os.environ.get('NLU_TIMEOUT', 1.5))
+    NLU_MIN_CONFIDENCE = 0.6
+    NLU_WORKERS = 2
+    NLU_QUEUE_DEPTH = 4
+    NLU_CACHE_TTL = 3600
+    # Directory holding ffmpeg/ffprobe when they are not on PATH (e.g. a WinGet Links folder)
+    FFMPEG_DIR = os.environ.get('FFMPEG_DIR')
+    # Streaming transcription: 'google' (buffered, no partials), 'vosk' (offline) or 'stub'
+    VOICE_STREAM_BACKEND = os.environ.get('VOICE_STREAM_BACKEND', 'google')
+    VOICE_STREAM_FRAME_MS = 100
+    # Idle seconds before a session is dropped, and caps on open sessions (each buffers PCM)
+    VOICE_STREAM_SESSION_TTL = 30
+    VOICE_STREAM_MAX_SESSIONS = int(os.environ.get('VOICE_STREAM_MAX_SESSIONS', 64))
+    VOICE_STREAM_MAX_SESSIONS_PER_USER = int(os.environ.get('VOICE_STREAM_MAX_SESSIONS_PER_USER', 2))
+    VOSK_MODEL_PATH = os.environ.get('VOSK_MODEL_PATH')
+    VOICE_STREAM_STUB_TEXT = os.environ.get('VOICE_STREAM_STUB_TEXT', '')
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY', 'dev_jwt_key')
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=5)
+    # Embed name/email in the access token so /api/auth/me can skip the database
+    JWT_IDENTITY_CLAIMS = os.environ.get('JWT_IDENTITY_CLAIMS', '1') == '1'
+    USER_PROFILE_CACHE_TTL = int(os.environ.get('USER_PROFILE_CACHE_TTL', 60))
+    # Password hashing: 'scrypt' (cost = N) or 'pbkdf2' (cost = iterations).
+    # Stored hashes are upgraded on login whenever these change.
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt')
+    # Unset = the method's own default (scrypt N=32768, pbkdf2 600000 iterations)
+    PASSWORD_HASH_COST = int(os.environ['PASSWORD_HASH_COST']) if os.environ.get('PASSWORD_HASH_COST') else None
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 2))
+    PASSWORD_HASH_QUEUE_DEPTH = int(os.environ.get('PASSWORD_HASH_QUEUE_DEPTH', 8))
+    PASSWORD_HASH_TIMEOUT = int(os.environ.get('PASSWORD_HASH_TIMEOUT', 10))
 
 class DevelopmentConfig(Config):
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL', 'sqlite:///ocastro.db')
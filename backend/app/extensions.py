@@ -2,8 +2,14 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
+from app.utils.cache import Cache
+from app.utils.db_routing import RoutingSession
+from app.utils.rate_limit import RateLimiter
 
-db = SQLAlchemy()
+# Reads can be routed to a replica bind, see app/utils/db_routing.py
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 migrate = Migrate()
 jwt = JWTManager()
 cors = CORS()
+cache = Cache()
+limiter = RateLimiter()
@@ -4,6 +4,15 @@ from app.utils.enums import TaskStatus, TaskPriority
 
 class Task(db.Model):
     __tablename__ = 'tasks'
+    __table_args__ = (
+        db.Index('ix_tasks_user_sync', 'user_id', 'sync_seq'),
+        db.Index('ix_tasks_user_status_position', 'user_id', 'status', 'position'),
+        # Archiver scan: completed tasks by age
+        db.Index('ix_tasks_status_updated', 'status', 'updated_at'),
+        # Without AUTOINCREMENT SQLite hands out max(id) + 1 again, and archived ids
+        # (kept in tasks_archive) would be reused for new tasks
+        {'sqlite_autoincrement': True},
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -14,6 +23,10 @@ class Task(db.Model):
     due_date = db.Column(db.Date, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Per-user change sequence, assigned on every write by SyncService
+    sync_seq = db.Column(db.BigInteger, nullable=False, default=0, server_default='0')
+    # Fractional key ordering the task inside its (user, status) column, see OrderingService
+    position = db.Column(db.String(64), nullable=True)
 
     def __repr__(self):
         return f'<Task {self.title}>'
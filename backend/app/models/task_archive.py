@@ -0,0 +1,27 @@
+from app.extensions import db
+from datetime import datetime
+
+class TaskArchive(db.Model):
+    """
+    Completed tasks moved out of `tasks` by ArchiveService. Same columns as
+    Task (ids are kept), plus when the task was archived.
+    """
+    __tablename__ = 'tasks_archive'
+    __table_args__ = (
+        db.Index('ix_tasks_archive_user_status_position', 'user_id', 'status', 'position'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    title = db.Column(db.String(200), nullable=False)
+    description = db.Column(db.Text, nullable=True)
+    status = db.Column(db.String(20))
+    priority = db.Column(db.String(20))
+    due_date = db.Column(db.Date, nullable=True)
+    created_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime)
+    position = db.Column(db.String(64), nullable=True)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+    def __repr__(self):
+        return f'<TaskArchive {self.title}>'
@@ -0,0 +1,18 @@
+from app.extensions import db
+from datetime import datetime
+
+class TaskTombstone(db.Model):
+    """Marks a deleted task so delta sync can tell clients to drop it."""
+    __tablename__ = 'task_tombstones'
+    __table_args__ = (
+        db.Index('ix_task_tombstones_user_sync', 'user_id', 'sync_seq'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    task_id = db.Column(db.Integer, nullable=False)
+    sync_seq = db.Column(db.BigInteger, nullable=False)
+    deleted_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+    def __repr__(self):
+        return f'<TaskTombstone {self.task_id}>'
@@ -9,6 +9,10 @@ class User(db.Model):
     email = db.Column(db.String(120), unique=True, nullable=False)
     password_hash = db.Column(db.String(256), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Last change sequence handed out for this user's tasks, and the oldest
+    # sync token that can still be served after tombstone compaction
+    sync_seq = db.Column(db.BigInteger, nullable=False, default=0, server_default='0')
+    tombstone_floor = db.Column(db.BigInteger, nullable=False, default=0, server_default='0')
     
     tasks = db.relationship('Task', backref='user', lazy=True)
 
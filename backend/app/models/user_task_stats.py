@@ -0,0 +1,24 @@
+from app.extensions import db
+
+class UserTaskStats(db.Model):
+    """
+    Per-user task counters, kept current by StatsService on every write.
+    `overdue` and `due_today` are relative to `as_of` and refreshed when the day changes.
+    """
+    __tablename__ = 'user_task_stats'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    total = db.Column(db.Integer, nullable=False, default=0)
+    pending = db.Column(db.Integer, nullable=False, default=0)
+    entrada = db.Column(db.Integer, nullable=False, default=0)
+    fazendo = db.Column(db.Integer, nullable=False, default=0)
+    concluida = db.Column(db.Integer, nullable=False, default=0)
+    pending_alta = db.Column(db.Integer, nullable=False, default=0)
+    pending_media = db.Column(db.Integer, nullable=False, default=0)
+    pending_baixa = db.Column(db.Integer, nullable=False, default=0)
+    overdue = db.Column(db.Integer, nullable=False, default=0)
+    due_today = db.Column(db.Integer, nullable=False, default=0)
+    as_of = db.Column(db.Date, nullable=False)
+
+    def __repr__(self):
+        return f'<UserTaskStats {self.user_id}>'
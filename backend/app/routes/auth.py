@@ -1,44 +1,80 @@
 from flask import Blueprint, request, jsonify
 from app.models.user import User
 from app.extensions import db
-from app.schemas.user_schema import UserSchema
-from werkzeug.security import generate_password_hash, check_password_hash
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
+from app.services.auth_service import AuthService
+from app.services.password_service import PasswordService, HashingBusyError
+from sqlalchemy.exc import IntegrityError
+from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity, get_jwt
 
 auth_bp = Blueprint('auth', __name__, url_prefix='/api/auth')
 
+@auth_bp.errorhandler(HashingBusyError)
+def hashing_busy(error):
+    response = jsonify({"msg": "Server busy, try again shortly"})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
+def _is_duplicate_email(error):
+    """Whether an IntegrityError comes from the unique constraint on users.email."""
+    # Postgres names the unnamed constraint users_email_key; SQLite reports the column
+    constraint = getattr(getattr(error.orig, 'diag', None), 'constraint_name', None)
+    if constraint is not None:
+        return constraint == 'users_email_key'
+    message = str(error.orig)
+    return 'users.email' in message or 'users_email_key' in message
+
 @auth_bp.route('/register', methods=['POST'])
 def register():
     data = request.get_json()
     if not data or not data.get('email') or not data.get('password') or not data.get('name'):
         return jsonify({"msg": "Missing fields"}), 400
 
-    if User.query.filter_by(email=data['email']).first():
-        return jsonify({"msg": "User already exists"}), 400
-
-    hashed_password = generate_password_hash(data['password'])
+    hashed_password = PasswordService.hash_password(data['password'])
     new_user = User(
         name=data['name'],
         email=data['email'],
         password_hash=hashed_password
     )
     
+    # Insert first: the unique constraint on email detects a duplicate in the same round trip
     db.session.add(new_user)
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError as e:
+        db.session.rollback()
+        if not _is_duplicate_email(e):
+            raise
+        return jsonify({"msg": "User already exists"}), 400
     
     return jsonify({"msg": "User created successfully"}), 201
 
 @auth_bp.route('/login', methods=['POST'])
 def login():
     data = request.get_json()
-    user = User.query.filter_by(email=data.get('email')).first()
+    # Plain column tuple: no ORM object or identity map entry is built for the login check
+    user = db.session.query(
+        User.id, User.name, User.email, User.created_at, User.password_hash
+    ).filter_by(email=data.get('email')).first()
     
-    if user and check_password_hash(user.password_hash, data.get('password')):
-        access_token = create_access_token(identity=user.id)
-        user_schema = UserSchema()
+    if not user or not data.get('password'):
+        return jsonify({"msg": "Invalid credentials"}), 401
+
+    is_valid, upgraded_hash = PasswordService.verify_password(user.password_hash, data.get('password'))
+    if is_valid:
+        if upgraded_hash:
+            # Configured hash cost changed since this password was stored
+            User.query.filter_by(id=user.id).update({User.password_hash: upgraded_hash})
+            db.session.commit()
+
+        profile = AuthService.public_profile(user)
+        AuthService.remember_profile(profile)
+        access_token = create_access_token(
+            identity=user.id,
+            additional_claims=AuthService.identity_claims(profile)
+        )
         return jsonify({
             "access_token": access_token,
-            "user": user_schema.dump(user)
+            "user": profile
         }), 200
         
     return jsonify({"msg": "Invalid credentials"}), 401
@@ -47,6 +83,10 @@ def login():
 @jwt_required()
 def me():
     current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
-    user_schema = UserSchema()
-    return jsonify(user_schema.dump(user)), 200
+    # Tokens carrying identity claims are answered without any lookup
+    profile = AuthService.profile_from_claims(current_user_id, get_jwt())
+    if profile is None:
+        profile = AuthService.get_profile(current_user_id)
+    if profile is None:
+        return jsonify({"msg": "User not found"}), 404
+    return jsonify(profile), 200
@@ -1,6 +1,8 @@
 from flask import Blueprint, request, jsonify
 from app.services.calendar_service import CalendarService
-from app.schemas.task_schema import TaskSchema
+from app.schemas.fast_serializer import dump_task_rows
+from app.utils.http_cache import cacheable
+from app.utils.db_routing import reads_from_replica
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime
 
@@ -8,6 +10,8 @@ calendar_bp = Blueprint('calendar', __name__, url_prefix='/api/calendar')
 
 @calendar_bp.route('/summary', methods=['GET'])
 @jwt_required()
+@cacheable
+@reads_from_replica
 def calendar_summary():
     current_user_id = get_jwt_identity()
     start_date = request.args.get('start_date')
@@ -27,6 +31,8 @@ def calendar_summary():
 
 @calendar_bp.route('/day/<string:date_str>', methods=['GET'])
 @jwt_required()
+@cacheable
+@reads_from_replica
 def day_tasks(date_str):
     current_user_id = get_jwt_identity()
     try:
@@ -34,6 +40,5 @@ def day_tasks(date_str):
     except ValueError:
          return jsonify({"error": "Invalid date format. Use YYYY-MM-DD"}), 400
 
-    tasks = CalendarService.get_tasks_by_date(current_user_id, date_obj)
-    schema = TaskSchema(many=True)
-    return jsonify({"success": True, "data": schema.dump(tasks)}), 200
+    rows = CalendarService.get_tasks_by_date(current_user_id, date_obj)
+    return jsonify({"success": True, "data": dump_task_rows(rows)}), 200
@@ -1,40 +1,57 @@
 from flask import Blueprint, request, jsonify
 from app.models.task import Task
+from app.models.task_archive import TaskArchive
 from app.extensions import db
-from app.schemas.task_schema import TaskSchema
+from app.schemas.task_schema import task_schema
+from app.schemas.fast_serializer import TASK_COLUMNS, ARCHIVED_TASK_COLUMNS, dump_task_rows
+from app.services.search_service import SearchService
+from app.services.sync_service import SyncService
+from app.services.stats_service import StatsService
+from app.services.ordering_service import OrderingService
+from app.utils.http_cache import cacheable
+from app.utils.db_routing import reads_from_replica
+from app.utils.idempotency import idempotent
+from marshmallow import ValidationError
 from app.utils.enums import TaskStatus
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime
 
 tasks_bp = Blueprint('tasks', __name__, url_prefix='/api/tasks')
 
-@tasks_bp.route('', methods=['GET'])
-@jwt_required(optional=True)
-def get_tasks():
-    current_user_id = get_jwt_identity()
-    if not current_user_id:
-        current_user_id = 1
-        
-    query = Task.query.filter_by(user_id=current_user_id)
-    
+def _filter_tasks(model, user_id):
+    """The list filters from the query string, for Task or TaskArchive."""
+    query = model.query.filter_by(user_id=user_id)
+
     status = request.args.get('status')
     if status:
         query = query.filter_by(status=status)
-        
+
     priority = request.args.get('priority')
     if priority:
         query = query.filter_by(priority=priority)
-        
+
     from_date = request.args.get('from_date')
     if from_date:
-        query = query.filter(Task.due_date >= from_date)
-        
+        query = query.filter(model.due_date >= from_date)
+
     to_date = request.args.get('to_date')
     if to_date:
-        query = query.filter(Task.due_date <= to_date)
+        query = query.filter(model.due_date <= to_date)
+    return query
+
+@tasks_bp.route('', methods=['GET'])
+@jwt_required(optional=True)
+@cacheable
+@reads_from_replica
+def get_tasks():
+    current_user_id = get_jwt_identity()
+    if not current_user_id:
+        current_user_id = 1
         
-    tasks = query.all()
-    schema = TaskSchema(many=True)
+    # Column by column in board order, read straight off ix_tasks_user_status_position
+    query = _filter_tasks(Task, current_user_id).order_by(Task.status, Task.position)
+    # Column tuples straight into plain dicts: no ORM objects, no marshmallow per row
+    rows = query.with_entities(*TASK_COLUMNS).all()
     # Return directly list to match frontend expectation or wrap
     # Frontend KanbanBoard.tsx is currently being patched to expect data;
     # But previous tool edit in KanbanBoard checked 'if (Array.isArray(data))' on 'data'. 
@@ -48,20 +65,71 @@ def get_tasks():
     #   }
     # So the Frontend expects the ROOT object to be the array.
     # I should change this to return the list directly to match the frontend check `Array.isArray(data)`.
-    return jsonify(schema.dump(tasks)), 200
+    tasks = dump_task_rows(rows)
+
+    if request.args.get('include_archived', '').lower() in ('1', 'true', 'yes'):
+        # Archived tasks come after the live board, flagged so the client can tell them apart
+        archived = _filter_tasks(TaskArchive, current_user_id).order_by(TaskArchive.status, TaskArchive.position)
+        for task in dump_task_rows(archived.with_entities(*ARCHIVED_TASK_COLUMNS).all()):
+            task["archived"] = True
+            tasks.append(task)
+    return jsonify(tasks), 200
+
+@tasks_bp.route('/search', methods=['GET'])
+@jwt_required(optional=True)
+@cacheable
+@reads_from_replica
+def search_tasks():
+    current_user_id = get_jwt_identity()
+    if not current_user_id:
+        current_user_id = 1
+
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({"error": "Query parameter 'q' is required"}), 400
+    limit = min(request.args.get('limit', 20, type=int), 100)
+
+    rows = SearchService.search(current_user_id, query, limit=max(limit, 1))
+    return jsonify(dump_task_rows(rows)), 200
+
+@tasks_bp.route('/changes', methods=['GET'])
+@jwt_required(optional=True)
+@reads_from_replica
+def get_changes():
+    current_user_id = get_jwt_identity()
+    if not current_user_id:
+        current_user_id = 1
+
+    # `since` is the `next_since` of the previous sync; omit it for a full download
+    since = request.args.get('since', 0, type=int)
+    if since < 0:
+        return jsonify({"error": "Invalid sync token"}), 400
+
+    return jsonify(SyncService.changes_since(current_user_id, since)), 200
+
+@tasks_bp.route('/stats', methods=['GET'])
+@jwt_required(optional=True)
+def get_stats():
+    current_user_id = get_jwt_identity()
+    if not current_user_id:
+        current_user_id = 1
+
+    # Kanban column counts and overdue/today badges without fetching the tasks
+    stats = StatsService.get_stats(current_user_id)
+    return jsonify({"data": stats, "success": True}), 200
 
 @tasks_bp.route('', methods=['POST'])
 @jwt_required()
+@idempotent
 def create_task():
     current_user_id = get_jwt_identity()
     data = request.get_json()
     
-    schema = TaskSchema()
-    errors = schema.validate(data)
-    if errors:
-        return jsonify({"errors": errors, "success": False}), 400
-        
-    task_data = schema.load(data)
+    # load() validates as it deserializes; no separate validate() pass
+    try:
+        task_data = task_schema.load(data)
+    except ValidationError as err:
+        return jsonify({"errors": err.messages, "success": False}), 400
     
     new_task = Task(
         user_id=current_user_id,
@@ -75,15 +143,16 @@ def create_task():
     db.session.add(new_task)
     db.session.commit()
     
-    return jsonify({"data": schema.dump(new_task), "success": True}), 201
+    return jsonify({"data": task_schema.dump(new_task), "success": True}), 201
 
 @tasks_bp.route('/<int:task_id>', methods=['GET'])
 @jwt_required()
+@cacheable
+@reads_from_replica
 def get_task(task_id):
     current_user_id = get_jwt_identity()
     task = Task.query.filter_by(id=task_id, user_id=current_user_id).first_or_404()
-    schema = TaskSchema()
-    return jsonify({"data": schema.dump(task), "success": True}), 200
+    return jsonify({"data": task_schema.dump(task), "success": True}), 200
 
 @tasks_bp.route('/<int:task_id>', methods=['PUT'])
 @jwt_required(optional=True)
@@ -95,7 +164,6 @@ def update_task(task_id):
     task = Task.query.filter_by(id=task_id, user_id=current_user_id).first_or_404()
     data = request.get_json()
     
-    schema = TaskSchema()
     # Partial update validation omitted for brevity as per previous code
     
     # Manually updating fields for now
@@ -111,7 +179,7 @@ def update_task(task_id):
              task.due_date = data['due_date']
 
     db.session.commit()
-    return jsonify({"data": schema.dump(task), "success": True}), 200
+    return jsonify({"data": task_schema.dump(task), "success": True}), 200
 
 @tasks_bp.route('/<int:task_id>', methods=['DELETE'])
 @jwt_required(optional=True)
@@ -142,3 +210,27 @@ def update_task_status(task_id):
     task.status = data['status']
     db.session.commit()
     return jsonify({"success": True, "data": {"id": task.id, "status": task.status}}), 200
+
+@tasks_bp.route('/<int:task_id>/move', methods=['PATCH'])
+@jwt_required(optional=True)
+def move_task(task_id):
+    current_user_id = get_jwt_identity()
+    if not current_user_id:
+        current_user_id = 1
+
+    task = Task.query.filter_by(id=task_id, user_id=current_user_id).first_or_404()
+    data = request.get_json() or {}
+
+    # Drop position: the neighbours it lands between, in the target column (default: its own)
+    status = data.get('status', task.status)
+    if status not in (TaskStatus.ENTRADA, TaskStatus.FAZENDO, TaskStatus.CONCLUIDA):
+        return jsonify({"error": "Status inválido"}), 400
+    try:
+        OrderingService.move(task, status, after_id=data.get('after_id'), before_id=data.get('before_id'))
+    except LookupError:
+        return jsonify({"error": "Tarefa vizinha não encontrada nessa coluna"}), 400
+    except ValueError:
+        return jsonify({"error": "Posição inválida: after_id deve vir antes de before_id"}), 400
+
+    db.session.commit()
+    return jsonify({"success": True, "data": {"id": task.id, "status": task.status, "position": task.position}}), 200
@@ -1,18 +1,50 @@
-from flask import Blueprint, request, jsonify
-from app.services.voice_service import VoiceService
+from flask import Blueprint, request, jsonify, current_app
+from app.services.voice_service import VoiceService, AudioRejectedError
+from app.services.streaming_voice_service import StreamingVoiceService, StreamSessionNotFound, StreamLimitReached
+from app.utils.uploads import stream_size, guess_audio_format, upload_limit
+from app.utils.audio_format import PREFERRED_UPLOAD
+from app.utils.idempotency import idempotent
+from app.utils.rate_limit import audio_pipeline, rate_limited
+from app.utils.circuit_breaker import breaker_states
+from app.utils.deadline import start_deadline
 from flask_jwt_extended import jwt_required, get_jwt_identity
-import os
-import tempfile
+from werkzeug.exceptions import RequestEntityTooLarge
 
 voice_bp = Blueprint('voice', __name__, url_prefix='/api/voice')
 
+@voice_bp.before_request
+def _start_voice_deadline():
+    # Bounds STT + TTS of this request, time spent queueing for the audio gate included
+    start_deadline(current_app.config.get('VOICE_DEADLINE', 12))
+
+@voice_bp.route('/capabilities', methods=['GET'])
+def voice_capabilities():
+    # Lets the frontend record in the format that skips server-side transcoding
+    return jsonify({
+        "preferred_upload": PREFERRED_UPLOAD,
+        "direct_formats": ["audio/wav;codec=pcm_s16le"],
+        "transcoded_formats": ["audio/webm", "audio/ogg", "audio/mpeg", "audio/mp4", "audio/flac"],
+        "max_upload_bytes": current_app.config.get('VOICE_MAX_UPLOAD_BYTES'),
+        "max_duration_ms": current_app.config.get('VOICE_MAX_DURATION_MS'),
+        # Circuit state of the external STT/TTS providers in this worker
+        "backends": breaker_states()
+    }), 200
+
 @voice_bp.route('/command', methods=['POST'])
 @jwt_required(optional=True)
+# Before the idempotency fingerprint, which parses and hashes the whole upload
+@upload_limit('VOICE_MAX_UPLOAD_BYTES', 5 * 1024 * 1024, "Audio file too large")
+@idempotent
+@rate_limited('voice')
+@audio_pipeline
 def process_voice_command():
     current_user_id = get_jwt_identity()
     if not current_user_id:
         current_user_id = 1 # Fallback for testing/unauthenticated voice
     
+    # Oversized uploads were already refused by upload_limit, before any parsing
+    max_bytes = current_app.config.get('VOICE_MAX_UPLOAD_BYTES', 5 * 1024 * 1024)
+
     voice_id = request.form.get('voiceId')
     
     # Check if a file is present in the request
@@ -20,20 +52,19 @@ def process_voice_command():
         audio_file = request.files['audio']
         if audio_file.filename == '':
             return jsonify({"error": "No selected file"}), 400
-            
-        # Save temp file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".webm") as temp_audio:
-            audio_file.save(temp_audio.name)
-            temp_path = temp_audio.name
-            
+
+        # Chunked uploads carry no Content-Length, so check the parsed size too
+        if stream_size(audio_file.stream) > max_bytes:
+            return jsonify({"error": "Audio file too large"}), 413
+
+        # The upload stream (in memory unless it is large) goes straight to the decoder
         try:
-            result = VoiceService.process_audio_command(temp_path, current_user_id, voice_id)
-        finally:
-            # Cleanup upload temp
-            try:
-                os.remove(temp_path)
-            except:
-                pass
+            result = VoiceService.process_audio_command(
+                audio_file.stream, current_user_id, voice_id,
+                audio_format=guess_audio_format(audio_file)
+            )
+        except AudioRejectedError as e:
+            return jsonify({"error": str(e)}), 413
                 
         return jsonify(result), 200
 
@@ -54,3 +85,67 @@ def process_voice_command():
         return jsonify(result), 200
         
     return jsonify({"error": "No audio file or text provided"}), 400
+
+@voice_bp.errorhandler(RequestEntityTooLarge)
+def upload_too_large(error):
+    # Raised by the form parser when a chunked upload passes upload_limit
+    return jsonify({"error": "Audio file too large"}), 413
+
+@voice_bp.errorhandler(StreamSessionNotFound)
+def stream_session_not_found(error):
+    return jsonify({"error": "Stream session not found or expired"}), 404
+
+@voice_bp.errorhandler(StreamLimitReached)
+def stream_limit_reached(error):
+    # An idle session frees its slot after VOICE_STREAM_SESSION_TTL seconds
+    retry_after = current_app.config.get('VOICE_STREAM_SESSION_TTL', 30)
+    response = jsonify({"error": "Muitas sessões de voz abertas. Tente novamente em instantes.", "retry_after": retry_after})
+    response.headers['Retry-After'] = str(retry_after)
+    return response, 429
+
+def _stream_user_id():
+    return get_jwt_identity() or 1 # Same fallback as /command
+
+@voice_bp.route('/stream', methods=['POST'])
+@jwt_required(optional=True)
+@rate_limited('voice') # The whole session is paid for here
+def open_voice_stream():
+    data = request.get_json(silent=True) or {}
+    sample_rate = int(data.get('sample_rate', 16000))
+    if not 8000 <= sample_rate <= 48000:
+        return jsonify({"error": "Unsupported sample rate"}), 400
+    return jsonify(StreamingVoiceService.open_session(_stream_user_id(), sample_rate)), 201
+
+@voice_bp.route('/stream/<string:session_id>', methods=['POST'])
+@jwt_required(optional=True)
+@rate_limited(None)
+@audio_pipeline
+def feed_voice_stream(session_id):
+    # Body is raw 16-bit mono PCM; read as it arrives (works with chunked transfer encoding)
+    def chunks():
+        while True:
+            chunk = request.stream.read(16384)
+            if not chunk:
+                break
+            yield chunk
+
+    try:
+        result = StreamingVoiceService.feed(session_id, _stream_user_id(), chunks())
+    except AudioRejectedError as e:
+        return jsonify({"error": str(e)}), 413
+    return jsonify(result), 200
+
+@voice_bp.route('/stream/<string:session_id>/finish', methods=['POST'])
+@jwt_required(optional=True)
+@rate_limited(None)
+@audio_pipeline
+def finish_voice_stream(session_id):
+    data = request.get_json(silent=True) or {}
+    result = StreamingVoiceService.finish(session_id, _stream_user_id(), data.get('voiceId'))
+    return jsonify(result), 200
+
+@voice_bp.route('/stream/<string:session_id>', methods=['DELETE'])
+@jwt_required(optional=True)
+def cancel_voice_stream(session_id):
+    StreamingVoiceService.cancel(session_id, _stream_user_id())
+    return jsonify({"success": True}), 200
@@ -0,0 +1,35 @@
+from app.models.task import Task
+from app.models.task_archive import TaskArchive
+
+# Columns in the order dump_task_row expects them. Use with
+# `query.with_entities(*TASK_COLUMNS)` to skip building ORM objects entirely.
+TASK_COLUMNS = (
+    Task.id, Task.title, Task.description, Task.status, Task.priority,
+    Task.due_date, Task.created_at, Task.updated_at, Task.position
+)
+# The same columns read from tasks_archive
+ARCHIVED_TASK_COLUMNS = tuple(getattr(TaskArchive, column.key) for column in TASK_COLUMNS)
+
+def _iso(value):
+    return value.isoformat() if value is not None else None
+
+def dump_task_row(row):
+    """
+    Serializes a TASK_COLUMNS tuple to the same dict TaskSchema().dump produces,
+    without marshmallow's per-field dispatch.
+    """
+    task_id, title, description, status, priority, due_date, created_at, updated_at, position = row
+    return {
+        "id": task_id,
+        "title": title,
+        "description": description,
+        "status": status,
+        "priority": priority,
+        "due_date": _iso(due_date),
+        "created_at": _iso(created_at),
+        "updated_at": _iso(updated_at),
+        "position": position
+    }
+
+def dump_task_rows(rows):
+    return [dump_task_row(row) for row in rows]
@@ -10,3 +10,7 @@ class TaskSchema(Schema):
     due_date = fields.Date(allow_none=True, load_default=None)
     created_at = fields.DateTime(dump_only=True)
     updated_at = fields.DateTime(dump_only=True)
+    position = fields.Str(dump_only=True, allow_none=True)
+
+# Schemas hold no per-request state, so handlers share this instance
+task_schema = TaskSchema()
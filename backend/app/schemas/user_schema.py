@@ -5,3 +5,5 @@ class UserSchema(Schema):
     name = fields.Str(required=True)
     email = fields.Email(required=True)
     created_at = fields.DateTime(dump_only=True)
+
+user_schema = UserSchema()
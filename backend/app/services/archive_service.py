@@ -0,0 +1,114 @@
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import insert, literal
+from app.extensions import db, cache
+from app.models.task import Task
+from app.models.task_archive import TaskArchive
+from app.models.user import User
+from app.services.sync_service import SyncService
+from app.utils.enums import TaskStatus
+
+_ARCHIVED_COLUMNS = [
+    'id', 'user_id', 'title', 'description', 'status', 'priority',
+    'due_date', 'created_at', 'updated_at', 'position', 'archived_at'
+]
+
+class ArchiveService:
+    """
+    Moves completed tasks that have not changed for ARCHIVE_AFTER_DAYS from
+    `tasks` to `tasks_archive`, in batches of ARCHIVE_BATCH_SIZE, so the hot
+    table only holds the live board.
+
+    For delta sync an archived task is a deletion (it gets a tombstone) and
+    the per-user counters stop counting it; it is still listed by
+    GET /api/tasks?include_archived=1.
+    """
+    _thread = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _candidates(cutoff):
+        return Task.query.filter(Task.status == TaskStatus.CONCLUIDA, Task.updated_at < cutoff)
+
+    @staticmethod
+    def archive_batch(cutoff, batch_size):
+        """Archives up to `batch_size` tasks last updated before `cutoff`, in one transaction. Returns the count."""
+        rows = (
+            ArchiveService._candidates(cutoff)
+            .with_entities(Task.user_id, Task.id)
+            .order_by(Task.user_id, Task.id)
+            .limit(batch_size)
+            .all()
+        )
+        by_user = defaultdict(list)
+        for user_id, task_id in rows:
+            by_user[user_id].append(task_id)
+
+        archived = 0
+        now = datetime.utcnow()
+        for user_id in sorted(by_user):
+            # The user's row lock first, like every ORM write: a task reopened in
+            # the meantime no longer matches the filter below and stays put
+            db.session.query(User.id).filter(User.id == user_id).with_for_update().first()
+            query = ArchiveService._candidates(cutoff).filter(Task.id.in_(by_user[user_id]))
+            db.session.execute(
+                insert(TaskArchive.__table__).from_select(
+                    _ARCHIVED_COLUMNS,
+                    query.with_entities(
+                        Task.id, Task.user_id, Task.title, Task.description, Task.status, Task.priority,
+                        Task.due_date, Task.created_at, Task.updated_at, Task.position, literal(now)
+                    ).statement
+                )
+            )
+            # Tombstones and counters, as for any set-based delete
+            archived += SyncService.bulk_delete(query, user_id)
+        db.session.commit()
+        return archived
+
+    @staticmethod
+    def archive(older_than_days=None, batch_size=None):
+        """Archives every eligible task, one batch per transaction. Returns the total."""
+        config = current_app.config
+        if older_than_days is None:
+            older_than_days = config.get('ARCHIVE_AFTER_DAYS', 90)
+        if batch_size is None:
+            batch_size = config.get('ARCHIVE_BATCH_SIZE', 500)
+        cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+
+        total = 0
+        while True:
+            count = ArchiveService.archive_batch(cutoff, batch_size)
+            total += count
+            if count < batch_size:
+                return total
+
+    @classmethod
+    def start(cls, app):
+        """Runs the archiver every ARCHIVE_INTERVAL seconds on a daemon thread (0 disables it)."""
+        interval = app.config.get('ARCHIVE_INTERVAL', 0)
+        if not interval:
+            return
+        with cls._lock:
+            if cls._thread is not None:
+                return
+            cls._thread = threading.Thread(target=cls._run, args=(app, interval), name='archiver', daemon=True)
+            cls._thread.start()
+
+    @classmethod
+    def _run(cls, app, interval):
+        while True:
+            time.sleep(interval)
+            with app.app_context():
+                # With a shared cache only one worker per interval does the work
+                if not cache.namespace('archive').add('run', 1, ttl=interval):
+                    continue
+                try:
+                    archived = cls.archive()
+                    if archived:
+                        print(f"DEBUG: Archived {archived} completed tasks")
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"DEBUG: Archiver failed: {e}")
@@ -0,0 +1,66 @@
+from flask import current_app
+from sqlalchemy import event
+from app.extensions import db, cache
+from app.models.user import User
+from app.schemas.user_schema import user_schema
+
+class AuthService:
+    # Public profiles (never the password hash) keyed by user id.
+    @staticmethod
+    def _profile_cache():
+        return cache.namespace('profile', ttl=current_app.config.get('USER_PROFILE_CACHE_TTL', 60))
+
+    @staticmethod
+    def public_profile(user):
+        """Serializes a User (or a row with the same columns) without sensitive fields."""
+        return user_schema.dump(user)
+
+    @classmethod
+    def get_profile(cls, user_id):
+        """
+        Returns the public profile for `user_id`, hitting the database only on a cache miss.
+        Returns None when the user does not exist.
+        """
+        def load():
+            row = db.session.query(User.id, User.name, User.email, User.created_at).filter_by(id=user_id).first()
+            return cls.public_profile(row) if row is not None else None
+
+        return cls._profile_cache().get_or_set(user_id, load)
+
+    @classmethod
+    def remember_profile(cls, profile):
+        cls._profile_cache().set(profile['id'], profile)
+
+    @classmethod
+    def invalidate_profile(cls, user_id):
+        cls._profile_cache().delete(user_id)
+
+    @staticmethod
+    def identity_claims(profile):
+        """Extra JWT claims that let /me answer without touching the database."""
+        if not current_app.config.get('JWT_IDENTITY_CLAIMS', True):
+            return {}
+        return {
+            "name": profile['name'],
+            "email": profile['email'],
+            "created_at": profile['created_at']
+        }
+
+    @staticmethod
+    def profile_from_claims(user_id, claims):
+        if not current_app.config.get('JWT_IDENTITY_CLAIMS', True):
+            return None
+        if 'name' not in claims or 'email' not in claims:
+            # Tokens issued before identity claims existed
+            return None
+        return {
+            "id": user_id,
+            "name": claims['name'],
+            "email": claims['email'],
+            "created_at": claims.get('created_at')
+        }
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _invalidate_cached_profile(mapper, connection, target):
+    AuthService.invalidate_profile(target.id)
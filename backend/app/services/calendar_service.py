@@ -1,28 +1,42 @@
+from flask import current_app
 from app.models.task import Task
-from app.extensions import db
+from app.extensions import db, cache
+from app.services.sync_service import SyncService
+from app.schemas.fast_serializer import TASK_COLUMNS
 from collections import defaultdict
 
 class CalendarService:
     @staticmethod
     def get_summary(user_id, start_date, end_date):
+        # Keyed by the user's sync sequence: any task write moves it, so a cached
+        # summary can never be stale and needs no explicit invalidation
+        state = SyncService.current_seq(user_id)
+        key = f"{state[0] if state else 0}:{start_date}:{end_date}"
+        summaries = cache.namespace('calendar', ttl=current_app.config.get('CALENDAR_CACHE_TTL', 300))
+        return summaries.get_or_set(
+            key, lambda: CalendarService._build_summary(user_id, start_date, end_date), user_id=user_id
+        )
+
+    @staticmethod
+    def _build_summary(user_id, start_date, end_date):
         # Filtering tasks within date range
         # Assuming due_date is what we are looking at. 
         # If due_date is None, maybe it's not on the calendar or shown in "Today" if pertinent.
         # Here we strictly filter by due_date range.
         
-        tasks = Task.query.filter(
+        rows = Task.query.filter(
             Task.user_id == user_id,
             Task.due_date >= start_date,
             Task.due_date <= end_date
-        ).all()
+        ).with_entities(Task.id, Task.title, Task.status, Task.priority, Task.due_date).all()
 
         summary = defaultdict(list)
-        for task in tasks:
-            summary[str(task.due_date)].append({
-                "id": task.id,
-                "title": task.title,
-                "status": task.status,
-                "priority": task.priority
+        for task_id, title, status, priority, due_date in rows:
+            summary[str(due_date)].append({
+                "id": task_id,
+                "title": title,
+                "status": status,
+                "priority": priority
             })
             
         # Format as list of objects
@@ -37,7 +51,8 @@ class CalendarService:
 
     @staticmethod
     def get_tasks_by_date(user_id, date_obj):
+        # Returns TASK_COLUMNS tuples, ready for dump_task_rows
         return Task.query.filter(
             Task.user_id == user_id, 
             Task.due_date == date_obj
-        ).all()
+        ).with_entities(*TASK_COLUMNS).all()
@@ -1,6 +1,8 @@
 
 import json
 import os
+from flask import current_app
+from app.extensions import cache
 
 class LearningService:
     DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
@@ -11,8 +13,19 @@ class LearningService:
             os.makedirs(LearningService.DATA_DIR)
         return os.path.join(LearningService.DATA_DIR, f'vocabulary_{user_id}.json')
     
+    @staticmethod
+    def _vocabulary_cache():
+        return cache.namespace('vocabulary', ttl=current_app.config.get('VOCABULARY_CACHE_TTL', 300))
+
     @staticmethod
     def load_vocabulary(user_id):
+        # Read on every voice command: serve it from the cache, not the JSON file
+        return LearningService._vocabulary_cache().get_or_set(
+            'all', lambda: LearningService._read_vocabulary(user_id), user_id=user_id
+        )
+
+    @staticmethod
+    def _read_vocabulary(user_id):
         filepath = LearningService._get_file_path(user_id)
         if not os.path.exists(filepath):
             return {}
@@ -27,6 +40,7 @@ class LearningService:
         filepath = LearningService._get_file_path(user_id)
         with open(filepath, 'w', encoding='utf-8') as f:
             json.dump(vocab, f, ensure_ascii=False, indent=2)
+        LearningService._vocabulary_cache().invalidate_user(user_id)
 
     @staticmethod
     def learn_phrase(user_id, phrase, meaning):
@@ -34,7 +48,8 @@ class LearningService:
         Maps a user phrase to a system meaning/keyword.
         Example: phrase="detonar", meaning="excluir"
         """
-        vocab = LearningService.load_vocabulary(user_id)
+        # Copy: the cached dict is shared with other requests
+        vocab = dict(LearningService.load_vocabulary(user_id))
         vocab[phrase.lower()] = meaning.lower()
         LearningService.save_vocabulary(user_id, vocab)
         return True
@@ -0,0 +1,203 @@
+import json
+import re
+import threading
+import urllib.request
+from abc import ABC, abstractmethod
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from flask import current_app
+from app.utils.string_utils import calculate_similarity
+from app.extensions import cache
+
+# `command` is a canonical utterance the keyword cascade in VoiceService understands
+NLUResult = namedtuple('NLUResult', ['intent', 'confidence', 'command'])
+
+# Canonical trigger per intent; the residual utterance (the task title) is appended
+CANONICAL_TRIGGERS = {
+    "create_task": "nova tarefa",
+    "complete_task": "concluir tarefa",
+    "start_task": "iniciar tarefa",
+    "delete_task": "excluir tarefa",
+    "list_all_tasks": "listar todas as tarefas",
+    "list_today_tasks": "tarefas de hoje",
+}
+# Intents that take no argument: the command is the trigger alone
+_ARGUMENTLESS = {"list_all_tasks", "list_today_tasks"}
+
+def _build_command(intent, residual):
+    trigger = CANONICAL_TRIGGERS[intent]
+    if intent in _ARGUMENTLESS or not residual:
+        return trigger
+    return f"{trigger} {residual}"
+
+class NLUBackend(ABC):
+    @abstractmethod
+    def classify(self, text):
+        """Returns an NLUResult for a normalized utterance, or None when unsure."""
+
+class KeywordClassifierBackend(NLUBackend):
+    """
+    Small local classifier: scores each word of the utterance against per-intent
+    lexicons of colloquial verbs the keyword cascade does not know, with fuzzy
+    matching to absorb STT misspellings.
+    """
+    LEXICON = {
+        "create_task": ["anota", "anote", "anotar", "lembre", "lembrar", "lembra", "registre",
+                        "registrar", "adiciona", "adicione", "coloca", "coloque", "bota", "cria",
+                        "crie", "inclua", "incluir"],
+        "complete_task": ["finalizei", "terminei", "acabei", "completei", "finalize", "finalizar",
+                          "complete", "completar", "encerre", "encerrar", "feito"],
+        "start_task": ["comecei", "comece", "inicia", "inicie", "iniciei", "peguei"],
+        "delete_task": ["tira", "tire", "retire", "cancela", "cancele", "cancelar", "descarta",
+                        "descarte", "elimine", "eliminar", "esqueça"],
+        "list_all_tasks": ["pendências", "pendencias", "pendente", "pendentes", "listar", "lista",
+                           "mostre", "mostra", "quais"],
+        "list_today_tasks": ["agenda"],
+    }
+    _LEADING_FILLER = re.compile(r'^(?:(?:a|o|as|os|de|da|do|uma|um|que|tarefa|tarefas|pra|para|minha|minhas)\s+)+')
+
+    def __init__(self, min_similarity=0.85):
+        self.min_similarity = min_similarity
+
+    def classify(self, text):
+        words = re.findall(r'\w+', text)
+        best = None
+        for intent, keywords in self.LEXICON.items():
+            for position, word in enumerate(words):
+                score = max(calculate_similarity(word, kw) for kw in keywords)
+                if score >= self.min_similarity and (best is None or score > best[1]):
+                    best = (intent, score, position)
+        if best is None:
+            return None
+
+        intent, score, position = best
+        if intent == "list_all_tasks" and "hoje" in words:
+            intent = "list_today_tasks"
+        # The task title is whatever follows the matched verb, minus leading filler words
+        residual = self._LEADING_FILLER.sub('', " ".join(words[position + 1:]) + " ").strip()
+        return NLUResult(intent, score, _build_command(intent, residual))
+
+class LocalLLMBackend(NLUBackend):
+    """
+    Asks a local LLM server (Ollama-compatible /api/generate) to map the utterance
+    onto one of the known intents. Nothing leaves the machine.
+    """
+    PROMPT = (
+        "Classifique o comando de um assistente de tarefas. Intenções possíveis: {intents}. "
+        "Responda apenas JSON no formato {{\"intent\": \"...\", \"title\": \"...\", \"confidence\": 0.0}}. "
+        "Use intent \"unknown\" se não tiver certeza.\nComando: {text}"
+    )
+
+    def __init__(self, url, model, timeout):
+        self.url = url
+        self.model = model
+        self.timeout = timeout
+
+    def classify(self, text):
+        payload = json.dumps({
+            "model": self.model,
+            "prompt": self.PROMPT.format(intents=", ".join(CANONICAL_TRIGGERS), text=text),
+            "format": "json",
+            "stream": False,
+        }).encode('utf-8')
+        request = urllib.request.Request(self.url, data=payload, headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            answer = json.loads(json.loads(response.read())["response"])
+
+        intent = answer.get("intent")
+        if intent not in CANONICAL_TRIGGERS:
+            return None
+        title = (answer.get("title") or "").strip().lower()
+        return NLUResult(intent, float(answer.get("confidence", 0.0)), _build_command(intent, title))
+
+class StubBackend(NLUBackend):
+    """Offline stand-in for tests: answers from NLU_STUB_RESPONSES {utterance: [intent, title]}."""
+
+    def __init__(self, responses):
+        self.responses = responses or {}
+
+    def classify(self, text):
+        if text not in self.responses:
+            return None
+        intent, title = self.responses[text]
+        return NLUResult(intent, 1.0, _build_command(intent, title))
+
+# Cached for utterances no backend could map, so they are not retried until the TTL
+_NO_MATCH = False
+
+class NLUService:
+    """
+    Optional fallback for utterances the keyword cascade could not route.
+
+    Backends run in a small bounded thread pool with a strict timeout; when the
+    pool is busy or the backend is slow the caller simply gets None. Results,
+    including "no match", are memoized per normalized utterance.
+    """
+    _backend = None
+    _executor = None
+    _slots = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _create_backend(config):
+        name = config.get('NLU_BACKEND')
+        if name == 'classifier':
+            return KeywordClassifierBackend()
+        if name == 'llm':
+            return LocalLLMBackend(config['NLU_LLM_URL'], config['NLU_LLM_MODEL'], config.get('NLU_TIMEOUT', 1.5))
+        if name == 'stub':
+            return StubBackend(config.get('NLU_STUB_RESPONSES'))
+        return None
+
+    @classmethod
+    def _init(cls):
+        with cls._lock:
+            if cls._executor is None:
+                config = current_app.config
+                workers = config.get('NLU_WORKERS', 2)
+                cls._backend = cls._create_backend(config)
+                cls._slots = threading.BoundedSemaphore(workers + config.get('NLU_QUEUE_DEPTH', 4))
+                cls._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='nlu')
+
+    @staticmethod
+    def normalize(text):
+        return re.sub(r'\s+', ' ', re.sub(r'[^\w\s]', ' ', text.lower())).strip()
+
+    @classmethod
+    def classify(cls, text):
+        if not current_app.config.get('NLU_BACKEND'):
+            return None
+        if cls._executor is None:
+            cls._init()
+        if cls._backend is None:
+            return None
+
+        results = cache.namespace('nlu', ttl=current_app.config.get('NLU_CACHE_TTL', 3600))
+        key = cls.normalize(text)
+        cached = results.get(key)
+        if cached is not None:
+            # Shared backends hand the result back as a plain list
+            return None if cached is _NO_MATCH else NLUResult(*cached)
+
+        if not cls._slots.acquire(blocking=False):
+            print("DEBUG: NLU pool saturated, skipping fallback")
+            return None
+        future = cls._executor.submit(cls._backend.classify, key)
+        future.add_done_callback(lambda _: cls._slots.release())
+
+        try:
+            result = future.result(timeout=current_app.config.get('NLU_TIMEOUT', 1.5))
+        except FutureTimeoutError:
+            print("DEBUG: NLU backend timed out")
+            return None
+        except Exception as e:
+            print(f"DEBUG: NLU backend failed: {e}")
+            return None
+
+        min_confidence = current_app.config.get('NLU_MIN_CONFIDENCE', 0.6)
+        if result is None or result.confidence < min_confidence:
+            results.set(key, _NO_MATCH)
+            return None
+        results.set(key, result)
+        return result
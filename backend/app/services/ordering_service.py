@@ -0,0 +1,208 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app, has_app_context
+from sqlalchemy import event, func, inspect, or_, select
+from sqlalchemy.orm import Session
+from app.extensions import db
+from app.models.task import Task
+from app.models.user import User
+from app.utils.enums import TaskStatus
+from app.utils.ordering import key_between, spread_keys
+
+_tasks = Task.__table__
+
+def _status_changed(connection, task):
+    """Whether a persistent task's status differs from the stored one."""
+    history = inspect(task).attrs.status.history
+    if not history.added:
+        return False
+    if history.deleted:
+        return history.deleted[0] != history.added[0]
+    # Assigned while expired: compare with the row
+    stored = connection.execute(select(_tasks.c.status).where(_tasks.c.id == task.id)).scalar()
+    return stored != history.added[0]
+
+class OrderingService:
+    """
+    Manual ordering of tasks inside their (user, status) column.
+
+    Each task carries a fractional key (app/utils/ordering.py), so moving a
+    task writes only that task's row. Keys grow as tasks are squeezed into
+    the same gap; a column with a key longer than ORDERING_MAX_KEY_LENGTH is
+    rewritten with short, evenly spaced keys after the commit that produced it,
+    and a move that would not fit the column rewrites it first, synchronously.
+    """
+    _executor = None
+    _pending = set()
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _last_key(connection, user_id, status, exclude_id=None):
+        query = select(func.max(_tasks.c.position)).where(_tasks.c.user_id == user_id, _tasks.c.status == status)
+        if exclude_id is not None:
+            query = query.where(_tasks.c.id != exclude_id)
+        return connection.execute(query).scalar()
+
+    @staticmethod
+    def _note_key(session, user_id, status, key):
+        if len(key) > current_app.config.get('ORDERING_MAX_KEY_LENGTH', 12):
+            session.info.setdefault('rebalance', set()).add((user_id, status))
+
+    @staticmethod
+    def assign_positions(session, user_id, created, modified):
+        """
+        Appends new tasks, and tasks moved to another column without an
+        explicit position, to the end of their column. Runs in SyncService's
+        before_flush listener, under the user's row lock.
+        """
+        connection = session.connection()
+        moved = [
+            task for task in modified
+            if not inspect(task).attrs.position.history.added and _status_changed(connection, task)
+        ]
+        last_keys = {}
+        for task in [t for t in created if t.position is None] + moved:
+            status = task.status or TaskStatus.ENTRADA
+            if status not in last_keys:
+                last_keys[status] = OrderingService._last_key(connection, user_id, status)
+            task.position = key_between(last_keys[status], None)
+            last_keys[status] = task.position
+            OrderingService._note_key(session, user_id, status, task.position)
+
+    @staticmethod
+    def move(task, status, after_id=None, before_id=None):
+        """
+        Places `task` in column `status` right after task `after_id` and/or
+        right before task `before_id` (end of the column when neither is given).
+        Only the task's own row is written. Raises LookupError when a neighbour
+        is not in that column, ValueError when the neighbours are out of order.
+        """
+        connection = db.session.connection()
+
+        def neighbour_key(task_id):
+            key = connection.execute(
+                select(_tasks.c.position).where(
+                    _tasks.c.id == task_id, _tasks.c.user_id == task.user_id,
+                    _tasks.c.status == status, _tasks.c.id != task.id
+                )
+            ).first()
+            if key is None:
+                raise LookupError(task_id)
+            if key[0] is None:
+                raise ValueError(f"Task {task_id} has no ordering key")
+            return key[0]
+
+        def adjacent_key(key, after):
+            # The key next to `key` in the column, skipping the task being moved
+            column = select(_tasks.c.position).where(
+                _tasks.c.user_id == task.user_id, _tasks.c.status == status, _tasks.c.id != task.id
+            )
+            if after:
+                return connection.execute(column.where(_tasks.c.position > key).order_by(_tasks.c.position).limit(1)).scalar()
+            return connection.execute(column.where(_tasks.c.position < key).order_by(_tasks.c.position.desc()).limit(1)).scalar()
+
+        for attempt in range(2):
+            try:
+                if after_id is None and before_id is None:
+                    a, b = OrderingService._last_key(connection, task.user_id, status, exclude_id=task.id), None
+                else:
+                    a = neighbour_key(after_id) if after_id is not None else None
+                    b = neighbour_key(before_id) if before_id is not None else None
+                    if after_id is not None and before_id is None:
+                        b = adjacent_key(a, after=True)
+                    elif before_id is not None and after_id is None:
+                        a = adjacent_key(b, after=False)
+                key = key_between(a, b)
+                if len(key) > _tasks.c.position.type.length:
+                    # Too many inserts into one gap: the background rebalance would come too late
+                    raise ValueError(f"Ordering key longer than {_tasks.c.position.type.length} characters")
+                break
+            except ValueError:
+                # Unkeyed, equal or out-of-order neighbours, or no room left: give the column
+                # fresh keys and retry once
+                if attempt:
+                    raise
+                OrderingService.rebalance(task.user_id, status)
+
+        task.status = status
+        task.position = key
+        OrderingService._note_key(db.session, task.user_id, status, key)
+        return key
+
+    @staticmethod
+    def rebalance(user_id, status):
+        """Rewrites one column with evenly spaced keys. Returns the number of tasks changed."""
+        # Same lock the write path takes, so no concurrent move is overwritten
+        db.session.query(User.id).filter(User.id == user_id).with_for_update().first()
+        tasks = (
+            Task.query.filter(Task.user_id == user_id, Task.status == status)
+            .order_by(Task.position, Task.id)
+            .all()
+        )
+        changed = 0
+        for task, key in zip(tasks, spread_keys(len(tasks))):
+            if task.position != key:
+                task.position = key
+                changed += 1
+        db.session.flush()
+        return changed
+
+    @staticmethod
+    def rebalance_all(min_length=None):
+        """
+        Rebalances every column holding a key longer than `min_length` (or a
+        task without a key). Returns the list of (user_id, status) rebalanced.
+        """
+        if min_length is None:
+            min_length = current_app.config.get('ORDERING_MAX_KEY_LENGTH', 12)
+        columns = (
+            db.session.query(Task.user_id, Task.status)
+            .group_by(Task.user_id, Task.status)
+            .having(or_(
+                func.max(func.length(Task.position)) > min_length,
+                func.count(Task.position) < func.count(Task.id)
+            ))
+            .order_by(Task.user_id, Task.status)
+            .all()
+        )
+        for user_id, status in columns:
+            OrderingService.rebalance(user_id, status)
+            db.session.commit()
+        return [tuple(column) for column in columns]
+
+    @classmethod
+    def schedule_rebalance(cls, columns):
+        """Rebalances the columns on a background thread, once each even if requested repeatedly."""
+        if not has_app_context() or not current_app.config.get('ORDERING_BACKGROUND_REBALANCE', True):
+            return
+        app = current_app._get_current_object()
+        with cls._lock:
+            columns = [column for column in columns if column not in cls._pending]
+            cls._pending.update(columns)
+            if cls._executor is None:
+                cls._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='rebalance')
+        for column in columns:
+            cls._executor.submit(cls._run_rebalance, app, column)
+
+    @classmethod
+    def _run_rebalance(cls, app, column):
+        with cls._lock:
+            cls._pending.discard(column)
+        with app.app_context():
+            try:
+                changed = cls.rebalance(*column)
+                db.session.commit()
+                print(f"DEBUG: Rebalanced column {column}: {changed} tasks rekeyed")
+            except Exception as e:
+                db.session.rollback()
+                print(f"DEBUG: Rebalance of {column} failed: {e}")
+
+@event.listens_for(Session, 'after_commit')
+def _rebalance_after_commit(session):
+    columns = session.info.pop('rebalance', None)
+    if columns:
+        OrderingService.schedule_rebalance(sorted(columns))
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _forget_rebalance(session, previous_transaction):
+    session.info.pop('rebalance', None)
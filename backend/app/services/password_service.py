@@ -0,0 +1,89 @@
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from flask import current_app
+from werkzeug.security import generate_password_hash, check_password_hash
+
+# Cost per method when PASSWORD_HASH_COST is not set: scrypt N, pbkdf2 iterations
+_DEFAULT_COSTS = {'scrypt': 32768, 'pbkdf2': 600000}
+
+class HashingBusyError(Exception):
+    """Raised when the hashing pool is saturated and the request should be shed."""
+
+def _verify_and_rehash(pwhash, password, method):
+    # Runs inside the worker process: verify, and upgrade the hash in the same trip if needed
+    if not check_password_hash(pwhash, password):
+        return False, None
+    if PasswordService.hash_method_of(pwhash) != method:
+        return True, generate_password_hash(password, method=method)
+    return True, None
+
+class PasswordService:
+    """
+    Password hashing is deliberately CPU-heavy, so it runs in a small process pool
+    instead of on the web worker. Admission is bounded: once `PASSWORD_HASH_WORKERS +
+    PASSWORD_HASH_QUEUE_DEPTH` jobs are in flight new requests fail fast with HashingBusyError.
+    """
+    _executor = None
+    _slots = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def _get_executor(cls):
+        if cls._executor is None:
+            with cls._lock:
+                if cls._executor is None:
+                    workers = current_app.config.get('PASSWORD_HASH_WORKERS', 2)
+                    depth = current_app.config.get('PASSWORD_HASH_QUEUE_DEPTH', 8)
+                    cls._slots = threading.BoundedSemaphore(workers + depth)
+                    cls._executor = ProcessPoolExecutor(max_workers=workers)
+        return cls._executor
+
+    @staticmethod
+    def configured_method():
+        """Builds the werkzeug method string (e.g. 'scrypt:32768:8:1') from Config."""
+        method = current_app.config.get('PASSWORD_HASH_METHOD', 'scrypt')
+        cost = current_app.config.get('PASSWORD_HASH_COST')
+        if method in _DEFAULT_COSTS:
+            cost = cost or _DEFAULT_COSTS[method]
+            return f"scrypt:{cost}:8:1" if method == 'scrypt' else f"pbkdf2:sha256:{cost}"
+        return method
+
+    @staticmethod
+    def hash_method_of(pwhash):
+        return pwhash.split('$', 1)[0]
+
+    @classmethod
+    def _submit(cls, fn, *args):
+        executor = cls._get_executor()
+        if not cls._slots.acquire(blocking=False):
+            raise HashingBusyError()
+        try:
+            future = executor.submit(fn, *args)
+        except Exception:
+            cls._slots.release()
+            raise
+        future.add_done_callback(lambda _: cls._slots.release())
+        try:
+            return future.result(timeout=current_app.config.get('PASSWORD_HASH_TIMEOUT', 10))
+        except FutureTimeoutError:
+            raise HashingBusyError()
+
+    @classmethod
+    def hash_password(cls, password):
+        return cls._submit(generate_password_hash, password, cls.configured_method())
+
+    @classmethod
+    def verify_password(cls, pwhash, password):
+        """
+        Returns (is_valid, upgraded_hash). `upgraded_hash` is set when the stored hash
+        was produced with a different method/cost than the one configured now.
+        """
+        return cls._submit(_verify_and_rehash, pwhash, password, cls.configured_method())
+
+    @classmethod
+    def hash_many(cls, passwords):
+        """Bulk hashing for offline jobs (CLI imports); bypasses request admission control."""
+        method = cls.configured_method()
+        executor = cls._get_executor()
+        return list(executor.map(generate_password_hash, passwords, [method] * len(passwords), chunksize=16))
@@ -0,0 +1,103 @@
+import re
+import threading
+from sqlalchemy import func, inspect, literal_column, or_, and_, text
+from app.extensions import db
+from app.models.task import Task
+from app.schemas.fast_serializer import TASK_COLUMNS
+
+# Search terms are plain word tokens; anything else would be query syntax
+_TOKEN_RE = re.compile(r'\w+')
+_MAX_TOKENS = 8
+
+# Must match the expression indexed by the task search migration on Postgres
+_PG_CONFIG = literal_column("'portuguese'::regconfig")
+_PG_DOCUMENT = func.to_tsvector(
+    _PG_CONFIG, func.coalesce(Task.title, '') + ' ' + func.coalesce(Task.description, '')
+)
+
+class SearchService:
+    """
+    Full-text search over task titles and descriptions.
+
+    SQLite uses the FTS5 table `tasks_fts` (kept in sync by triggers), Postgres a
+    GIN index on to_tsvector('portuguese', ...). Every term is a prefix, so
+    "reun" finds "reunião". Databases without an index fall back to LIKE.
+    """
+    _strategies = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def tokens(query):
+        return _TOKEN_RE.findall((query or '').lower())[:_MAX_TOKENS]
+
+    @classmethod
+    def _strategy(cls):
+        engine = db.engine
+        strategy = cls._strategies.get(engine.url)
+        if strategy is None:
+            with cls._lock:
+                if engine.dialect.name == 'sqlite':
+                    # The FTS table only exists once the search migration ran
+                    strategy = 'fts5' if inspect(engine).has_table('tasks_fts') else 'like'
+                elif engine.dialect.name == 'postgresql':
+                    strategy = 'tsvector'
+                else:
+                    strategy = 'like'
+                cls._strategies[engine.url] = strategy
+        return strategy
+
+    @classmethod
+    def _matching_ids(cls, user_id, tokens, limit, match_any):
+        """Ids of the user's best matching tasks, most relevant first."""
+        strategy = cls._strategy()
+
+        if strategy == 'fts5':
+            match = (" OR " if match_any else " ").join(f'"{t}"*' for t in tokens)
+            rows = db.session.execute(text(
+                "SELECT tasks.id FROM tasks_fts JOIN tasks ON tasks.id = tasks_fts.rowid "
+                "WHERE tasks_fts MATCH :match AND tasks.user_id = :user_id "
+                "ORDER BY bm25(tasks_fts) LIMIT :limit"
+            ), {"match": match, "user_id": user_id, "limit": limit})
+            return [row[0] for row in rows]
+
+        if strategy == 'tsvector':
+            tsquery = func.to_tsquery(_PG_CONFIG, (" | " if match_any else " & ").join(f"{t}:*" for t in tokens))
+            rows = db.session.query(Task.id).filter(
+                Task.user_id == user_id, _PG_DOCUMENT.op('@@')(tsquery)
+            ).order_by(func.ts_rank(_PG_DOCUMENT, tsquery).desc()).limit(limit)
+            return [row[0] for row in rows]
+
+        conditions = [
+            or_(Task.title.ilike(f"%{t}%"), Task.description.ilike(f"%{t}%")) for t in tokens
+        ]
+        rows = db.session.query(Task.id).filter(
+            Task.user_id == user_id, or_(*conditions) if match_any else and_(*conditions)
+        ).order_by(Task.updated_at.desc()).limit(limit)
+        return [row[0] for row in rows]
+
+    @classmethod
+    def search(cls, user_id, query, limit=20):
+        """TASK_COLUMNS rows matching every term of `query`, most relevant first."""
+        tokens = cls.tokens(query)
+        if not tokens:
+            return []
+        ids = cls._matching_ids(user_id, tokens, limit, match_any=False)
+        if not ids:
+            return []
+        rows = {row[0]: row for row in Task.query.filter(Task.id.in_(ids)).with_entities(*TASK_COLUMNS)}
+        return [rows[task_id] for task_id in ids if task_id in rows]
+
+    @classmethod
+    def candidates(cls, user_id, query, limit=50):
+        """
+        Task objects sharing at least one term with `query`, for the voice intents
+        to fuzzy-match against instead of the user's whole task list.
+        """
+        # Articles and prepositions would match nearly every task
+        tokens = [t for t in cls.tokens(query) if len(t) > 2]
+        if not tokens:
+            return []
+        ids = cls._matching_ids(user_id, tokens, limit, match_any=True)
+        if not ids:
+            return []
+        return Task.query.filter(Task.id.in_(ids)).all()
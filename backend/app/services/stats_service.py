@@ -0,0 +1,209 @@
+from collections import Counter
+from datetime import date
+from sqlalchemy import and_, case, func, inspect, insert, select, update
+from app.extensions import db
+from app.models.task import Task
+from app.models.user import User
+from app.models.user_task_stats import UserTaskStats
+from app.utils.enums import TaskStatus, TaskPriority
+
+COUNTER_COLUMNS = (
+    'total', 'pending', 'entrada', 'fazendo', 'concluida',
+    'pending_alta', 'pending_media', 'pending_baixa', 'overdue', 'due_today'
+)
+# Counters that depend on the current date
+DATE_COLUMNS = ('overdue', 'due_today')
+
+_STATUS_COLUMNS = {
+    TaskStatus.ENTRADA: 'entrada',
+    TaskStatus.FAZENDO: 'fazendo',
+    TaskStatus.CONCLUIDA: 'concluida',
+}
+_PRIORITY_COLUMNS = {
+    TaskPriority.ALTA: 'pending_alta',
+    TaskPriority.MEDIA: 'pending_media',
+    TaskPriority.BAIXA: 'pending_baixa',
+}
+
+_tasks = Task.__table__
+_stats = UserTaskStats.__table__
+
+def _contribution(status, priority, due_date, today):
+    """What one task adds to its owner's counters."""
+    # Unset columns get the model defaults on insert
+    status = status or TaskStatus.ENTRADA
+    priority = priority or TaskPriority.MEDIA
+    counts = Counter(total=1)
+    if status in _STATUS_COLUMNS:
+        counts[_STATUS_COLUMNS[status]] += 1
+    if status != TaskStatus.CONCLUIDA:
+        counts['pending'] += 1
+        if priority in _PRIORITY_COLUMNS:
+            counts[_PRIORITY_COLUMNS[priority]] += 1
+        if due_date is not None and due_date < today:
+            counts['overdue'] += 1
+        elif due_date == today:
+            counts['due_today'] += 1
+    return counts
+
+def _previous_values(connection, task):
+    """(status, priority, due_date) of a persistent task as the database has them before this flush."""
+    state = inspect(task)
+    values = []
+    for attribute in ('status', 'priority', 'due_date'):
+        history = state.attrs[attribute].history
+        if history.deleted:
+            values.append(history.deleted[0])
+        elif history.unchanged:
+            values.append(history.unchanged[0])
+        elif not history.added:
+            # Expired and untouched: loading it yields the stored value
+            values.append(getattr(task, attribute))
+        else:
+            # Assigned while expired, so the old value was never loaded: read the row
+            row = connection.execute(
+                select(_tasks.c.status, _tasks.c.priority, _tasks.c.due_date).where(_tasks.c.id == task.id)
+            ).one()
+            return tuple(row)
+    return tuple(values)
+
+def _aggregate(connection, user_id, today, columns=COUNTER_COLUMNS):
+    """Counters recomputed from the tasks table, same rules as _contribution."""
+    status = func.coalesce(_tasks.c.status, TaskStatus.ENTRADA)
+    priority = func.coalesce(_tasks.c.priority, TaskPriority.MEDIA)
+    pending = status != TaskStatus.CONCLUIDA
+
+    def count(condition):
+        return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+    expressions = {
+        'total': func.count(_tasks.c.id),
+        'pending': count(pending),
+        'entrada': count(status == TaskStatus.ENTRADA),
+        'fazendo': count(status == TaskStatus.FAZENDO),
+        'concluida': count(status == TaskStatus.CONCLUIDA),
+        'pending_alta': count(and_(pending, priority == TaskPriority.ALTA)),
+        'pending_media': count(and_(pending, priority == TaskPriority.MEDIA)),
+        'pending_baixa': count(and_(pending, priority == TaskPriority.BAIXA)),
+        'overdue': count(and_(pending, _tasks.c.due_date < today)),
+        'due_today': count(and_(pending, _tasks.c.due_date == today)),
+    }
+    row = connection.execute(
+        select(*[expressions[c].label(c) for c in columns]).where(_tasks.c.user_id == user_id)
+    ).one()
+    return {c: int(row._mapping[c]) for c in columns}
+
+class StatsService:
+    """
+    Per-user task counters in `user_task_stats`, so counts are a primary-key
+    lookup instead of COUNT(*) over the user's tasks.
+
+    ORM writes are applied as deltas in the same flush (see SyncService's
+    before_flush listener, which holds the user's row lock); set-based writes
+    recompute the row. Date-relative counters are refreshed once per day.
+    """
+
+    @staticmethod
+    def _ensure_row(connection, user_id, today):
+        as_of = connection.execute(select(_stats.c.as_of).where(_stats.c.user_id == user_id)).scalar()
+        if as_of is None:
+            connection.execute(insert(_stats).values(user_id=user_id, as_of=today, **_aggregate(connection, user_id, today)))
+        elif as_of != today:
+            StatsService._refresh_dates(connection, user_id, today)
+
+    @staticmethod
+    def _refresh_dates(connection, user_id, today):
+        values = _aggregate(connection, user_id, today, DATE_COLUMNS)
+        # Guarded by as_of so a concurrent refresh or write that already moved the day wins
+        connection.execute(
+            update(_stats)
+            .where(_stats.c.user_id == user_id, _stats.c.as_of != today)
+            .values(as_of=today, **values)
+        )
+        return values
+
+    @staticmethod
+    def apply_changes(connection, user_id, written, removed):
+        """
+        Applies one flush to the user's counters: `written` are new or modified
+        tasks (current values), `removed` are modified or deleted tasks (values
+        before the flush).
+        """
+        today = date.today()
+        StatsService._ensure_row(connection, user_id, today)
+
+        delta = Counter()
+        for task in written:
+            delta.update(_contribution(task.status, task.priority, task.due_date, today))
+        for task in removed:
+            delta.subtract(_contribution(*_previous_values(connection, task), today))
+        values = {c: _stats.c[c] + n for c, n in delta.items() if n}
+        if values:
+            connection.execute(update(_stats).where(_stats.c.user_id == user_id).values(**values))
+
+    @staticmethod
+    def recompute(connection, user_id):
+        """Rebuilds the row from the tasks table; used after set-based writes."""
+        today = date.today()
+        values = _aggregate(connection, user_id, today)
+        updated = connection.execute(
+            update(_stats).where(_stats.c.user_id == user_id).values(as_of=today, **values)
+        ).rowcount
+        if not updated:
+            connection.execute(insert(_stats).values(user_id=user_id, as_of=today, **values))
+        return values
+
+    @staticmethod
+    def get_stats(user_id):
+        """
+        The user's counters. Read-only: a row last refreshed on another day has
+        its date counters recomputed in memory, and the user's next write (or
+        `flask stats reconcile`) stores the refresh.
+        """
+        today = date.today()
+        connection = db.session.connection()
+        row = connection.execute(select(_stats).where(_stats.c.user_id == user_id)).first()
+        if row is None:
+            # Created by the user's next write; until then answer from the tasks table
+            counters = _aggregate(connection, user_id, today)
+        else:
+            counters = {c: row._mapping[c] for c in COUNTER_COLUMNS}
+            if row.as_of != today:
+                counters.update(_aggregate(connection, user_id, today, DATE_COLUMNS))
+        return {**counters, "as_of": today.isoformat()}
+
+    @staticmethod
+    def pending_count(user_id):
+        """
+        Read-only: 'pending' does not depend on the date, so a stale row is still
+        right and only that column is read.
+        """
+        connection = db.session.connection()
+        pending = connection.execute(select(_stats.c.pending).where(_stats.c.user_id == user_id)).scalar()
+        if pending is None:
+            pending = _aggregate(connection, user_id, date.today(), ('pending',))['pending']
+        return pending
+
+    @staticmethod
+    def reconcile(user_ids=None):
+        """
+        Recomputes every user's counters from the tasks table. Returns the ids
+        whose stored counters had drifted.
+        """
+        if user_ids is None:
+            user_ids = [user_id for (user_id,) in db.session.query(User.id).order_by(User.id)]
+        drifted = []
+        for user_id in user_ids:
+            # Same lock the write path takes, so no flush interleaves with the rebuild
+            db.session.query(User.id).filter(User.id == user_id).with_for_update().first()
+            connection = db.session.connection()
+            before = connection.execute(select(_stats).where(_stats.c.user_id == user_id)).first()
+            values = StatsService.recompute(connection, user_id)
+            # Date counters of a row last refreshed on another day are expected to differ
+            compared = COUNTER_COLUMNS if before is not None and before.as_of == date.today() else [
+                c for c in COUNTER_COLUMNS if c not in DATE_COLUMNS
+            ]
+            if before is None or any(before._mapping[c] != values[c] for c in compared):
+                drifted.append(user_id)
+            db.session.commit()
+        return drifted
@@ -0,0 +1,133 @@
+import threading
+import time
+import uuid
+from flask import current_app
+from app.services.stt_backends import create_streaming_recognizer
+from app.services.voice_service import VoiceService, AudioRejectedError
+
+class StreamSessionNotFound(Exception):
+    pass
+
+class StreamLimitReached(Exception):
+    """Too many open sessions, for this user or for the whole process."""
+
+class _StreamSession:
+    def __init__(self, user_id, sample_rate, frame_bytes, recognizer):
+        self.user_id = user_id
+        self.sample_rate = sample_rate
+        self.frame_bytes = frame_bytes
+        self.recognizer = recognizer
+        self.pending = bytearray()
+        self.received_bytes = 0
+        self.partial = ""
+        self.last_seen = time.monotonic()
+        self.lock = threading.Lock()
+
+class StreamingVoiceService:
+    """
+    Chunked-POST streaming transcription. The client opens a session, posts raw
+    16-bit mono PCM as it records, and receives partial transcripts with every
+    chunk; `finish` returns the final transcript already routed to an intent.
+
+    Sessions live in this process, so multi-worker deployments need sticky routing.
+    Each holds buffered PCM, so they are capped per user and per process and
+    dropped after VOICE_STREAM_SESSION_TTL seconds without a chunk.
+    """
+    _sessions = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def _expire_sessions(cls):
+        ttl = current_app.config.get('VOICE_STREAM_SESSION_TTL', 30)
+        now = time.monotonic()
+        with cls._lock:
+            for session_id in [sid for sid, s in cls._sessions.items() if now - s.last_seen > ttl]:
+                del cls._sessions[session_id]
+
+    @classmethod
+    def _get_session(cls, session_id, user_id):
+        cls._expire_sessions()
+        with cls._lock:
+            session = cls._sessions.get(session_id)
+        if session is None or session.user_id != user_id:
+            raise StreamSessionNotFound()
+        session.last_seen = time.monotonic()
+        return session
+
+    @classmethod
+    def open_session(cls, user_id, sample_rate=16000):
+        cls._expire_sessions()
+        config = current_app.config
+        frame_ms = config.get('VOICE_STREAM_FRAME_MS', 100)
+        frame_bytes = int(sample_rate * frame_ms / 1000) * 2
+        session = _StreamSession(user_id, sample_rate, frame_bytes, create_streaming_recognizer(sample_rate))
+        session_id = uuid.uuid4().hex
+        with cls._lock:
+            # Checked and inserted under one lock, so concurrent opens cannot overshoot
+            if len(cls._sessions) >= config.get('VOICE_STREAM_MAX_SESSIONS', 64):
+                raise StreamLimitReached()
+            if sum(1 for s in cls._sessions.values() if s.user_id == user_id) >= config.get('VOICE_STREAM_MAX_SESSIONS_PER_USER', 2):
+                raise StreamLimitReached()
+            cls._sessions[session_id] = session
+        return {"session_id": session_id, "format": "pcm_s16le", "sample_rate": sample_rate, "frame_ms": frame_ms}
+
+    @classmethod
+    def feed(cls, session_id, user_id, chunks):
+        """Feeds an iterable of PCM byte chunks; returns the latest partial transcript."""
+        session = cls._get_session(session_id, user_id)
+        max_bytes = current_app.config.get('VOICE_MAX_DURATION_MS', 60000) * session.sample_rate * 2 // 1000
+
+        with session.lock:
+            for chunk in chunks:
+                session.received_bytes += len(chunk)
+                if session.received_bytes > max_bytes:
+                    cls.cancel(session_id, user_id)
+                    raise AudioRejectedError("Audio stream too long")
+                session.pending.extend(chunk)
+
+                # Recognizers always see whole frames; the remainder waits for the next chunk
+                while len(session.pending) >= session.frame_bytes:
+                    frame = bytes(session.pending[:session.frame_bytes])
+                    del session.pending[:session.frame_bytes]
+                    partial = session.recognizer.accept_frame(frame)
+                    if partial is not None:
+                        session.partial = partial
+
+            return {
+                "partial": session.partial,
+                "received_ms": session.received_bytes * 1000 // (session.sample_rate * 2)
+            }
+
+    @classmethod
+    def finish(cls, session_id, user_id, voice_id=None):
+        session = cls._get_session(session_id, user_id)
+        with cls._lock:
+            cls._sessions.pop(session_id, None)
+
+        with session.lock:
+            if session.pending:
+                # Zero-pad the last partial frame
+                session.pending.extend(b'\0' * (session.frame_bytes - len(session.pending)))
+                session.recognizer.accept_frame(bytes(session.pending))
+            text = session.recognizer.finish()
+
+        if not text:
+            message = "Não consegui ouvir nada. Tente novamente."
+            return {
+                "success": False,
+                "message": message,
+                "audio_base64": VoiceService._generate_audio_response(message, voice_id)
+            }
+
+        result = VoiceService.process_text_command(text, user_id)
+        result['audio_base64'] = VoiceService._generate_audio_response(result['message'], voice_id)
+        result['transcription'] = text
+        result['success'] = True
+        return result
+
+    @classmethod
+    def cancel(cls, session_id, user_id):
+        with cls._lock:
+            session = cls._sessions.get(session_id)
+            if session is not None and session.user_id == user_id:
+                del cls._sessions[session_id]
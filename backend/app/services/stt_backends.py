@@ -0,0 +1,111 @@
+import json
+import threading
+from abc import ABC, abstractmethod
+from flask import current_app
+
+class StreamingRecognizer(ABC):
+    """
+    Incremental speech recognizer fed with fixed-size frames of mono 16-bit PCM.
+
+    `accept_frame` returns the best partial transcript so far (or None if the
+    backend has nothing new), `finish` returns the final transcript (or None).
+    """
+
+    def __init__(self, sample_rate):
+        self.sample_rate = sample_rate
+
+    @abstractmethod
+    def accept_frame(self, frame):
+        ...
+
+    @abstractmethod
+    def finish(self):
+        ...
+
+class VoskRecognizer(StreamingRecognizer):
+    """Offline Kaldi-based recognizer; needs `vosk` and a Portuguese model on disk (VOSK_MODEL_PATH)."""
+    _model = None
+    _model_lock = threading.Lock()
+
+    @classmethod
+    def _get_model(cls):
+        if cls._model is None:
+            with cls._model_lock:
+                if cls._model is None:
+                    from vosk import Model
+                    cls._model = Model(current_app.config['VOSK_MODEL_PATH'])
+        return cls._model
+
+    def __init__(self, sample_rate):
+        super().__init__(sample_rate)
+        from vosk import KaldiRecognizer
+        self._recognizer = KaldiRecognizer(self._get_model(), sample_rate)
+        self._segments = []
+
+    def accept_frame(self, frame):
+        if self._recognizer.AcceptWaveform(frame):
+            # End of an utterance segment: it will not change any more
+            text = json.loads(self._recognizer.Result()).get('text')
+            if text:
+                self._segments.append(text)
+            return " ".join(self._segments)
+        partial = json.loads(self._recognizer.PartialResult()).get('partial')
+        return " ".join(self._segments + ([partial] if partial else []))
+
+    def finish(self):
+        text = json.loads(self._recognizer.FinalResult()).get('text')
+        if text:
+            self._segments.append(text)
+        return " ".join(self._segments) or None
+
+class BufferedGoogleRecognizer(StreamingRecognizer):
+    """
+    The online Google recognizer has no incremental API: frames are buffered while
+    the user speaks and a single request is made on finish. No partials.
+    """
+
+    def __init__(self, sample_rate):
+        super().__init__(sample_rate)
+        self._frames = bytearray()
+
+    def accept_frame(self, frame):
+        self._frames.extend(frame)
+        return None
+
+    def finish(self):
+        from app.services.voice_service import VoiceService
+
+        AudioSegment = VoiceService._audio_segment()
+        audio = AudioSegment(data=bytes(self._frames), sample_width=2, frame_rate=self.sample_rate, channels=1)
+        audio = VoiceService._trim_silence(audio)
+        if audio is None:
+            return None
+        return VoiceService._recognize(audio)
+
+class StubRecognizer(StreamingRecognizer):
+    """
+    Local stand-in for tests and offline development: reveals the words of
+    VOICE_STREAM_STUB_TEXT one frame at a time.
+    """
+
+    def __init__(self, sample_rate):
+        super().__init__(sample_rate)
+        self._words = current_app.config.get('VOICE_STREAM_STUB_TEXT', '').split()
+        self._frames = 0
+
+    def accept_frame(self, frame):
+        self._frames += 1
+        return " ".join(self._words[:self._frames])
+
+    def finish(self):
+        return " ".join(self._words) or None
+
+STREAMING_BACKENDS = {
+    'vosk': VoskRecognizer,
+    'google': BufferedGoogleRecognizer,
+    'stub': StubRecognizer,
+}
+
+def create_streaming_recognizer(sample_rate):
+    backend = current_app.config.get('VOICE_STREAM_BACKEND', 'google')
+    return STREAMING_BACKENDS[backend](sample_rate)
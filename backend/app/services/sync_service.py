@@ -0,0 +1,160 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+from sqlalchemy import event, func, insert, literal, select, update
+from sqlalchemy.orm import Session
+from app.extensions import db
+from app.models.task import Task
+from app.models.task_tombstone import TaskTombstone
+from app.models.user import User
+from app.schemas.fast_serializer import TASK_COLUMNS, dump_task_row
+from app.services.stats_service import StatsService
+from app.services.ordering_service import OrderingService
+from app.utils.db_routing import mark_written
+
+class SyncService:
+    """
+    Delta sync for offline-capable clients.
+
+    Every flush that touches a user's tasks takes the next number from
+    `users.sync_seq` and stamps it on the written rows (or on a tombstone for
+    deleted ones). Bumping that row also locks it until commit, so a user's
+    changes become visible in sequence order and a client that saw token N has
+    seen everything up to N.
+    """
+
+    @staticmethod
+    def next_seq(connection, user_id):
+        # The user now reads from the primary until a while after this commit
+        mark_written(db.session(), user_id)
+        connection.execute(
+            update(User.__table__)
+            .where(User.__table__.c.id == user_id)
+            .values(sync_seq=User.__table__.c.sync_seq + 1)
+        )
+        return connection.execute(
+            select(User.__table__.c.sync_seq).where(User.__table__.c.id == user_id)
+        ).scalar()
+
+    @staticmethod
+    def bulk_update(query, user_id, values):
+        """Set-based UPDATE that still advances the user's sync sequence and counters."""
+        connection = db.session.connection()
+        seq = SyncService.next_seq(connection, user_id)
+        affected = query.update({**values, Task.sync_seq: seq}, synchronize_session=False)
+        StatsService.recompute(connection, user_id)
+        return affected
+
+    @staticmethod
+    def bulk_delete(query, user_id):
+        """Set-based DELETE that leaves a tombstone for every removed task and updates the counters."""
+        connection = db.session.connection()
+        seq = SyncService.next_seq(connection, user_id)
+        db.session.execute(
+            insert(TaskTombstone.__table__).from_select(
+                ['user_id', 'task_id', 'sync_seq', 'deleted_at'],
+                query.with_entities(Task.user_id, Task.id, literal(seq), literal(datetime.utcnow())).statement
+            )
+        )
+        affected = query.delete(synchronize_session=False)
+        StatsService.recompute(connection, user_id)
+        return affected
+
+    @staticmethod
+    def current_seq(user_id):
+        return db.session.query(User.sync_seq, User.tombstone_floor).filter(User.id == user_id).first()
+
+    @staticmethod
+    def changes_since(user_id, since):
+        """
+        Tasks written and ids deleted after token `since`. A token older than the
+        compacted tombstones cannot be answered incrementally: the response then
+        carries every task and `reset`, and the client replaces its copy.
+        """
+        state = SyncService.current_seq(user_id)
+        if state is None:
+            return {"tasks": [], "deleted": [], "next_since": 0, "reset": False}
+        # Read the token first: anything committed after this point is > token
+        token, floor = state
+        reset = since < floor
+        if reset:
+            since = 0
+
+        rows = (
+            Task.query.filter(Task.user_id == user_id, Task.sync_seq > since, Task.sync_seq <= token)
+            .with_entities(*TASK_COLUMNS, Task.sync_seq)
+            .order_by(Task.sync_seq)
+            .all()
+        )
+        task_seqs = {row[0]: row[-1] for row in rows}
+
+        deleted = []
+        if not reset:
+            tombstones = (
+                db.session.query(TaskTombstone.task_id, TaskTombstone.sync_seq)
+                .filter(TaskTombstone.user_id == user_id, TaskTombstone.sync_seq > since, TaskTombstone.sync_seq <= token)
+                .order_by(TaskTombstone.sync_seq)
+            )
+            # An id reused by a newer task is not a deletion for the client
+            deleted = [task_id for task_id, seq in tombstones if task_seqs.get(task_id, 0) < seq]
+
+        return {
+            "tasks": [dump_task_row(row[:-1]) for row in rows],
+            "deleted": deleted,
+            "next_since": token,
+            "reset": reset
+        }
+
+    @staticmethod
+    def compact_tombstones(older_than_days=30):
+        """
+        Drops tombstones older than the cutoff and raises each affected user's
+        tombstone_floor, so stale tokens get a reset instead of missing deletes.
+        Returns the number of tombstones removed.
+        """
+        cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+        floors = (
+            db.session.query(TaskTombstone.user_id, func.max(TaskTombstone.sync_seq))
+            .filter(TaskTombstone.deleted_at < cutoff)
+            .group_by(TaskTombstone.user_id)
+            .all()
+        )
+        for user_id, floor in floors:
+            User.query.filter(User.id == user_id, User.tombstone_floor < floor).update(
+                {User.tombstone_floor: floor}, synchronize_session=False
+            )
+        removed = TaskTombstone.query.filter(TaskTombstone.deleted_at < cutoff).delete(synchronize_session=False)
+        db.session.commit()
+        return removed
+
+@event.listens_for(Session, 'before_flush')
+def _track_task_changes(session, flush_context, instances):
+    created = defaultdict(list)
+    modified = defaultdict(list)
+    deleted = defaultdict(list)
+    for obj in session.new:
+        if isinstance(obj, Task):
+            created[obj.user_id].append(obj)
+    for obj in session.dirty:
+        if isinstance(obj, Task) and session.is_modified(obj, include_collections=False):
+            modified[obj.user_id].append(obj)
+    for obj in session.deleted:
+        if isinstance(obj, Task):
+            deleted[obj.user_id].append(obj)
+    if not created and not modified and not deleted:
+        return
+
+    connection = session.connection()
+    # Fixed order, so two flushes touching the same users cannot deadlock
+    for user_id in sorted(set(created) | set(modified) | set(deleted)):
+        # Takes the user's row lock first; the counters below are updated under it
+        seq = SyncService.next_seq(connection, user_id)
+        for task in created[user_id] + modified[user_id]:
+            task.sync_seq = seq
+        for task in deleted[user_id]:
+            session.add(TaskTombstone(user_id=user_id, task_id=task.id, sync_seq=seq))
+        OrderingService.assign_positions(session, user_id, created[user_id], modified[user_id])
+        StatsService.apply_changes(
+            connection, user_id,
+            written=created[user_id] + modified[user_id],
+            removed=modified[user_id] + deleted[user_id]
+        )
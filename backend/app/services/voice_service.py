@@ -1,82 +1,318 @@
 import os
-import speech_recognition as sr
-from gtts import gTTS
-from pydub import AudioSegment
+import re
 import tempfile
 import base64
+import hashlib
+import time
+from collections import namedtuple
 from datetime import date
+from flask import current_app
 from app.utils.enums import TaskStatus
+from app.utils.audio_format import sniff_audio, is_direct_pcm
+from app.utils.vad import find_speech_bounds
+from app.extensions import cache
+from app.utils.db_routing import replica_reads
+from app.utils.date_parser import parse_date, strip_date
+from app.utils.ffmpeg import configure_ffmpeg
+from app.utils.circuit_breaker import get_breaker
+from app.utils.deadline import stage_budget, cut_short
+from app.utils.string_utils import calculate_similarity
+
+# Conjunctions only split an utterance when a new command verb follows and
+# "tarefa(s)" appears right after it, so titles like "comprar pão e leite" stay whole
+_COMMAND_VERBS = (
+    r"cri(?:e|ar|a)|nova|adicion(?:e|ar|a)|conclu(?:a|ir)|termin(?:e|ar)|marc(?:e|ar)|"
+    r"exclu(?:a|ir)|delet(?:e|ar)|apag(?:ue|ar)|remov(?:a|er)|comece|come[çc]ar|inici(?:e|ar)|"
+    r"mud(?:e|ar)|alter(?:e|ar)|defin(?:a|ir)|agend(?:e|ar)|list(?:e|ar)|mostr(?:e|ar)"
+)
+_COMMAND_SPLIT_RE = re.compile(
+    rf"\s*,?\s+(?:e\s+depois|e\s+também|e|depois|também|então)\s+"
+    rf"(?=(?:{_COMMAND_VERBS})\b(?:\s+\S+){{0,3}}?\s+tarefas?\b)"
+)
+_CREATE_TRIGGER = r"(?:\bnova tarefa|\b(?:criar|crie|cria|adicionar|adicione|adiciona)\s+(?:uma\s+|a\s+)?(?:nova\s+)?tarefa)\b"
+
+def split_commands(text):
+    """Splits a compound utterance ("crie X e conclua a tarefa Y") into single commands."""
+    return [part.strip() for part in _COMMAND_SPLIT_RE.split(text) if part.strip()]
+
+# Commands over a set of tasks: the verb picks the action, the rest of the
+# utterance narrows the set ("de hoje", "atrasadas", "concluídas", "prioridade alta")
+BulkCommand = namedtuple('BulkCommand', ['action', 'statuses', 'priority', 'due_date', 'overdue', 'label'])
+
+_BULK_ACTIONS = (
+    ("complete", r"(?:conclu(?:a|ir)|termin(?:e|ar)|finaliz(?:e|ar)|marque|marcar)"),
+    ("delete", r"(?:exclu(?:a|ir)|delet(?:e|ar)|apag(?:ue|ar)|remov(?:a|er)|limp(?:e|ar))"),
+    ("start", r"(?:inici(?:e|ar)|comece|come[çc]ar)"),
+)
+# The set must be the verb's own object: a quantifier or a plural "tarefas" right
+# after it. "excluir a tarefa revisar tarefas atrasadas" is a single-task command.
+_BULK_COMMAND_RE = re.compile(
+    r"\b(?:" + "|".join(f"(?P<{name}>{verb})" for name, verb in _BULK_ACTIONS) + r")\s+"
+    r"(?:(?P<all>todas\s+(?:as\s+)?)|as\s+)?(?:minhas\s+)?tarefas\b"
+)
+_BULK_PRIORITY_RE = re.compile(r"\b(?:de\s+)?prioridade\s+(alta|baixa|m[ée]dia)\b|\b(urgentes)\b")
+
+def parse_bulk_command(text, today=None):
+    """
+    Recognizes commands over a filtered set of tasks ("concluir todas as tarefas
+    de hoje", "excluir as tarefas concluídas"). Only the words after the set
+    are read as filters. Returns a BulkCommand or None.
+    """
+    command = _BULK_COMMAND_RE.search(text)
+    if command is None:
+        return None
+    action = next(name for name, _ in _BULK_ACTIONS if command.group(name))
+    text = text[command.end():]
+
+    statuses = priority = due_date = None
+    overdue = False
+    labels = []
+
+    # "concluídas" is the target state of a complete command, not a filter
+    if action != "complete" and re.search(r"\b(?:conclu[íi]das|feitas)\b", text):
+        statuses = (TaskStatus.CONCLUIDA,)
+        labels.append("concluídas")
+    elif re.search(r"\bpendentes\b", text):
+        statuses = (TaskStatus.ENTRADA, TaskStatus.FAZENDO)
+        labels.append("pendentes")
+    elif action != "start" and re.search(r"\b(?:em\s+andamento|fazendo)\b", text):
+        statuses = (TaskStatus.FAZENDO,)
+        labels.append("em andamento")
+    elif re.search(r"\b(?:da|na)\s+entrada\b", text):
+        statuses = (TaskStatus.ENTRADA,)
+        labels.append("da entrada")
+
+    if re.search(r"\b(?:atrasadas|vencidas)\b", text):
+        overdue = True
+        labels.append("atrasadas")
+    else:
+        today = today or date.today()
+        match = parse_date(text, today)
+        if match:
+            due_date = match.date
+            labels.append("de hoje" if due_date == today else f"do dia {due_date.strftime('%d/%m')}")
+
+    match = _BULK_PRIORITY_RE.search(text)
+    if match:
+        priority = 'alta' if match.group(2) else match.group(1).replace('é', 'e')
+        labels.append(f"de prioridade {priority}")
+
+    if not (statuses or overdue or due_date or priority):
+        # Unfiltered sets need an explicit "todas"; an unfiltered delete is delete_all_tasks
+        if not command.group('all') or action == "delete":
+            return None
+    return BulkCommand(action, statuses, priority, due_date, overdue, " ".join(labels))
+
+class _TaskSnapshot:
+    """
+    The user's tasks, loaded once per utterance and shared by every sub-command,
+    instead of one full query per intent. Kept current as sub-commands mutate it.
+    """
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self._tasks = None
+
+    def all(self, query=None, threshold=0.6):
+        return self._select(query, threshold, lambda t: True)
+
+    def pending(self, query=None, threshold=0.6):
+        return self._select(query, threshold, lambda t: t.status != TaskStatus.CONCLUIDA)
+
+    def inbox(self, query=None, threshold=0.6):
+        return self._select(query, threshold, lambda t: t.status == TaskStatus.ENTRADA)
+
+    def _select(self, query, threshold, keep):
+        if self._tasks is None and query:
+            # Not loaded yet: the search index may already hold the match. Its term
+            # overlap only ranks, though; unless a candidate clears the caller's fuzzy
+            # threshold, the right task may share no term with a misheard query
+            from app.services.search_service import SearchService
+            candidates = [t for t in SearchService.candidates(self.user_id, query) if keep(t)]
+            if any(calculate_similarity(query, t.title) >= threshold for t in candidates):
+                return candidates
+        if self._tasks is None:
+            from app.models.task import Task
+            self._tasks = Task.query.filter_by(user_id=self.user_id).all()
+        return [t for t in self._tasks if keep(t)]
+
+    def add(self, task):
+        if self._tasks is not None:
+            self._tasks.append(task)
+
+    def remove(self, task):
+        if self._tasks is not None and task in self._tasks:
+            self._tasks.remove(task)
+
+    def reset(self):
+        self._tasks = None
+
+class AudioRejectedError(Exception):
+    """Raised when an upload is refused before any transcription work (e.g. too long)."""
 
 class VoiceService:
-    # Configure ffmpeg path manually if not in PATH
-    try:
+    # speech_recognition, pydub and the TTS engines are imported on first use, so
+    # REST-only workers and CLI commands never load them
+
+    @staticmethod
+    def _audio_segment():
+        """pydub's AudioSegment, with ffmpeg configured on first use."""
+        configure_ffmpeg(current_app.config.get('FFMPEG_DIR'))
         from pydub import AudioSegment
-        import shutil
-        
-        # Path found via agent discovery
-        ffmpeg_dir = r"C:\Users\lucas\AppData\Local\Microsoft\WinGet\Links"
-        ffmpeg_exe = os.path.join(ffmpeg_dir, "ffmpeg.exe")
-        ffprobe_exe = os.path.join(ffmpeg_dir, "ffprobe.exe")
-        
-        if os.path.exists(ffmpeg_exe):
-            # Add to PATH so subprocess calls work
-            if ffmpeg_dir not in os.environ["PATH"]:
-                os.environ["PATH"] += os.pathsep + ffmpeg_dir
-            
-            # Explicitly set for pydub just in case
-            AudioSegment.converter = ffmpeg_exe
-            # pydub might check for ffprobe too
-            if os.path.exists(ffprobe_exe):
-                AudioSegment.ffprobe = ffprobe_exe
-                
-    except ImportError:
-        pass
+        return AudioSegment
+
+    @staticmethod
+    def _decode_audio(stream, info, audio_format=None):
+        """Decodes the upload to an AudioSegment, skipping ffmpeg for plain PCM WAV."""
+        AudioSegment = VoiceService._audio_segment()
+        if is_direct_pcm(info):
+            stream.seek(info.data_offset)
+            frames = stream.read(info.data_size)
+            frame_width = info.sample_width * info.channels
+            frames = frames[:len(frames) - len(frames) % frame_width]
+            print(f"DEBUG: PCM WAV {info.sample_rate}Hz/{info.channels}ch, bypassing ffmpeg")
+            return AudioSegment(
+                data=frames,
+                sample_width=info.sample_width,
+                frame_rate=info.sample_rate,
+                channels=info.channels
+            )
+
+        # Anything else goes through ffmpeg; the sniffed container beats the client's label
+        print(f"DEBUG: Decoding {info.container or audio_format or 'unknown'} audio via ffmpeg")
+        return AudioSegment.from_file(stream, format=info.container or audio_format)
+
+    @staticmethod
+    def _trim_silence(audio):
+        """
+        Strips leading/trailing silence from a mono AudioSegment.
+        Returns the trimmed segment, or None when the clip is silence only.
+        """
+        config = current_app.config
+        if not config.get('VOICE_VAD_ENABLED', True):
+            return audio
+        bounds = find_speech_bounds(
+            audio.raw_data, audio.frame_rate, audio.sample_width,
+            min_rms=config.get('VOICE_VAD_MIN_RMS', 300),
+            padding_ms=config.get('VOICE_VAD_PADDING_MS', 200)
+        )
+        if bounds is None:
+            return None
+        return audio[bounds.start_ms:bounds.end_ms]
+
+    # Transcriptions keyed by a fingerprint of the trimmed PCM, so retries skip STT
+    @staticmethod
+    def _transcription_cache():
+        return cache.namespace('stt', ttl=current_app.config.get('TRANSCRIPTION_CACHE_TTL', 3600))
+
+    @staticmethod
+    def _audio_fingerprint(audio):
+        digest = hashlib.blake2b(audio.raw_data, digest_size=16)
+        digest.update(f"{audio.frame_rate}:{audio.sample_width}".encode())
+        return f"{digest.hexdigest()}:{len(audio.raw_data)}"
+
+    @staticmethod
+    def _recognize(audio):
+        """
+        Runs STT on a trimmed mono AudioSegment. Identical PCM (client retries,
+        double submits, canned phrases) is answered from the transcription cache,
+        and concurrent identical uploads share a single STT request.
+        """
+        fingerprint = VoiceService._audio_fingerprint(audio)
+        return VoiceService._transcription_cache().get_or_set(
+            fingerprint, lambda: VoiceService._recognize_google(audio)
+        )
 
     @staticmethod
-    def _transcribe_audio(audio_file_path):
+    def _recognize_google(audio):
+        import speech_recognition as sr
+
+        breaker = get_breaker("stt:google")
+        if not breaker.allow():
+            print("DEBUG: Google Speech Recognition circuit open, skipping STT")
+            return None
+        limit = current_app.config.get('VOICE_STT_TIMEOUT', 6)
+        timeout = stage_budget(limit)
+        if timeout <= 0:
+            print("DEBUG: No time left for STT")
+            return None
+
+        # Hand mono PCM straight to SpeechRecognition instead of exporting a WAV file
         recognizer = sr.Recognizer()
+        recognizer.operation_timeout = timeout
+        audio_data = sr.AudioData(audio.raw_data, audio.frame_rate, audio.sample_width)
+        try:
+            # Using Google's free speech recognition
+            print(f"DEBUG: Sending {len(audio)}ms to Google Speech Recognition...")
+            text = recognizer.recognize_google(audio_data, language="pt-BR")
+            print(f"DEBUG: Transcription result: {text}")
+        except sr.UnknownValueError:
+            # The service answered; the audio was just unintelligible
+            breaker.record_success()
+            print("DEBUG: Google Speech Recognition could not understand audio")
+            return None
+        except Exception as e:
+            if cut_short(e, timeout, limit):
+                print(f"DEBUG: Google Speech Recognition ran out of the request deadline; {e}")
+                return None
+            breaker.record_failure()
+            print(f"DEBUG: Could not request results from Google Speech Recognition service; {e}")
+            return None
+        breaker.record_success()
+        return text or None
+
+    @staticmethod
+    def _transcribe_audio(audio_source, audio_format=None):
+        """
+        `audio_source` is a path or a binary file-like object such as the upload
+        stream. File-like sources are piped to the decoder without a temp file.
+
+        Returns (text, stats); text is None when nothing was recognized and
+        stats carries the original and trimmed durations.
+        """
+        if isinstance(audio_source, (str, os.PathLike)):
+            with open(audio_source, 'rb') as f:
+                return VoiceService._transcribe_audio(f, audio_format)
+
+        max_duration_ms = current_app.config.get('VOICE_MAX_DURATION_MS', 60000)
+        stats = {}
         
-        # Convert to WAV if necessary (SpeechRecognition prefers WAV)
-        # Using pydub to handle conversion
         try:
-            print(f"DEBUG: Processing audio file at {audio_file_path}")
-            # Load audio (pydub handles many formats if ffmpeg is installed)
-            audio = AudioSegment.from_file(audio_file_path)
+            info = sniff_audio(audio_source)
+            print(f"DEBUG: Sniffed audio: {info.container}/{info.codec} {info.sample_rate}Hz")
+
+            # Header-declared duration lets us refuse long clips before decoding anything
+            if info.duration_ms is not None and info.duration_ms > max_duration_ms:
+                raise AudioRejectedError(f"Audio longer than {max_duration_ms // 1000}s")
+
+            audio = VoiceService._decode_audio(audio_source, info, audio_format)
             print(f"DEBUG: Audio loaded successfully. Duration: {len(audio)}ms")
+            stats["duration_ms"] = len(audio)
+
+            if len(audio) > max_duration_ms:
+                raise AudioRejectedError(f"Audio longer than {max_duration_ms // 1000}s")
+
+            audio = audio.set_channels(1)
+            audio = VoiceService._trim_silence(audio)
+            if audio is None:
+                # Nothing but silence: answer right away, no STT call
+                print("DEBUG: No speech detected, skipping recognition")
+                stats["speech_ms"] = 0
+                stats["silent"] = True
+                return None, stats
+            stats["speech_ms"] = len(audio)
+            stats["silent"] = False
             
-            # Export to specific WAV format for SpeechRecognition
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_wav:
-                audio.export(temp_wav.name, format="wav")
-                wav_path = temp_wav.name
-            print(f"DEBUG: Exported to temporary WAV at {wav_path}")
-                
-            with sr.AudioFile(wav_path) as source:
-                print("DEBUG: Reading audio source for recognition...")
-                audio_data = recognizer.record(source)
-                try:
-                    # Using Google's free speech recognition
-                    print("DEBUG: Sending to Google Speech Recognition...")
-                    text = recognizer.recognize_google(audio_data, language="pt-BR")
-                    print(f"DEBUG: Transcription result: {text}")
-                    return text
-                except sr.UnknownValueError:
-                    print("DEBUG: Google Speech Recognition could not understand audio")
-                    return None
-                except sr.RequestError as e:
-                    print(f"DEBUG: Could not request results from Google Speech Recognition service; {e}")
-                    return None
-            
-            # Cleanup temp wav
-            try:
-                os.remove(wav_path)
-            except:
-                pass
+            text = VoiceService._recognize(audio)
+            return text, stats
                 
+        except AudioRejectedError:
+            raise
         except Exception as e:
             print(f"Error processing audio: {e}")
             import traceback
             traceback.print_exc()
-            return None
+            return None, stats
 
     @staticmethod
     def _ensure_site_packages():
@@ -89,138 +325,186 @@ class VoiceService:
 
     @staticmethod
     def _generate_audio_response(text, voice_id=None):
+        """
+        Base64 MP3 for `text`. Replies repeat a lot ("Não entendi...", "Pronto!..."),
+        so Edge TTS results are cached per voice and text; gTTS fallbacks are not,
+        so the preferred voice comes back once Edge recovers.
+
+        Returns None (a text-only reply) when the request deadline leaves less
+        than VOICE_TTS_MIN_BUDGET for synthesis.
+        """
+        if not text or not text.strip():
+            print("DEBUG: TTS received empty text. Skipping.")
+            return None
+
+        voice = voice_id.strip() if voice_id else "pt-BR-AntonioNeural"
+        key = hashlib.blake2b(f"{voice}\0{text}".encode('utf-8'), digest_size=16).hexdigest()
+        tts_cache = cache.namespace('tts', ttl=current_app.config.get('TTS_CACHE_TTL', 86400))
+        audio_base64 = tts_cache.get(key)
+        if audio_base64 is not None:
+            return audio_base64
+
+        budget = stage_budget(current_app.config.get('VOICE_TTS_TIMEOUT', 4))
+        if budget < current_app.config.get('VOICE_TTS_MIN_BUDGET', 0.5):
+            print("DEBUG: TTS budget exhausted, replying with text only")
+            return None
+
+        audio_base64, engine = VoiceService._synthesize(text, voice, budget)
+        if engine == "edge":
+            tts_cache.set(key, audio_base64)
+        return audio_base64
+
+    @staticmethod
+    def _read_base64(path):
         try:
-            if not text or not text.strip():
-                print("DEBUG: TTS received empty text. Skipping.")
-                return None
+            with open(path, "rb") as audio_file:
+                audio_bytes = audio_file.read()
+        finally:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        if not audio_bytes:
+            raise Exception("Generated audio file is empty")
+        return base64.b64encode(audio_bytes).decode('utf-8')
 
-            VoiceService._ensure_site_packages()
-            import edge_tts
-            import asyncio
-            
-            # Default Voice: pt-BR-AntonioNeural (Male, Neural quality)
-            # Remove any whitespace that might have crept in
-            voice_cleaned = voice_id.strip() if voice_id else "pt-BR-AntonioNeural"
-            
-            print(f"DEBUG: Generating TTS with Voice: '{voice_cleaned}' and Text: '{text[:50]}...'")
-            
-            # Create temp file
-            with tempfile.NamedTemporaryFile(suffix=".mp3", delete=False) as temp_mp3:
-                temp_path = temp_mp3.name
-            
-            # Edge TTS is async, so we wrap it
-            async def _run_tts():
-                communicate = edge_tts.Communicate(text, voice_cleaned)
-                await communicate.save(temp_path)
-            
-            # Run the async function synchronously
+    @staticmethod
+    def _synthesize_edge(text, voice_id, timeout):
+        VoiceService._ensure_site_packages()
+        import edge_tts
+        import asyncio
+
+        print(f"DEBUG: Generating TTS with Voice: '{voice_id}' and Text: '{text[:50]}...'")
+        with tempfile.NamedTemporaryFile(suffix=".mp3", delete=False) as temp_mp3:
+            temp_path = temp_mp3.name
+
+        # Edge TTS is async, so we wrap it
+        async def _run_tts():
+            communicate = edge_tts.Communicate(text, voice_id)
+            await asyncio.wait_for(communicate.save(temp_path), timeout=timeout)
+
+        try:
+            asyncio.run(_run_tts())
+        except Exception:
             try:
-                asyncio.run(_run_tts())
-            except Exception as async_err:
-                print(f"DEBUG: asyncio error in EdgeTTS: {async_err}")
-                raise async_err
-            
-            # Verify file size
-            if os.path.getsize(temp_path) == 0:
-                 raise Exception("Generated audio file is empty")
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+        return VoiceService._read_base64(temp_path)
 
-            # Read and encode to base64
-            with open(temp_path, "rb") as audio_file:
-                audio_bytes = audio_file.read()
-                audio_base64 = base64.b64encode(audio_bytes).decode('utf-8')
-                
+    @staticmethod
+    def _synthesize_gtts(text, timeout):
+        from gtts import gTTS
+
+        print("Falling back to gTTS (Female)")
+        tts = gTTS(text=text, lang='pt', slow=False, timeout=timeout)
+        with tempfile.NamedTemporaryFile(suffix=".mp3", delete=False) as temp_mp3:
+            temp_path = temp_mp3.name
+        try:
+            tts.save(temp_path)
+        except Exception:
             try:
                 os.remove(temp_path)
-            except:
+            except OSError:
                 pass
-                
-            return audio_base64
-        except Exception as e:
-            print(f"Error generating audio response with EdgeTTS: {e}")
-            # Fallback to gTTS if Edge fails
+            raise
+        return VoiceService._read_base64(temp_path)
+
+    @staticmethod
+    def _synthesize(text, voice_id, budget):
+        """
+        Returns (audio_base64, engine) with engine "edge" or "gtts", or (None, None).
+        Both engines together get at most `budget` seconds; an engine whose
+        circuit is open is skipped without being tried. A timeout only counts
+        against an engine's circuit when it had the whole VOICE_TTS_TIMEOUT.
+        """
+        limit = current_app.config.get('VOICE_TTS_TIMEOUT', 4)
+        deadline = time.monotonic() + budget
+        engines = (
+            ("edge", lambda timeout: VoiceService._synthesize_edge(text, voice_id, timeout)),
+            ("gtts", lambda timeout: VoiceService._synthesize_gtts(text, timeout)),
+        )
+        for engine, synthesize in engines:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                print("DEBUG: TTS budget exhausted before a voice was generated")
+                break
+            breaker = get_breaker(f"tts:{engine}")
+            if not breaker.allow():
+                print(f"DEBUG: TTS circuit {engine} open, skipping")
+                continue
             try:
-                from gtts import gTTS
-                print("Falling back to gTTS (Female)")
-                tts = gTTS(text=text, lang='pt', slow=False)
-                with tempfile.NamedTemporaryFile(suffix=".mp3", delete=False) as temp_mp3:
-                    tts.save(temp_mp3.name)
-                    temp_path = temp_mp3.name
-                
-                with open(temp_path, "rb") as audio_file:
-                    audio_bytes = audio_file.read()
-                    audio_base64 = base64.b64encode(audio_bytes).decode('utf-8')
-                
-                try:
-                    os.remove(temp_path)
-                except:
-                    pass
-                return audio_base64
-            except Exception as fallback_err:
-                 print(f"Fallback TTS failed too: {fallback_err}")
-                 return None
-            except:
-                return None
+                audio_base64 = synthesize(timeout)
+            except Exception as e:
+                if not cut_short(e, timeout, limit):
+                    breaker.record_failure()
+                print(f"Error generating audio response with {engine}: {e}")
+                continue
+            breaker.record_success()
+            return audio_base64, engine
+        return None, None
 
     @staticmethod
-    def process_text_command(text, user_id):
-        from app.models.task import Task
+    def process_text_command(text, user_id, use_nlu=True):
         from app.extensions import db
-        import re
-        from datetime import timedelta
         from app.services.learning_service import LearningService
 
-        text_original = text
         text = text.lower()
         
         # 0. APPLY USER VOCABULARY
         # This replaces user custom synonyms with system keywords
         # e.g. "detonar tarefa" -> "excluir tarefa"
         text = LearningService.apply_vocabulary(text, user_id)
+
+        snapshot = _TaskSnapshot(user_id)
+        commands = split_commands(text)
+        if len(commands) <= 1:
+            return VoiceService._run_command(text, user_id, snapshot, use_nlu=use_nlu)
+
+        # Compound utterance: every sub-command shares one task snapshot and one
+        # transaction, and the user hears a single combined reply
+        results = []
+        try:
+            for command in commands:
+                results.append(VoiceService._run_command(command, user_id, snapshot, use_nlu=use_nlu, batch=True))
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        return {
+            "intent": "multi_command",
+            "message": " ".join(r["message"] for r in results),
+            "data": {"commands": [
+                {"intent": r["intent"], "message": r["message"], "data": r["data"]} for r in results
+            ]},
+            "trigger_audio": True
+        }
+
+    @staticmethod
+    def _run_command(text, user_id, snapshot, use_nlu=True, batch=False):
+        """
+        Routes a single command. With `batch`, changes are only flushed and the
+        caller commits once for the whole utterance.
+        """
+        from app.models.task import Task
+        from app.extensions import db
+        from app.services.learning_service import LearningService
+        from app.services.nlu_service import NLUService
+        from app.services.sync_service import SyncService
+        from app.services.stats_service import StatsService
+
+        def _commit():
+            if batch:
+                db.session.flush()
+            else:
+                db.session.commit()
         
         response_text = ""
         intent = "unknown"
         data = None
         
-        # Helper to parse date from text
-        def parse_date_from_text(input_text):
-            parsed_date = None
-            if "amanhã" in input_text:
-                parsed_date = date.today() + timedelta(days=1)
-            elif "hoje" in input_text:
-                parsed_date = date.today()
-            else:
-                months = {
-                    "janeiro": 1, "fevereiro": 2, "março": 3, "abril": 4, "maio": 5, "junho": 6,
-                    "julho": 7, "agosto": 8, "setembro": 9, "outubro": 10, "novembro": 11, "dezembro": 12
-                }
-                # "dia 7 de dezembro"
-                date_match = re.search(r'dia\s+(\d+)\s+de\s+(\w+)', input_text)
-                if date_match:
-                    try:
-                        day = int(date_match.group(1))
-                        month = months.get(date_match.group(2))
-                        if month:
-                            today = date.today()
-                            year = today.year
-                            candidate = date(year, month, day)
-                            if candidate < today: candidate = date(year + 1, month, day)
-                            parsed_date = candidate
-                    except: pass
-                
-                if not parsed_date:
-                    # "dia 7"
-                    date_match_simple = re.search(r'dia\s+(\d+)', input_text)
-                    if date_match_simple:
-                        try:
-                            day = int(date_match_simple.group(1))
-                            today = date.today()
-                            parsed_date = date(today.year, today.month, day)
-                            if parsed_date < today:
-                                if today.month == 12: parsed_date = date(today.year + 1, 1, day)
-                                else: parsed_date = date(today.year, today.month + 1, day)
-                        except: pass
-            return parsed_date
-
         # --- Intent Logic ---
         
         # 0. LEARN VOCABULARY (New)
@@ -254,7 +538,7 @@ class VoiceService:
 
         # 1. CREATE TASK
         # Pattern: "nova tarefa [titulo] [metadata]"
-        elif "nova tarefa" in text or "adicionar tarefa" in text or "criar tarefa" in text:
+        elif re.search(_CREATE_TRIGGER, text):
             intent = "create_task"
             
             # Default values
@@ -284,24 +568,17 @@ class VoiceService:
             # 2. Extract Date (Deadline) within creation
             # Look for "para amanhã", "com prazo de até amanhã", "para o dia X"
             if "prazo" in text or "para" in text or "até" in text:
-                # Attempt to extract date part
-                # Heuristic: if we find date keywords, try to parse and remove
-                extracted_date = parse_date_from_text(text)
-                if extracted_date:
-                    task_due_date = extracted_date
-                    # Try to clean up text. This is harder because date phrases vary.
-                    # We'll rely on the regex below to capture the title part mostly.
-                    # Simple cleanup for common phrases:
-                    text = re.sub(r'(com )?prazo (de )?(até )?(amanhã|hoje)', '', text)
-                    text = re.sub(r'para (amanhã|hoje)', '', text)
-                    text = re.sub(r'(com )?prazo (de )?até o dia \d+( de \w+)?', '', text)
-                    # Note: imperfect removal but helps.
+                date_match = parse_date(text)
+                if date_match:
+                    task_due_date = date_match.date
+                    # Drop the date and its connective ("para", "com prazo de até") from the title
+                    text = strip_date(text, date_match)
             
             # 3. Extract Title
             # After removal, extract what's left after the command trigger
-            match = re.search(r'(nova tarefa|adicionar tarefa|criar tarefa)\s+(.+)', text)
+            match = re.search(_CREATE_TRIGGER + r'\s+(.+)', text)
             if match:
-                raw_title = match.group(2).strip()
+                raw_title = match.group(1).strip()
                 # Clean up any trailing connection words
                 title = re.sub(r'\s+(com|para)$', '', raw_title).capitalize()
                 
@@ -313,7 +590,8 @@ class VoiceService:
                     due_date=task_due_date
                 )
                 db.session.add(new_task)
-                db.session.commit()
+                _commit()
+                snapshot.add(new_task)
                 
                 date_str = "hoje" if task_due_date == date.today() else task_due_date.strftime('%d/%m')
                 response_text = f"Criei a tarefa {title} com prioridade {task_priority} para {date_str}."
@@ -321,13 +599,57 @@ class VoiceService:
             else:
                 response_text = "Entendi que você quer criar uma tarefa, mas não ouvi o título claramente."
 
+        # 1b. BULK OPERATIONS
+        # "concluir todas as tarefas de hoje", "excluir tarefas concluídas", "iniciar tarefas urgentes"
+        elif (bulk := parse_bulk_command(text)) is not None:
+            intent = f"bulk_{bulk.action}_tasks"
+
+            # One UPDATE/DELETE ... WHERE over the whole set, no task objects loaded
+            query = Task.query.filter(Task.user_id == user_id)
+            if bulk.statuses:
+                query = query.filter(Task.status.in_(bulk.statuses))
+            if bulk.priority:
+                query = query.filter(Task.priority == bulk.priority)
+            if bulk.due_date:
+                query = query.filter(Task.due_date == bulk.due_date)
+            if bulk.overdue:
+                query = query.filter(Task.due_date < date.today(), Task.status != TaskStatus.CONCLUIDA)
+
+            if bulk.action == "delete":
+                affected = SyncService.bulk_delete(query, user_id)
+            elif bulk.action == "complete":
+                affected = SyncService.bulk_update(
+                    query.filter(Task.status != TaskStatus.CONCLUIDA), user_id, {Task.status: TaskStatus.CONCLUIDA}
+                )
+            else:
+                affected = SyncService.bulk_update(
+                    query.filter(Task.status == TaskStatus.ENTRADA), user_id, {Task.status: TaskStatus.FAZENDO}
+                )
+            _commit()
+            # The statement bypassed the session: drop task objects loaded earlier in this utterance
+            db.session.expire_all()
+            snapshot.reset()
+
+            label = f" {bulk.label}" if bulk.label else ""
+            if affected == 0:
+                response_text = f"Não encontrei tarefas{label} para alterar."
+            elif bulk.action == "delete":
+                response_text = f"Pronto! Excluí {affected} tarefas{label}."
+            elif bulk.action == "complete":
+                response_text = f"Pronto! Marquei {affected} tarefas{label} como concluídas."
+            else:
+                response_text = f"Ótimo. Movi {affected} tarefas{label} para Fazendo."
+            data = {"affected_count": affected}
+
         # 2a. LIST ALL TASKS
         elif "todas" in text and "tarefas" in text and not any(x in text for x in ["excluir", "deletar", "apagar", "limpar"]):
             intent = "list_all_tasks"
             # Get pending tasks first
-            tasks = Task.query.filter(Task.user_id==user_id, Task.status != TaskStatus.CONCLUIDA).order_by(Task.due_date).limit(5).all()
+            with replica_reads(user_id):
+                tasks = Task.query.filter(Task.user_id==user_id, Task.status != TaskStatus.CONCLUIDA).order_by(Task.due_date).limit(5).all()
             count = len(tasks)
-            total_count = Task.query.filter(Task.user_id==user_id, Task.status != TaskStatus.CONCLUIDA).count()
+            # Precomputed counter instead of a COUNT(*) over the user's tasks
+            total_count = StatsService.pending_count(user_id)
             
             if count > 0:
                 task_titles = ", ".join([t.title for t in tasks])
@@ -340,7 +662,8 @@ class VoiceService:
         # 2b. LIST TASKS (TODAY)
         elif "hoje" in text and ("tarefas" in text or "agenda" in text) and "mudar" not in text:
             intent = "list_today_tasks"
-            tasks = Task.query.filter_by(user_id=user_id, due_date=date.today()).all()
+            with replica_reads(user_id):
+                tasks = Task.query.filter_by(user_id=user_id, due_date=date.today()).all()
             count = len(tasks)
             if count > 0:
                 task_titles = ", ".join([t.title for t in tasks[:3]]) # List first 3
@@ -351,14 +674,15 @@ class VoiceService:
             data = {"count": count, "tasks": [t.title for t in tasks]}
 
         # 2c. DELETE LAST TASK
-        elif "excluir" in text and ("última" in text or "ultima" in text):
+        elif ("excluir" in text or "exclua" in text) and ("última" in text or "ultima" in text):
              intent = "delete_last_task"
              # Find the most recently created task
              last_task = Task.query.filter_by(user_id=user_id).order_by(Task.created_at.desc()).first()
              
              if last_task:
                  db.session.delete(last_task)
-                 db.session.commit()
+                 _commit()
+                 snapshot.remove(last_task)
                  response_text = f"Excluí a última tarefa criada: {last_task.title}."
                  data = {"deleted_task_id": last_task.id}
              else:
@@ -366,17 +690,17 @@ class VoiceService:
 
         # 3. COMPLETE TASK
         # Pattern: "concluir tarefa [titulo]" or "marcar [titulo] como feita"
-        elif "concluir" in text or "terminar" in text or "feita" in text or "riscar" in text:
+        elif "concluir" in text or "conclua" in text or "terminar" in text or "termine" in text or "feita" in text or "riscar" in text:
             intent = "complete_task"
             from app.utils.string_utils import find_best_match
             
-            pending_tasks = Task.query.filter(Task.user_id==user_id, Task.status != TaskStatus.CONCLUIDA).all()
-            
             clean_text = text
             # Clean common command words to isolate title
-            clean_text = re.sub(r'\b(concluir|terminar|finalizar|marcar|como|feita|a|tarefa|de|da|o)\b', ' ', clean_text).strip()
+            clean_text = re.sub(r'\b(concluir|conclua|terminar|termine|finalizar|marcar|marque|como|feita|a|tarefa|de|da|o)\b', ' ', clean_text).strip()
             possible_title = clean_text
             
+            pending_tasks = snapshot.pending(possible_title, threshold=0.65)
+            
             target_task = None
             
             # 1. Fuzzy match
@@ -398,22 +722,22 @@ class VoiceService:
             
             if target_task:
                 target_task.status = TaskStatus.CONCLUIDA
-                db.session.commit()
+                _commit()
                 response_text = f"Pronto! Marquei a tarefa {target_task.title} como concluída."
             else:
                 response_text = "Não encontrei essa tarefa pendente. Pode repetir o nome exato?"
 
         # 4. MOVE TO DOING (Start task)
-        elif "começar" in text or "iniciar" in text or "fazendo" in text:
+        elif "começar" in text or "comece" in text or "iniciar" in text or "inicie" in text or "fazendo" in text:
             intent = "start_task"
             from app.utils.string_utils import find_best_match
             
-            pending_tasks = Task.query.filter(Task.user_id==user_id, Task.status == TaskStatus.ENTRADA).all()
-            
             clean_text = text
-            clean_text = re.sub(r'\b(começar|iniciar|colocar|em|fazendo|a|tarefa|de|da)\b', ' ', clean_text).strip()
+            clean_text = re.sub(r'\b(começar|comece|iniciar|inicie|colocar|em|fazendo|a|tarefa|de|da)\b', ' ', clean_text).strip()
             possible_title = clean_text
             
+            pending_tasks = snapshot.inbox(possible_title, threshold=0.7)
+            
             target_task = None
             
             # 1. Fuzzy match
@@ -431,7 +755,7 @@ class VoiceService:
 
             if target_task:
                 target_task.status = TaskStatus.FAZENDO
-                db.session.commit()
+                _commit()
                 response_text = f"Ótimo. Movi {target_task.title} para Fazendo."
             else:
                 response_text = "Não encontrei essa tarefa na Entrada para iniciar."
@@ -467,7 +791,7 @@ class VoiceService:
                 possible_title = clean_text.strip()
                 
                 # 3. Find and Update Task
-                all_tasks = Task.query.filter_by(user_id=user_id).all()
+                all_tasks = snapshot.all(possible_title, threshold=0.7)
                 target_task = None
                 
                 # Use fuzzy match
@@ -488,7 +812,7 @@ class VoiceService:
                             
                 if target_task:
                     target_task.status = new_status
-                    db.session.commit()
+                    _commit()
                     response_text = f"Entendido. Mudei o status de {target_task.title} para {status_label}."
                 else:
                     response_text = f"Não encontrei a tarefa referente a '{possible_title}'."
@@ -497,7 +821,7 @@ class VoiceService:
 
         # 6. UPDATE DATE
         # Keywords: mudar, alterar, definir, agendar, postergar, antecipar + data/prazo
-        elif ("mudar" in text or "alterar" in text or "definir" in text or "agendar" in text or "prazo" in text) and ("data" in text or "prazo" in text or "dia" in text or "para" in text):
+        elif (re.search(r'\b(mud(ar|e)|alter(ar|e)|defin(ir|a)|agend(ar|e))\b', text) or "prazo" in text) and ("data" in text or "prazo" in text or "dia" in text or "para" in text) and not re.search(r't[íi]tulo', text):
             intent = "update_task_date"
             from app.utils.string_utils import find_best_match
             
@@ -505,52 +829,10 @@ class VoiceService:
             date_str_found = ""
 
             # 1. Parsing Date Logic
-            months = {
-                "janeiro": 1, "fevereiro": 2, "março": 3, "abril": 4, "maio": 5, "junho": 6,
-                "julho": 7, "agosto": 8, "setembro": 9, "outubro": 10, "novembro": 11, "dezembro": 12
-            }
-
-            if "amanhã" in text:
-                new_date = date.today() + timedelta(days=1)
-                date_str_found = "amanhã"
-            elif "hoje" in text:
-                new_date = date.today()
-                date_str_found = "hoje"
-            else:
-                # Regex for "20 de dezembro", "dia 20 de dezembro", "20/12"
-                # Matches: (dia )?(\d+) (de )?(\w+)
-                date_match = re.search(r'(dia\s+)?(\d+)\s+de\s+(\w+)', text)
-                if date_match:
-                    try:
-                        day = int(date_match.group(2))
-                        month_name = date_match.group(3)
-                        month = months.get(month_name)
-                        if month:
-                            today = date.today()
-                            year = today.year
-                            candidate = date(year, month, day)
-                            if candidate < today: candidate = date(year + 1, month, day)
-                            new_date = candidate
-                            date_str_found = date_match.group(0)
-                    except: pass
-                
-                if not new_date:
-                     # Simpler regex "dia 20" or just "20" (riskier, assumes prior keywords filtered context)
-                     # Let's stick to "dia 20" for safety or look for patterns after "para"
-                     date_match_simple = re.search(r'dia\s+(\d+)', text)
-                     if date_match_simple:
-                        try:
-                            day = int(date_match_simple.group(1))
-                            today = date.today()
-                            candidate = date(today.year, today.month, day)
-                            if candidate < today: 
-                                # Move to next month
-                                m = today.month + 1 if today.month < 12 else 1
-                                y = today.year if today.month < 12 else today.year + 1
-                                candidate = date(y, m, day)
-                            new_date = candidate
-                            date_str_found = date_match_simple.group(0)
-                        except: pass
+            date_match = parse_date(text)
+            if date_match:
+                new_date = date_match.date
+                date_str_found = date_match.text
 
             if new_date:
                 # 2. Extract Task Title
@@ -559,13 +841,13 @@ class VoiceService:
                 
                 # Remove command keywords
                 # "altere a tarefa acordar ... para o prazo de ..." -> "acordar"
-                clean_text = re.sub(r'(alterar|altere|mudar|definir|agendar|nova data|o prazo|a data|prazo|data|para|de|da|do|na|no|tarefa)', ' ', clean_text)
+                clean_text = re.sub(r'(alterar|altere|mudar|mude|definir|defina|agendar|agende|nova data|o prazo|a data|prazo|data|para|de|da|do|na|no|tarefa)', ' ', clean_text)
                 clean_text = re.sub(r'\s+', ' ', clean_text).strip()
                 
                 possible_title = clean_text
                 
                 # 3. Find Task (Fuzzy)
-                pending_tasks = Task.query.filter(Task.user_id==user_id, Task.status != TaskStatus.CONCLUIDA).all()
+                pending_tasks = snapshot.pending(possible_title)
                 task_options = [(t, t.title) for t in pending_tasks]
                 
                 target_task = find_best_match(possible_title, task_options, threshold=0.6)
@@ -579,7 +861,7 @@ class VoiceService:
                             
                 if target_task:
                     target_task.due_date = new_date
-                    db.session.commit()
+                    _commit()
                     response_text = f"Entendido. Alterei a data de '{target_task.title}' para {new_date.strftime('%d/%m')}."
                 else:
                     # Try finding ANY task if the title was completely eaten by regex
@@ -594,31 +876,35 @@ class VoiceService:
              
              # Delete all tasks for the user
              try:
-                 num_deleted = Task.query.filter_by(user_id=user_id).delete()
-                 db.session.commit()
+                 num_deleted = SyncService.bulk_delete(Task.query.filter_by(user_id=user_id), user_id)
+                 _commit()
+                 db.session.expire_all()
+                 snapshot.reset()
                  if num_deleted > 0:
                      response_text = f"Entendido. Excluí todas as suas {num_deleted} tarefas."
                  else:
                      response_text = "Você não tem tarefas para excluir."
                  data = {"deleted_count": num_deleted}
              except Exception as e:
+                 if batch:
+                     raise
                  db.session.rollback()
                  response_text = "Tive um problema ao excluir todas as tarefas."
 
         # 7. DELETE TASK
-        elif "excluir" in text or "deletar" in text or "remover" in text or "apagar" in text:
+        elif "excluir" in text or "exclua" in text or "deletar" in text or "delete" in text or "remover" in text or "remova" in text or "apagar" in text or "apague" in text:
             intent = "delete_task"
             from app.utils.string_utils import find_best_match
             
             # Clean text to isolate title
             # "excluir tarefa de lançar frequência" -> "lançar frequência"
             clean_text = text
-            clean_text = re.sub(r'(excluir|deletar|remover|apagar) (a )?tarefa (de )?', '', clean_text)
+            clean_text = re.sub(r'(excluir|exclua|deletar|delete|remover|remova|apagar|apague) (a )?tarefa (de )?', '', clean_text)
             
             possible_title = clean_text.strip()
             
             if possible_title:
-                all_tasks = Task.query.filter_by(user_id=user_id).all()
+                all_tasks = snapshot.all(possible_title, threshold=0.7)
                 target_task = None
                 
                 # 1. Prepare options for fuzzy search: (task, task.title)
@@ -643,7 +929,8 @@ class VoiceService:
                             
                 if target_task:
                     db.session.delete(target_task)
-                    db.session.commit()
+                    _commit()
+                    snapshot.remove(target_task)
                     response_text = f"Entendido. Excluí a tarefa {target_task.title}."
                     # Return deleted task id for frontend if needed
                     data = {"deleted_task_id": target_task.id}
@@ -677,7 +964,7 @@ class VoiceService:
                     old_possible_title = old_possible_title.strip()
                     
                     if old_possible_title and new_title:
-                        all_tasks = Task.query.filter_by(user_id=user_id).all()
+                        all_tasks = snapshot.all(old_possible_title)
                         target_task = None
                         
                         # Find task
@@ -695,7 +982,7 @@ class VoiceService:
                         if target_task:
                             old_name = target_task.title
                             target_task.title = new_title.capitalize()
-                            db.session.commit()
+                            _commit()
                             response_text = f"Entendido. Renomeei a tarefa '{old_name}' para '{target_task.title}'."
                             data = {"task_id": target_task.id, "new_title": target_task.title}
                         else:
@@ -716,6 +1003,16 @@ class VoiceService:
 
         else:
             intent = "unknown"
+
+            # Only unmatched utterances pay for the NLU fallback; it rewrites them
+            # into a canonical command and the cascade above runs once more
+            nlu_result = NLUService.classify(text) if use_nlu else None
+            if nlu_result:
+                print(f"DEBUG: NLU mapped '{text}' to {nlu_result.intent} -> '{nlu_result.command}'")
+                result = VoiceService._run_command(nlu_result.command, user_id, snapshot, use_nlu=False, batch=batch)
+                result["nlu"] = {"intent": nlu_result.intent, "confidence": nlu_result.confidence}
+                return result
+
             # Basic conversational fallback
             if "olá" in text or "oi" in text:
                 response_text = "Olá! Como posso ajudar com suas tarefas hoje?"
@@ -730,15 +1027,20 @@ class VoiceService:
         }
 
     @classmethod
-    def process_audio_command(cls, audio_file_path, user_id, voice_id=None):
+    def process_audio_command(cls, audio_source, user_id, voice_id=None, audio_format=None):
         # 1. Transcribe
-        transcribed_text = cls._transcribe_audio(audio_file_path)
+        transcribed_text, audio_stats = cls._transcribe_audio(audio_source, audio_format)
         
         if not transcribed_text:
+            if audio_stats.get("silent"):
+                message = "Não ouvi nenhuma fala. Segure o botão e fale o comando."
+            else:
+                message = "Não consegui ouvir nada. Tente novamente."
             return {
                 "success": False,
-                "message": "Não consegui ouvir nada. Tente novamente.",
-                "audio_base64": cls._generate_audio_response("Não consegui ouvir nada. Tente novamente.", voice_id)
+                "message": message,
+                "audio_stats": audio_stats,
+                "audio_base64": cls._generate_audio_response(message, voice_id)
             }
             
         # 2. Process Intent
@@ -749,6 +1051,7 @@ class VoiceService:
         
         result['audio_base64'] = audio_base64
         result['transcription'] = transcribed_text
+        result['audio_stats'] = audio_stats
         result['success'] = True
         
         return result
@@ -0,0 +1,101 @@
+import struct
+from collections import namedtuple
+
+AudioInfo = namedtuple('AudioInfo', [
+    'container',     # 'wav', 'ogg', 'webm', 'mp3', 'mp4', 'flac' or None
+    'codec',         # 'pcm_s16le', 'opus', 'vorbis', ... or None when unknown
+    'sample_rate',
+    'channels',
+    'sample_width',  # bytes per sample (PCM only)
+    'duration_ms',   # known from headers without decoding, else None
+    'data_offset',   # byte offset of the PCM payload (WAV only)
+    'data_size',
+])
+
+UNKNOWN = AudioInfo(None, None, None, None, None, None, None, None)
+
+# What the capability endpoint advertises as the cheapest upload
+PREFERRED_UPLOAD = {
+    "mime_type": "audio/wav",
+    "codec": "pcm_s16le",
+    "sample_rate": 16000,
+    "channels": 1,
+}
+
+_WAVE_FORMAT_PCM = 0x0001
+_WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+def _sniff_wav(stream, total_size):
+    # RIFF header is 12 bytes; walk the chunks until 'fmt ' and 'data' are found
+    stream.seek(12)
+    fmt = None
+    while True:
+        header = stream.read(8)
+        if len(header) < 8:
+            return UNKNOWN._replace(container='wav')
+        chunk_id, chunk_size = struct.unpack('<4sI', header)
+        if chunk_id == b'fmt ':
+            body = stream.read(chunk_size)
+            if len(body) < 16:
+                return UNKNOWN._replace(container='wav')
+            audio_format, channels, rate, byte_rate, _, bits = struct.unpack('<HHIIHH', body[:16])
+            if audio_format == _WAVE_FORMAT_EXTENSIBLE and len(body) >= 26:
+                audio_format = struct.unpack('<H', body[24:26])[0]
+            fmt = (audio_format, channels, rate, byte_rate, bits)
+            if chunk_size & 1:
+                stream.seek(1, 1)
+        elif chunk_id == b'data':
+            if fmt is None:
+                return UNKNOWN._replace(container='wav')
+            audio_format, channels, rate, byte_rate, bits = fmt
+            data_offset = stream.tell()
+            # Streaming writers leave the size as 0 or 0xFFFFFFFF
+            if chunk_size in (0, 0xFFFFFFFF) or data_offset + chunk_size > total_size:
+                chunk_size = total_size - data_offset
+            codec = f"pcm_s{bits}le" if audio_format == _WAVE_FORMAT_PCM else f"wav_0x{audio_format:04x}"
+            duration_ms = int(chunk_size * 1000 / byte_rate) if byte_rate else None
+            return AudioInfo('wav', codec, rate, channels, bits // 8, duration_ms, data_offset, chunk_size)
+        else:
+            # Chunks are word-aligned
+            stream.seek(chunk_size + (chunk_size & 1), 1)
+
+def sniff_audio(stream):
+    """
+    Identifies container, codec and sample rate from the first bytes of a seekable
+    binary stream, without decoding. The stream position is restored.
+    """
+    position = stream.tell()
+    try:
+        stream.seek(0, 2)
+        total_size = stream.tell()
+        stream.seek(0)
+        head = stream.read(64)
+
+        if head[:4] == b'RIFF' and head[8:12] == b'WAVE':
+            return _sniff_wav(stream, total_size)
+        if head[:4] == b'OggS':
+            # The first page carries the codec identification header at byte 28
+            if head[28:36] == b'OpusHead':
+                channels = head[37]
+                return AudioInfo('ogg', 'opus', 48000, channels, None, None, None, None)
+            if head[28:35] == b'\x01vorbis':
+                channels = head[39]
+                rate = struct.unpack('<I', head[40:44])[0]
+                return AudioInfo('ogg', 'vorbis', rate, channels, None, None, None, None)
+            return UNKNOWN._replace(container='ogg')
+        if head[:4] == b'\x1a\x45\xdf\xa3':
+            # Matroska/WebM: browsers record Opus here, but the codec lives deep in the EBML tree
+            return UNKNOWN._replace(container='webm')
+        if head[:4] == b'fLaC':
+            return UNKNOWN._replace(container='flac', codec='flac')
+        if head[4:8] == b'ftyp':
+            return UNKNOWN._replace(container='mp4')
+        if head[:3] == b'ID3' or (len(head) > 1 and head[0] == 0xFF and head[1] & 0xE0 == 0xE0):
+            return UNKNOWN._replace(container='mp3', codec='mp3')
+        return UNKNOWN
+    finally:
+        stream.seek(position)
+
+def is_direct_pcm(info):
+    """True when the payload is 16-bit PCM WAV that can skip ffmpeg entirely."""
+    return info.container == 'wav' and info.codec == 'pcm_s16le' and info.data_offset is not None
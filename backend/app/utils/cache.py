@@ -0,0 +1,227 @@
+import json
+import threading
+import time
+from collections import defaultdict
+from app.utils.ttl_cache import TTLCache
+
+_MISSING = object()
+
+def _weigh(value):
+    """Approximate size of a cached value, in bytes."""
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    return len(json.dumps(value, default=str))
+
+class MemoryBackend:
+    """
+    Per-process TTL/LRU store. Each worker has its own copy.
+
+    Namespaces listed in `limits` ({name: {"maxsize": n, "maxbytes": n}}) get a
+    store of their own, so large values (synthesized audio) cannot push the
+    small, hot ones (profiles, sticky markers) out of the shared LRU.
+    """
+
+    def __init__(self, maxsize, default_ttl, key_prefix='ocastro', limits=None):
+        self._entries = TTLCache(maxsize=maxsize, ttl=default_ttl)
+        self._key_prefix = f"{key_prefix}:"
+        self._stores = {
+            name: TTLCache(maxsize=limit.get('maxsize') or maxsize, ttl=default_ttl,
+                           maxbytes=limit.get('maxbytes'), weigh=_weigh)
+            for name, limit in (limits or {}).items()
+        }
+        # Generations never expire or get evicted: losing one would resurrect stale entries
+        self._counters = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def _store(self, key):
+        if self._stores and key.startswith(self._key_prefix):
+            namespace = key[len(self._key_prefix):].partition(':')[0]
+            return self._stores.get(namespace, self._entries)
+        return self._entries
+
+    def get(self, key):
+        return self._store(key).get(key, _MISSING)
+
+    def set(self, key, value, ttl):
+        self._store(key).set(key, value, ttl)
+
+    def add(self, key, value, ttl):
+        return self._store(key).add(key, value, ttl)
+
+    def delete(self, key):
+        self._store(key).pop(key)
+
+    def counter(self, key):
+        return self._counters.get(key, 0)
+
+    def incr(self, key):
+        with self._lock:
+            self._counters[key] += 1
+            return self._counters[key]
+
+class RedisBackend:
+    """
+    Shared store over the Redis protocol (Redis, Valkey, KeyDB, or any local
+    stand-in server speaking RESP). Values are stored as JSON.
+    """
+
+    def __init__(self, url, socket_timeout):
+        import redis
+        self._client = redis.Redis.from_url(url, socket_timeout=socket_timeout, socket_connect_timeout=socket_timeout)
+
+    @staticmethod
+    def _ttl(ttl):
+        return max(1, int(ttl))
+
+    def get(self, key):
+        raw = self._client.get(key)
+        return _MISSING if raw is None else json.loads(raw)
+
+    def set(self, key, value, ttl):
+        self._client.set(key, json.dumps(value), ex=self._ttl(ttl))
+
+    def add(self, key, value, ttl):
+        return bool(self._client.set(key, json.dumps(value), ex=self._ttl(ttl), nx=True))
+
+    def delete(self, key):
+        self._client.delete(key)
+
+    def counter(self, key):
+        return int(self._client.get(key) or 0)
+
+    def incr(self, key):
+        return self._client.incr(key)
+
+class CacheNamespace:
+    """
+    Keys of one feature ("profile", "stt", ...). Keys passed with `user_id` are
+    scoped to that user and dropped together by `invalidate_user`.
+    """
+
+    def __init__(self, cache, name, ttl=None):
+        self._cache = cache
+        self.name = name
+        self.ttl = ttl
+
+    def _key(self, key, user_id):
+        prefix = f"{self._cache.key_prefix}:{self.name}"
+        if user_id is None:
+            return f"{prefix}:{key}"
+        # Bumping the user's generation orphans every key built with the old one
+        generation = self._cache._call('counter', self._generation_key(user_id), default=0)
+        return f"{prefix}:u{user_id}:g{generation}:{key}"
+
+    def _generation_key(self, user_id):
+        return f"{self._cache.key_prefix}:gen:{self.name}:u{user_id}"
+
+    def _ttl(self, ttl):
+        return ttl if ttl is not None else (self.ttl if self.ttl is not None else self._cache.default_ttl)
+
+    def get(self, key, default=None, user_id=None):
+        value = self._cache._call('get', self._key(key, user_id), default=_MISSING)
+        self._cache._count(self.name, 'misses' if value is _MISSING else 'hits')
+        return default if value is _MISSING else value
+
+    def set(self, key, value, ttl=None, user_id=None):
+        self._cache._call('set', self._key(key, user_id), value, self._ttl(ttl))
+
+    def add(self, key, value, ttl=None, user_id=None):
+        """Stores `value` only if the key is absent; returns whether it did."""
+        return self._cache._call('add', self._key(key, user_id), value, self._ttl(ttl), default=False)
+
+    def delete(self, key, user_id=None):
+        self._cache._call('delete', self._key(key, user_id))
+
+    def invalidate_user(self, user_id):
+        """
+        Drops the user's keys. With the memory backend the generation counter
+        lives in this process, so other workers keep serving their own copies
+        until those expire; use CACHE_BACKEND=redis when that matters.
+        """
+        self._cache._call('incr', self._generation_key(user_id))
+
+    def get_or_set(self, key, producer, ttl=None, user_id=None):
+        """
+        Returns the cached value or computes it with `producer()`. Concurrent
+        misses on the same key (in any worker sharing the backend) wait for a
+        single computation instead of stampeding. None results are not cached.
+        """
+        full_key = self._key(key, user_id)
+        value = self._cache._call('get', full_key, default=_MISSING)
+        if value is not _MISSING:
+            self._cache._count(self.name, 'hits')
+            return value
+        self._cache._count(self.name, 'misses')
+
+        lock_key = f"{full_key}:lock"
+        lock_timeout = self._cache.lock_timeout
+        if not self._cache._call('add', lock_key, 1, lock_timeout, default=True):
+            # Someone else is computing it: wait for their result, up to the lock timeout
+            deadline = time.monotonic() + lock_timeout
+            while time.monotonic() < deadline:
+                time.sleep(0.05)
+                value = self._cache._call('get', full_key, default=_MISSING)
+                if value is not _MISSING:
+                    self._cache._count(self.name, 'coalesced')
+                    return value
+                if self._cache._call('get', lock_key, default=_MISSING) is _MISSING:
+                    break
+
+        try:
+            value = producer()
+            if value is not None:
+                self._cache._call('set', full_key, value, self._ttl(ttl))
+            return value
+        finally:
+            self._cache._call('delete', lock_key)
+
+class Cache:
+    """
+    Shared cache extension. CACHE_BACKEND picks 'memory' (per process) or
+    'redis' (CACHE_REDIS_URL, shared by every worker). Backend errors never
+    fail a request: they count as misses.
+    """
+
+    def __init__(self, app=None):
+        self.backend = None
+        self.key_prefix = 'ocastro'
+        self.default_ttl = 300
+        self.lock_timeout = 5
+        self._stats = defaultdict(lambda: defaultdict(int))
+        self._stats_lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        config = app.config
+        self.key_prefix = config.get('CACHE_KEY_PREFIX', 'ocastro')
+        self.default_ttl = config.get('CACHE_DEFAULT_TTL', 300)
+        self.lock_timeout = config.get('CACHE_LOCK_TIMEOUT', 5)
+
+        if config.get('CACHE_BACKEND', 'memory') == 'redis':
+            self.backend = RedisBackend(config['CACHE_REDIS_URL'], config.get('CACHE_REDIS_TIMEOUT', 0.5))
+        else:
+            self.backend = MemoryBackend(
+                config.get('CACHE_MAX_ENTRIES', 10000), self.default_ttl,
+                self.key_prefix, config.get('CACHE_NAMESPACE_LIMITS')
+            )
+        app.extensions['cache'] = self
+
+    def namespace(self, name, ttl=None):
+        return CacheNamespace(self, name, ttl)
+
+    def _call(self, method, *args, default=None):
+        try:
+            return getattr(self.backend, method)(*args)
+        except Exception as e:
+            print(f"DEBUG: Cache backend {method} failed: {e}")
+            return default
+
+    def _count(self, namespace, what):
+        with self._stats_lock:
+            self._stats[namespace][what] += 1
+
+    def stats(self):
+        """Hit/miss counters of this process, per namespace."""
+        with self._stats_lock:
+            return {name: dict(counters) for name, counters in self._stats.items()}
@@ -0,0 +1,71 @@
+import threading
+import time
+from flask import current_app
+
+class CircuitBreaker:
+    """
+    Per-process breaker for one external backend. After `threshold` failures
+    in a row it opens and `allow()` answers False for `cooldown` seconds; then
+    a single trial call goes through, and its outcome closes the breaker or
+    keeps it open for another cool-down.
+    """
+
+    def __init__(self, name, threshold, cooldown):
+        self.name = name
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._failures = 0
+        self._opened_at = None
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.cooldown:
+                return False
+            # Let this call probe the backend; others keep skipping it meanwhile
+            self._opened_at = time.monotonic()
+            return True
+
+    def record_success(self):
+        with self._lock:
+            if self._opened_at is not None:
+                print(f"DEBUG: Circuit {self.name} closed")
+            self._failures = 0
+            self._opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._opened_at is not None or self._failures >= self.threshold:
+                if self._opened_at is None:
+                    print(f"DEBUG: Circuit {self.name} opened after {self._failures} failures")
+                self._opened_at = time.monotonic()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            return "open" if time.monotonic() - self._opened_at < self.cooldown else "half_open"
+
+_breakers = {}
+_lock = threading.Lock()
+
+def get_breaker(name):
+    """The process-wide breaker for backend `name`, created from the CIRCUIT_* settings."""
+    breaker = _breakers.get(name)
+    if breaker is None:
+        with _lock:
+            breaker = _breakers.get(name)
+            if breaker is None:
+                config = current_app.config
+                breaker = CircuitBreaker(
+                    name, config.get('CIRCUIT_FAILURE_THRESHOLD', 3), config.get('CIRCUIT_COOLDOWN', 30)
+                )
+                _breakers[name] = breaker
+    return breaker
+
+def breaker_states():
+    return {name: breaker.state for name, breaker in sorted(_breakers.items())}
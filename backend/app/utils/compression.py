@@ -0,0 +1,55 @@
+import gzip
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Audio, images and archives are already compressed; only text payloads are worth it
+COMPRESSIBLE_MIMETYPES = {
+    'application/json',
+    'application/javascript',
+    'text/html',
+    'text/plain',
+    'text/css',
+    'text/csv',
+}
+
+def _supported_encodings():
+    return ['br', 'gzip'] if brotli is not None else ['gzip']
+
+def compress_response(response):
+    """after_request hook: negotiates br/gzip for text responses above COMPRESS_MIN_SIZE."""
+    config = current_app.config
+    if not config.get('COMPRESS_ENABLED', True):
+        return response
+    if response.direct_passthrough or response.is_streamed:
+        return response
+    if response.status_code < 200 or response.status_code >= 300 or response.status_code == 204:
+        return response
+    if 'Content-Encoding' in response.headers:
+        return response
+    if response.mimetype not in COMPRESSIBLE_MIMETYPES:
+        return response
+
+    response.vary.add('Accept-Encoding')
+
+    body = response.get_data()
+    if len(body) < config.get('COMPRESS_MIN_SIZE', 1024):
+        return response
+
+    encoding = request.accept_encodings.best_match(_supported_encodings())
+    if encoding == 'br':
+        compressed = brotli.compress(body, quality=config.get('COMPRESS_BR_LEVEL', 4))
+    elif encoding == 'gzip':
+        compressed = gzip.compress(body, compresslevel=config.get('COMPRESS_LEVEL', 6))
+    else:
+        return response
+
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+def init_compression(app):
+    app.after_request(compress_response)
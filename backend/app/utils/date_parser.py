@@ -0,0 +1,137 @@
+import re
+from collections import namedtuple
+from datetime import date, timedelta
+
+DateMatch = namedtuple('DateMatch', ['date', 'text', 'start', 'end'])
+
+MONTHS = {
+    "janeiro": 1, "fevereiro": 2, "março": 3, "marco": 3, "abril": 4, "maio": 5, "junho": 6,
+    "julho": 7, "agosto": 8, "setembro": 9, "outubro": 10, "novembro": 11, "dezembro": 12
+}
+
+WEEKDAYS = {
+    "segunda": 0, "terça": 1, "terca": 1, "quarta": 2, "quinta": 3,
+    "sexta": 4, "sábado": 5, "sabado": 5, "domingo": 6
+}
+
+NUMBER_WORDS = {
+    "um": 1, "uma": 1, "dois": 2, "duas": 2, "três": 3, "tres": 3, "quatro": 4, "cinco": 5,
+    "seis": 6, "sete": 7, "oito": 8, "nove": 9, "dez": 10, "quinze": 15, "vinte": 20, "trinta": 30
+}
+
+_NUMBER = r"\d{1,3}|" + "|".join(sorted(NUMBER_WORDS, key=len, reverse=True))
+_MONTH = "|".join(sorted(MONTHS, key=len, reverse=True))
+_WEEKDAY = "|".join(sorted(WEEKDAYS, key=len, reverse=True))
+
+# One alternation, compiled once: a single left-to-right scan finds the first
+# date expression. Longer phrases come first so "depois de amanhã" beats "amanhã".
+_DATE_RE = re.compile(rf"""
+    (?P<after_tomorrow>\bdepois\s+de\s+amanh[ãa]\b)
+  | (?P<tomorrow>\bamanh[ãa]\b)
+  | (?P<today>\bhoje\b)
+  | \b(?:daqui\s+a|em|dentro\s+de)\s+(?P<in_n>{_NUMBER})\s+(?P<in_unit>dias?|semanas?)\b
+  | (?P<next_week>\bsemana\s+que\s+vem\b|\bpr[óo]xima\s+semana\b)
+  | (?P<wd_prefix>\b(?:na|no|nesta|neste|pr[óo]xim[ao]|at[ée]|para|pra)\s+(?:a\s+|o\s+)?)?
+    \b(?P<weekday>{_WEEKDAY})(?P<feira>-feira|\s+feira)?\b
+    (?P<wd_next>\s+(?:da\s+semana\s+que\s+vem|da\s+pr[óo]xima\s+semana|que\s+vem))?
+  | \b(?P<num_day>\d{{1,2}})/(?P<num_month>\d{{1,2}})(?:/(?P<num_year>\d{{2}}|\d{{4}}))?\b
+  | (?:\bdia\s+)?\b(?P<day_of_month>\d{{1,2}})\s+de\s+(?P<month>{_MONTH})\b
+  | \bdia\s+(?P<day>\d{{1,2}})\b
+""", re.VERBOSE | re.IGNORECASE)
+
+# Nouns an ordinal "segunda"/"terça"/... qualifies: "a segunda tarefa" is not Monday
+_ORDINAL_NOUN_RE = re.compile(
+    r"\s+(?:tarefas?|itens|item|op[çc](?:[ãa]o|[õo]es)|vez|coisas?|linhas?|listas?|partes?|etapas?|pend[êe]ncias?|notas?|lembretes?|reuni[ãõ]o(?:es)?)\b",
+    re.IGNORECASE
+)
+
+# Connectives that introduce a deadline: "com prazo de até", "para o", "até a", ...
+_LEADING_CONNECTIVE_RE = re.compile(
+    r"\s*(?:\b(?:com\s+)?prazo\s+(?:de\s+)?)?(?:\bat[ée]\s+)?(?:\bpara\s+|\bpra\s+)?(?:\bo\s+|\ba\s+)?$",
+    re.IGNORECASE
+)
+
+def _number(token):
+    token = token.lower()
+    return int(token) if token.isdigit() else NUMBER_WORDS[token]
+
+def _next_month_day(today, day):
+    """`day` of this month, or of next month if it already passed."""
+    candidate = date(today.year, today.month, day)
+    if candidate < today:
+        if today.month == 12:
+            return date(today.year + 1, 1, day)
+        return date(today.year, today.month + 1, day)
+    return candidate
+
+def _next_year_date(today, month, day, year=None):
+    if year is not None:
+        return date(year, month, day)
+    candidate = date(today.year, month, day)
+    if candidate < today:
+        candidate = date(today.year + 1, month, day)
+    return candidate
+
+def _resolve(m, today):
+    if m.group('after_tomorrow'):
+        return today + timedelta(days=2)
+    if m.group('tomorrow'):
+        return today + timedelta(days=1)
+    if m.group('today'):
+        return today
+    if m.group('in_n'):
+        n = _number(m.group('in_n'))
+        days = n * 7 if m.group('in_unit').lower().startswith('semana') else n
+        return today + timedelta(days=days)
+    if m.group('next_week'):
+        # Monday of next week
+        return today + timedelta(days=7 - today.weekday())
+    if m.group('weekday'):
+        if not m.group('feira') and not m.group('wd_next'):
+            # A bare "segunda" is more often "a segunda tarefa" than a date, and
+            # a prefix is not enough either when a noun follows ("para a segunda tarefa")
+            if not m.group('wd_prefix') or _ORDINAL_NOUN_RE.match(m.string, m.end()):
+                return None
+        weekday = WEEKDAYS[m.group('weekday').lower()]
+        if m.group('wd_next'):
+            next_monday = today + timedelta(days=7 - today.weekday())
+            return next_monday + timedelta(days=weekday)
+        days_ahead = (weekday - today.weekday()) % 7 or 7
+        return today + timedelta(days=days_ahead)
+    if m.group('num_day'):
+        year = m.group('num_year')
+        if year is not None:
+            year = int(year) + (2000 if len(year) == 2 else 0)
+        return _next_year_date(today, int(m.group('num_month')), int(m.group('num_day')), year)
+    if m.group('day_of_month'):
+        return _next_year_date(today, MONTHS[m.group('month').lower()], int(m.group('day_of_month')))
+    if m.group('day'):
+        return _next_month_day(today, int(m.group('day')))
+    return None
+
+def parse_date(text, today=None):
+    """
+    Finds the first Portuguese date expression in `text`.
+
+    Understands "hoje", "amanhã", "depois de amanhã", weekdays ("na sexta",
+    "segunda-feira", "terça que vem"), "semana que vem", "daqui a N dias/semanas",
+    "dd/mm[/aaaa]", "[dia] N de <mês>" and "dia N". Dates without a year (or month)
+    roll forward to the next occurrence.
+
+    :return: DateMatch(date, text, start, end) or None.
+    """
+    today = today or date.today()
+    for m in _DATE_RE.finditer(text):
+        try:
+            parsed = _resolve(m, today)
+        except (ValueError, KeyError):
+            # "dia 31" in a 30-day month, "31/02", ...: keep scanning
+            continue
+        if parsed is not None:
+            return DateMatch(parsed, m.group(0), m.start(), m.end())
+    return None
+
+def strip_date(text, date_match):
+    """Removes a parsed date and its leading connective ("para", "com prazo de até", ...) from `text`."""
+    before = _LEADING_CONNECTIVE_RE.sub('', text[:date_match.start])
+    return re.sub(r'\s+', ' ', f"{before} {text[date_match.end:]}").strip()
@@ -0,0 +1,123 @@
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from flask import current_app
+from flask_jwt_extended import get_jwt_identity
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, text
+from sqlalchemy.sql import Select
+
+REPLICA = 'replica'
+
+_lag_state = {"checked_at": None, "ok": False}
+_lag_lock = threading.Lock()
+
+class RoutingSession(Session):
+    """
+    Session that sends plain SELECTs to the 'replica' bind inside
+    `replica_reads()`. Flushes, writes, SELECT ... FOR UPDATE and bare
+    `session.connection()` calls always get the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (
+            bind is None
+            and self.info.get('use_replica')
+            and not self._flushing
+            and isinstance(clause, Select)
+            and clause._for_update_arg is None
+        ):
+            return self._db.engines[REPLICA]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+def _measure_lag(connection):
+    """Seconds the replica is behind; 0 when it has replayed everything it received."""
+    if connection.dialect.name != 'postgresql':
+        return 0.0
+    return connection.execute(text(
+        "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+        "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+    )).scalar()
+
+def replica_healthy():
+    """
+    Whether a replica is configured and within REPLICA_MAX_LAG seconds. Probed
+    at most every REPLICA_LAG_CHECK_INTERVAL seconds per process; a replica
+    that cannot be reached counts as lagging.
+    """
+    # app.extensions imports this module for the session class
+    from app.extensions import db
+
+    if REPLICA not in current_app.config.get('SQLALCHEMY_BINDS', {}):
+        return False
+    config = current_app.config
+    now = time.monotonic()
+    checked_at = _lag_state["checked_at"]
+    if checked_at is not None and now - checked_at < config.get('REPLICA_LAG_CHECK_INTERVAL', 5):
+        return _lag_state["ok"]
+
+    with _lag_lock:
+        if _lag_state["checked_at"] == checked_at:
+            try:
+                with db.engines[REPLICA].connect() as connection:
+                    lag = _measure_lag(connection)
+                ok = lag <= config.get('REPLICA_MAX_LAG', 2)
+                if not ok:
+                    print(f"DEBUG: Replica is {lag:.1f}s behind, reading from the primary")
+            except Exception as e:
+                print(f"DEBUG: Replica lag check failed: {e}")
+                ok = False
+            _lag_state.update(checked_at=now, ok=ok)
+    return _lag_state["ok"]
+
+def _sticky():
+    from app.extensions import cache
+    return cache.namespace('replica', ttl=current_app.config.get('REPLICA_STICKY_SECONDS', 5))
+
+@contextmanager
+def replica_reads(user_id):
+    """
+    Routes the reads inside the block to the replica, unless the user wrote in
+    the last REPLICA_STICKY_SECONDS (read-your-writes), this transaction has
+    already written, or the replica lags. Yields whether the replica is used.
+    """
+    from app.extensions import db
+
+    session = db.session()
+    use_replica = (
+        not session.info.get('written_users')
+        and replica_healthy()
+        and _sticky().get(user_id) is None
+    )
+    previous = session.info.get('use_replica', False)
+    session.info['use_replica'] = use_replica
+    try:
+        yield use_replica
+    finally:
+        session.info['use_replica'] = previous
+
+def reads_from_replica(view):
+    """replica_reads() around a read-only endpoint, for the requesting user."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        # Same anonymous fallback as the routes
+        with replica_reads(get_jwt_identity() or 1):
+            return view(*args, **kwargs)
+    return wrapper
+
+def mark_written(session, user_id):
+    """Records that this transaction writes the user's tasks; see SyncService.next_seq."""
+    session.info.setdefault('written_users', set()).add(user_id)
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _stick_to_primary(session):
+    written = session.info.pop('written_users', None)
+    if written and REPLICA in current_app.config.get('SQLALCHEMY_BINDS', {}):
+        sticky = _sticky()
+        for user_id in written:
+            sticky.set(user_id, 1)
+
+@event.listens_for(RoutingSession, 'after_soft_rollback')
+def _forget_writes(session, previous_transaction):
+    session.info.pop('written_users', None)
@@ -0,0 +1,32 @@
+import time
+from flask import g, has_app_context
+
+def start_deadline(seconds):
+    """Caps the remaining work of this request (voice STT/TTS stages) to `seconds`."""
+    g.voice_deadline = time.monotonic() + seconds
+
+def remaining():
+    """Seconds left before the request deadline, or None without one."""
+    deadline = g.get('voice_deadline') if has_app_context() else None
+    return None if deadline is None else max(0.0, deadline - time.monotonic())
+
+def stage_budget(limit):
+    """How long a stage may take: its own limit, cut to what is left of the request deadline."""
+    left = remaining()
+    return limit if left is None else min(limit, left)
+
+def _is_timeout(error):
+    # Client libraries wrap socket/asyncio timeouts in their own errors (RequestError, gTTSError, ...)
+    return (
+        isinstance(error, TimeoutError)
+        or isinstance(getattr(error, 'reason', None), TimeoutError)
+        or 'timed out' in str(error).lower()
+    )
+
+def cut_short(error, budget, limit):
+    """
+    Whether `error` is a timeout of a stage that ran with less than its own
+    `limit`: the request deadline ran out, not the provider, so it should not
+    count as a provider failure.
+    """
+    return budget < limit and _is_timeout(error)
@@ -0,0 +1,44 @@
+import os
+import shutil
+import threading
+
+_configured = False
+_lock = threading.Lock()
+
+def _executable(directory, name):
+    for candidate in (name, f"{name}.exe"):
+        path = os.path.join(directory, candidate)
+        if os.path.exists(path):
+            return path
+    return None
+
+def configure_ffmpeg(ffmpeg_dir=None):
+    """
+    Points pydub at ffmpeg/ffprobe, once per process. With `ffmpeg_dir` (FFMPEG_DIR)
+    the binaries are taken from there and the directory is added to PATH for the
+    subprocesses pydub spawns; otherwise pydub's own PATH lookup is kept.
+
+    Imports pydub, so call it right before the first decode, not at import time.
+    """
+    global _configured
+    if _configured:
+        return
+    with _lock:
+        if _configured:
+            return
+        from pydub import AudioSegment
+
+        if ffmpeg_dir:
+            ffmpeg_exe = _executable(ffmpeg_dir, "ffmpeg")
+            if ffmpeg_exe:
+                if ffmpeg_dir not in os.environ.get("PATH", "").split(os.pathsep):
+                    os.environ["PATH"] = os.environ.get("PATH", "") + os.pathsep + ffmpeg_dir
+                AudioSegment.converter = ffmpeg_exe
+                ffprobe_exe = _executable(ffmpeg_dir, "ffprobe")
+                if ffprobe_exe:
+                    AudioSegment.ffprobe = ffprobe_exe
+            else:
+                print(f"DEBUG: FFMPEG_DIR={ffmpeg_dir} has no ffmpeg executable, using PATH")
+        elif shutil.which("ffmpeg") is None:
+            print("DEBUG: ffmpeg not found on PATH; only PCM WAV uploads can be decoded")
+        _configured = True
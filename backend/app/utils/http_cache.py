@@ -0,0 +1,24 @@
+from functools import wraps
+from flask import current_app, make_response, request
+
+def cacheable(view):
+    """
+    Adds validation caching to a read endpoint: a weak ETag over the uncompressed
+    body (valid for every Content-Encoding) plus private Cache-Control, so a client
+    refreshing an unchanged board gets a bodyless 304.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        response = make_response(view(*args, **kwargs))
+        if request.method != 'GET' or response.status_code != 200:
+            return response
+
+        max_age = current_app.config.get('READ_CACHE_MAX_AGE', 0)
+        response.cache_control.private = True
+        if max_age:
+            response.cache_control.max_age = max_age
+        else:
+            response.cache_control.no_cache = True
+        response.add_etag(weak=True)
+        return response.make_conditional(request)
+    return wrapper
@@ -0,0 +1,96 @@
+import hashlib
+import time
+from functools import wraps
+from flask import current_app, jsonify, make_response, request
+from flask_jwt_extended import get_jwt_identity
+from app.extensions import cache
+
+HEADER = 'Idempotency-Key'
+
+def _fingerprint():
+    """What identifies the request body; a key reused with another body is rejected."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{request.method} {request.path}".encode())
+    if request.is_json:
+        digest.update(request.get_data(cache=True))
+    else:
+        # Parsed fields, not the raw body: the multipart boundary is random per
+        # attempt, and the parsed form and files stay available to the view
+        digest.update(request.mimetype.encode())
+        for name, value in sorted(request.form.items(multi=True)):
+            digest.update(f"\0{name}={value}".encode())
+        for name, upload in sorted(request.files.items(multi=True), key=lambda item: item[0]):
+            digest.update(f"\0{name}:{upload.filename}\0".encode())
+            stream = upload.stream
+            position = stream.tell()
+            for chunk in iter(lambda: stream.read(65536), b''):
+                digest.update(chunk)
+            stream.seek(position)
+    return digest.hexdigest()
+
+def _replay(stored):
+    response = current_app.response_class(stored["body"], status=stored["status"], mimetype=stored["mimetype"])
+    response.headers['Idempotent-Replayed'] = 'true'
+    return response
+
+def idempotent(view):
+    """
+    Honors the Idempotency-Key header on a POST endpoint. The first request
+    with a key runs the view and its response is stored for IDEMPOTENCY_TTL
+    seconds; retries get the stored response without running the view again,
+    and a retry arriving while the first is still running waits for it.
+    Server errors are not stored, so the client can retry them.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get(HEADER, '').strip()
+        if not key:
+            return view(*args, **kwargs)
+        if len(key) > 255:
+            return jsonify({"error": "Idempotency-Key muito longa"}), 400
+
+        config = current_app.config
+        store = cache.namespace('idempotency', ttl=config.get('IDEMPOTENCY_TTL', 86400))
+        store_key = f"{request.path}:{hashlib.blake2b(key.encode(), digest_size=16).hexdigest()}"
+        # Keys are client-generated, so they are only unique per user
+        user_id = get_jwt_identity() or 1
+        fingerprint = _fingerprint()
+        in_flight = config.get('IDEMPOTENCY_LOCK_TIMEOUT', 120)
+
+        deadline = time.monotonic() + config.get('IDEMPOTENCY_WAIT', 30)
+        while True:
+            stored = store.get(store_key, user_id=user_id)
+            if stored is not None and stored["fingerprint"] != fingerprint:
+                return jsonify({"error": "Idempotency-Key já usada com outra requisição"}), 422
+            if stored is not None and stored["state"] == "done":
+                return _replay(stored)
+            if stored is None:
+                if store.add(store_key, {"state": "pending", "fingerprint": fingerprint}, ttl=in_flight, user_id=user_id):
+                    break
+                if store.get(store_key, user_id=user_id) is None:
+                    # Neither readable nor writable: the cache is down, run without protection
+                    return view(*args, **kwargs)
+                continue
+            if time.monotonic() >= deadline:
+                response = jsonify({"error": "Requisição com esta Idempotency-Key ainda em processamento"})
+                response.headers['Retry-After'] = '1'
+                return response, 409
+            time.sleep(0.1)
+
+        try:
+            response = make_response(view(*args, **kwargs))
+        except Exception:
+            store.delete(store_key, user_id=user_id)
+            raise
+        if response.status_code >= 500 or response.is_streamed:
+            store.delete(store_key, user_id=user_id)
+            return response
+        store.set(store_key, {
+            "state": "done",
+            "fingerprint": fingerprint,
+            "status": response.status_code,
+            "mimetype": response.mimetype,
+            "body": response.get_data(as_text=True)
+        }, user_id=user_id)
+        return response
+    return wrapper
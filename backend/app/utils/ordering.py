@@ -0,0 +1,142 @@
+"""
+Fractional ordering keys for manually sorted lists (Kanban columns).
+
+A key is a variable-length integer followed by an optional base-36 fraction.
+The integer's first character (its head) gives how many digits follow: "i"
+through "z" for 1 to 18 digits counting up, "h" down to "0" for 1 to 18
+digits counting down below zero. So "i0" < "iz" < "j00" < "j01", and appending
+to a list of n keys costs O(log n) characters instead of one more digit every
+36 appends. The fraction ("i3" + "i" = "i3i") only appears when something is
+squeezed between two consecutive integers, and never ends in "0".
+
+Digits are 0-9 and lowercase a-z only, so plain string comparison orders keys
+correctly under any database collation.
+"""
+
+DIGITS = '0123456789abcdefghijklmnopqrstuvwxyz'
+BASE = len(DIGITS)
+
+# Heads from ZERO_HEAD up count up from zero; heads below it count down
+ZERO_HEAD = BASE // 2
+
+def _integer_length(head):
+    index = DIGITS.index(head)
+    return index - ZERO_HEAD + 2 if index >= ZERO_HEAD else ZERO_HEAD - index + 1
+
+def _split(key):
+    """(integer part, fraction) of a key; raises ValueError when it is malformed."""
+    if key == '' or any(c not in DIGITS for c in key):
+        raise ValueError(f"Invalid ordering key: {key!r}")
+    length = _integer_length(key[0])
+    integer, fraction = key[:length], key[length:]
+    if len(integer) < length or fraction.endswith('0'):
+        raise ValueError(f"Invalid ordering key: {key!r}")
+    return integer, fraction
+
+def _increment(integer):
+    """The next integer, or None past the largest one."""
+    head, digits = integer[0], integer[1:]
+    stripped = digits.rstrip(DIGITS[-1])
+    if stripped:
+        # Bump the last digit that is not a "z" and zero the ones after it
+        position = len(stripped) - 1
+        return head + stripped[:position] + DIGITS[DIGITS.index(stripped[position]) + 1] + '0' * (len(digits) - position - 1)
+    if head == DIGITS[-1]:
+        return None
+    next_head = DIGITS[DIGITS.index(head) + 1]
+    return next_head + '0' * (_integer_length(next_head) - 1)
+
+def _decrement(integer):
+    """The previous integer, or None below the smallest one."""
+    head, digits = integer[0], integer[1:]
+    stripped = digits.rstrip(DIGITS[0])
+    if stripped:
+        position = len(stripped) - 1
+        return head + stripped[:position] + DIGITS[DIGITS.index(stripped[position]) - 1] + DIGITS[-1] * (len(digits) - position - 1)
+    if head == DIGITS[0]:
+        return None
+    previous_head = DIGITS[DIGITS.index(head) - 1]
+    return previous_head + DIGITS[-1] * (_integer_length(previous_head) - 1)
+
+def _midpoint(a, b):
+    """Shortest fraction strictly between a ('' = 0) and b (None = 1)."""
+    if b is not None:
+        # Copy the shared prefix, then split what is left
+        n = 0
+        while n < len(b) and (a[n] if n < len(a) else '0') == b[n]:
+            n += 1
+        if n > 0:
+            return b[:n] + _midpoint(a[n:], b[n:])
+    digit_a = DIGITS.index(a[0]) if a else 0
+    digit_b = DIGITS.index(b[0]) if b is not None else BASE
+    if digit_b - digit_a > 1:
+        return DIGITS[(digit_a + digit_b) // 2]
+    # Adjacent first digits
+    if b is not None and len(b) > 1:
+        return b[0]
+    return DIGITS[digit_a] + _midpoint(a[1:], None)
+
+def key_after(a):
+    """The next integer key after `a`, so repeated appends stay short."""
+    integer, fraction = _split(a)
+    following = _increment(integer)
+    if following is None:
+        return integer + _midpoint(fraction, None)
+    return following
+
+def key_before(b):
+    """A key before `b`, for prepending."""
+    integer, fraction = _split(b)
+    if fraction:
+        return integer
+    previous = _decrement(integer)
+    if previous is None:
+        raise ValueError(f"No ordering key before {b!r}")
+    return previous
+
+def key_between(a, b):
+    """
+    A key strictly between `a` and `b`. None means the start (for `a`) or the
+    end (for `b`) of the list.
+    """
+    if a is not None:
+        _split(a)
+    if b is not None:
+        _split(b)
+    if a is not None and b is not None and a >= b:
+        raise ValueError(f"Ordering keys out of order: {a!r} >= {b!r}")
+    if a is None and b is None:
+        return DIGITS[ZERO_HEAD] + DIGITS[0]
+    if b is None:
+        return key_after(a)
+    if a is None:
+        return key_before(b)
+    integer_a, fraction_a = _split(a)
+    integer_b, fraction_b = _split(b)
+    if integer_a == integer_b:
+        return integer_a + _midpoint(fraction_a, fraction_b)
+    following = _increment(integer_a)
+    if following is not None and following < b:
+        return following
+    return integer_a + _midpoint(fraction_a, None)
+
+def spread_keys(count):
+    """
+    `count` increasing integer keys of equal length, evenly spaced and as short
+    as possible; used to rebalance a list.
+    """
+    width = 1
+    # At least a few free keys between neighbours, so the next inserts stay at this width
+    while BASE ** width < (count + 1) * 4:
+        width += 1
+    head = DIGITS[ZERO_HEAD + width - 1]
+    step = BASE ** width // (count + 1)
+    keys = []
+    for i in range(1, count + 1):
+        value = i * step
+        digits = []
+        for _ in range(width):
+            value, digit = divmod(value, BASE)
+            digits.append(DIGITS[digit])
+        keys.append(head + ''.join(reversed(digits)))
+    return keys
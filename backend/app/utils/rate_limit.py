@@ -0,0 +1,199 @@
+import math
+import threading
+import time
+from functools import wraps
+from flask import current_app, jsonify, request
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from app.utils.ttl_cache import TTLCache
+
+# Token bucket in one round trip: refill by elapsed time, then take a token if there is one
+_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return tostring(wait)
+"""
+
+class MemoryBucketStore:
+    """Per-process buckets: each worker enforces the limits on its own."""
+
+    def __init__(self, maxsize):
+        self._buckets = TTLCache(maxsize=maxsize)
+        self._lock = threading.Lock()
+
+    def consume(self, key, rate, capacity):
+        """Takes one token; returns 0 when allowed, else the seconds until a token is available."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, ts = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - ts) * rate)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / rate
+            # A bucket idle long enough to be full again carries no state
+            self._buckets.set(key, (tokens, now), capacity / rate + 1)
+            return wait
+
+class RedisBucketStore:
+    """Buckets shared by every worker, on any Redis-protocol server with scripting."""
+
+    def __init__(self, url, socket_timeout):
+        import redis
+        self._client = redis.Redis.from_url(url, socket_timeout=socket_timeout, socket_connect_timeout=socket_timeout)
+        self._script = self._client.register_script(_BUCKET_SCRIPT)
+
+    def consume(self, key, rate, capacity):
+        return float(self._script(keys=[key], args=[rate, capacity]))
+
+class ConcurrencyGate:
+    """
+    At most `limit` requests inside at once; up to `queue_depth` more wait up
+    to `wait` seconds for a slot, anything beyond that is turned away at once.
+    """
+
+    def __init__(self, limit, queue_depth, wait):
+        self._running = threading.BoundedSemaphore(limit)
+        self._admitted = threading.BoundedSemaphore(limit + queue_depth)
+        self.wait = wait
+
+    def acquire(self):
+        if not self._admitted.acquire(blocking=False):
+            return False
+        if not self._running.acquire(timeout=self.wait):
+            self._admitted.release()
+            return False
+        return True
+
+    def release(self):
+        self._running.release()
+        self._admitted.release()
+
+def _too_many(message, retry_after, status):
+    response = jsonify({"error": message, "retry_after": retry_after})
+    response.status_code = status
+    response.headers['Retry-After'] = str(retry_after)
+    return response
+
+class RateLimiter:
+    """
+    Admission control. Every /api request takes a token from its user's bucket
+    for its endpoint class, and an empty bucket answers 429 with Retry-After
+    before the view runs. Requests are 'rest' unless the view is marked with
+    `rate_limited`: those are charged by the view itself ('voice' for STT/TTS,
+    or nothing), after the decorators above it, so an idempotent replay or a
+    chunk of an already admitted stream costs nothing. Views marked with
+    `audio_pipeline` also need a slot in the process-wide audio gate, or get 503.
+
+    RATE_LIMIT_STORAGE picks 'memory' or 'redis' (CACHE_REDIS_URL). Store
+    errors let the request through.
+    """
+
+    def __init__(self, app=None):
+        self.store = None
+        self.limits = {}
+        self.gate = None
+        self.enabled = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        config = app.config
+        self.limits = {
+            'rest': (config.get('RATE_LIMIT_REST_PER_MINUTE', 300) / 60.0, config.get('RATE_LIMIT_REST_BURST', 60)),
+            'voice': (config.get('RATE_LIMIT_VOICE_PER_MINUTE', 20) / 60.0, config.get('RATE_LIMIT_VOICE_BURST', 5)),
+        }
+        if config.get('RATE_LIMIT_STORAGE', 'memory') == 'redis':
+            self.store = RedisBucketStore(config['CACHE_REDIS_URL'], config.get('CACHE_REDIS_TIMEOUT', 0.5))
+        else:
+            self.store = MemoryBucketStore(config.get('CACHE_MAX_ENTRIES', 10000))
+        self.gate = ConcurrencyGate(
+            config.get('VOICE_MAX_CONCURRENCY', 4),
+            config.get('VOICE_QUEUE_DEPTH', 8),
+            config.get('VOICE_QUEUE_WAIT', 2.0)
+        )
+        app.extensions['rate_limiter'] = self
+        self.enabled = config.get('RATE_LIMIT_ENABLED', True)
+        if self.enabled:
+            app.before_request(self._check)
+
+    @staticmethod
+    def _client_key():
+        try:
+            verify_jwt_in_request(optional=True)
+            user_id = get_jwt_identity()
+        except Exception:
+            # Bad tokens are rejected by the view itself; meanwhile count by address
+            user_id = None
+        return f"u{user_id}" if user_id else f"ip{request.remote_addr}"
+
+    def _check(self):
+        if request.method == 'OPTIONS' or not request.path.startswith('/api/'):
+            return None
+        view = current_app.view_functions.get(request.endpoint)
+        if hasattr(view, 'rate_limit_class'):
+            # Charged (or exempted) by the view itself
+            return None
+        return self.consume('rest')
+
+    def consume(self, endpoint_class):
+        """Takes a token of `endpoint_class` for the current client; returns a 429 response when there is none."""
+        if not self.enabled:
+            return None
+        rate, capacity = self.limits[endpoint_class]
+        prefix = current_app.config.get('CACHE_KEY_PREFIX', 'ocastro')
+        key = f"{prefix}:ratelimit:{endpoint_class}:{self._client_key()}"
+        try:
+            wait = self.store.consume(key, rate, capacity)
+        except Exception as e:
+            print(f"DEBUG: Rate limit store failed: {e}")
+            return None
+        if wait > 0:
+            return _too_many("Muitas requisições. Tente novamente em instantes.", math.ceil(wait), 429)
+        return None
+
+def rate_limited(endpoint_class):
+    """
+    Charges the view to `endpoint_class` when it is about to run, instead of
+    'rest' before the request; None makes it free. Place it below @idempotent
+    so replays are not charged.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if endpoint_class is not None:
+                limited = current_app.extensions['rate_limiter'].consume(endpoint_class)
+                if limited is not None:
+                    return limited
+            return view(*args, **kwargs)
+        wrapper.rate_limit_class = endpoint_class
+        return wrapper
+    return decorator
+
+def audio_pipeline(view):
+    """Runs the view only with a slot in the audio gate (STT/TTS work), else 503."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        gate = current_app.extensions['rate_limiter'].gate
+        if not gate.acquire():
+            return _too_many("Serviço de voz ocupado. Tente novamente em instantes.",
+                             current_app.config.get('VOICE_BUSY_RETRY_AFTER', 2), 503)
+        try:
+            return view(*args, **kwargs)
+        finally:
+            gate.release()
+    return wrapper
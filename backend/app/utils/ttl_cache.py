@@ -0,0 +1,78 @@
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+class TTLCache:
+    """
+    Small thread-safe LRU cache whose entries expire after `ttl` seconds.
+    Values only live in the current process, so each worker keeps its own copy.
+    With `maxbytes`, entries are also evicted while the sum of `weigh(value)`
+    exceeds it, for values whose size varies a lot (encoded audio).
+    """
+
+    def __init__(self, maxsize=1024, ttl=60, maxbytes=None, weigh=len):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.maxbytes = maxbytes
+        self._weigh = weigh if maxbytes is not None else (lambda value: 0)
+        self._bytes = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _store(self, key, expires_at, value):
+        old = self._data.get(key, _MISSING)
+        if old is not _MISSING:
+            self._bytes -= old[2]
+        weight = self._weigh(value)
+        self._data[key] = (expires_at, value, weight)
+        self._bytes += weight
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize or (self.maxbytes is not None and self._bytes > self.maxbytes):
+            self._bytes -= self._data.popitem(last=False)[1][2]
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            expires_at, value, weight = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self._bytes -= weight
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._store(key, expires_at, value)
+
+    def add(self, key, value, ttl=None):
+        """Stores `value` only if `key` is absent or expired; returns whether it did."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING and entry[0] >= now:
+                return False
+            self._store(key, now + (self.ttl if ttl is None else ttl), value)
+            return True
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.pop(key, _MISSING)
+            if entry is not _MISSING:
+                self._bytes -= entry[2]
+        if entry is _MISSING:
+            return default
+        return entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def __len__(self):
+        return len(self._data)
@@ -0,0 +1,52 @@
+from array import array
+from collections import namedtuple
+
+try:
+    import audioop
+except ImportError:
+    # Removed from the stdlib in 3.13; fall back to a pure-Python RMS
+    audioop = None
+
+SpeechBounds = namedtuple('SpeechBounds', ['start_ms', 'end_ms'])
+
+def _frame_rms(frame, sample_width):
+    if audioop is not None:
+        return audioop.rms(frame, sample_width)
+    samples = array('h', frame) if sample_width == 2 else array('b', frame)
+    if not samples:
+        return 0
+    return int((sum(s * s for s in samples) / len(samples)) ** 0.5)
+
+def find_speech_bounds(pcm, sample_rate, sample_width=2, frame_ms=30, min_rms=300,
+                       noise_ratio=3.0, padding_ms=200):
+    """
+    Energy-based voice activity detection over mono PCM.
+
+    A frame counts as speech when its RMS is above both `min_rms` and `noise_ratio`
+    times the noise floor (the 10th percentile of frame energies), so a steady
+    background hum does not count as speech. A floor already above `min_rms` is
+    not noise (the clip has no pause), and then only `min_rms` applies. Returns
+    the span from the first to the last speech frame, widened by `padding_ms` on
+    each side, or None when the clip has no speech at all.
+    """
+    frame_bytes = int(sample_rate * frame_ms / 1000) * sample_width
+    if frame_bytes <= 0 or len(pcm) < frame_bytes:
+        return None
+
+    energies = [
+        _frame_rms(pcm[offset:offset + frame_bytes], sample_width)
+        for offset in range(0, len(pcm) - frame_bytes + 1, frame_bytes)
+    ]
+    noise_floor = sorted(energies)[len(energies) // 10]
+    # A floor above min_rms means the clip has no quiet stretch at all (continuous
+    # speech, a tightly cut clip): it is signal, not noise, so it must not raise the bar
+    threshold = max(min_rms, noise_floor * noise_ratio) if noise_floor < min_rms else min_rms
+
+    speech = [i for i, energy in enumerate(energies) if energy > threshold]
+    if not speech:
+        return None
+
+    total_ms = len(pcm) * 1000 // (sample_rate * sample_width)
+    start_ms = max(0, speech[0] * frame_ms - padding_ms)
+    end_ms = min(total_ms, (speech[-1] + 1) * frame_ms + padding_ms)
+    return SpeechBounds(start_ms, end_ms)
@@ -0,0 +1,71 @@
+"""Never reuse task ids on SQLite, so they stay unique across tasks_archive
+
+Revision ID: a6c1f9e2d4b3
+Revises: f3b8d1e6a2c7
+Create Date: 2026-03-11 09:41:07.552318
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a6c1f9e2d4b3'
+down_revision = 'f3b8d1e6a2c7'
+branch_labels = None
+depends_on = None
+
+# Rebuilding `tasks` drops its triggers, so the tasks_fts ones from b7d2e4a91c3f
+# are created again (copied here so that revision can change independently)
+FTS_TRIGGERS = [
+    "DROP TRIGGER IF EXISTS tasks_fts_ai",
+    "DROP TRIGGER IF EXISTS tasks_fts_ad",
+    "DROP TRIGGER IF EXISTS tasks_fts_au",
+    """
+    CREATE TRIGGER tasks_fts_ai AFTER INSERT ON tasks BEGIN
+        INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER tasks_fts_ad AFTER DELETE ON tasks BEGIN
+        INSERT INTO tasks_fts(tasks_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER tasks_fts_au AFTER UPDATE OF title, description ON tasks BEGIN
+        INSERT INTO tasks_fts(tasks_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END
+    """,
+    "INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')",
+]
+
+
+def _rebuild_tasks(autoincrement):
+    bind = op.get_bind()
+    with op.batch_alter_table('tasks', recreate='always', table_kwargs={'sqlite_autoincrement': autoincrement}):
+        pass
+    if sa.inspect(bind).has_table('tasks_fts'):
+        for statement in FTS_TRIGGERS:
+            op.execute(sa.text(statement))
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'sqlite':
+        # Sequences (PostgreSQL) and AUTO_INCREMENT (MySQL) never hand an id out twice
+        return
+    _rebuild_tasks(True)
+    # Start past every id ever used, archived ones included
+    last_id = bind.execute(sa.text(
+        "SELECT MAX(id) FROM (SELECT id FROM tasks UNION ALL SELECT id FROM tasks_archive)"
+    )).scalar()
+    if last_id is not None:
+        bind.execute(sa.text("DELETE FROM sqlite_sequence WHERE name = 'tasks'"))
+        bind.execute(sa.text("INSERT INTO sqlite_sequence (name, seq) VALUES ('tasks', :seq)"), {"seq": last_id})
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    _rebuild_tasks(False)
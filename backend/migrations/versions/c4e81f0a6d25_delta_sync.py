@@ -0,0 +1,53 @@
+"""Delta sync: per-user change sequence and task tombstones
+
+Revision ID: c4e81f0a6d25
+Revises: b7d2e4a91c3f
+Create Date: 2026-02-03 18:41:09.730515
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4e81f0a6d25'
+down_revision = 'b7d2e4a91c3f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('users', sa.Column('sync_seq', sa.BigInteger(), nullable=False, server_default='0'))
+    op.add_column('users', sa.Column('tombstone_floor', sa.BigInteger(), nullable=False, server_default='0'))
+    op.add_column('tasks', sa.Column('sync_seq', sa.BigInteger(), nullable=False, server_default='0'))
+    op.create_index('ix_tasks_user_sync', 'tasks', ['user_id', 'sync_seq'], unique=False)
+
+    op.create_table('task_tombstones',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('task_id', sa.Integer(), nullable=False),
+    sa.Column('sync_seq', sa.BigInteger(), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_task_tombstones_user_sync', 'task_tombstones', ['user_id', 'sync_seq'], unique=False)
+    op.create_index(op.f('ix_task_tombstones_deleted_at'), 'task_tombstones', ['deleted_at'], unique=False)
+
+    # Existing tasks: the id is already increasing per user, so it seeds the sequence
+    op.execute("UPDATE tasks SET sync_seq = id")
+    op.execute(
+        "UPDATE users SET sync_seq = COALESCE((SELECT MAX(tasks.id) FROM tasks WHERE tasks.user_id = users.id), 0)"
+    )
+
+
+def downgrade():
+    op.drop_index(op.f('ix_task_tombstones_deleted_at'), table_name='task_tombstones')
+    op.drop_index('ix_task_tombstones_user_sync', table_name='task_tombstones')
+    op.drop_table('task_tombstones')
+    op.drop_index('ix_tasks_user_sync', table_name='tasks')
+    with op.batch_alter_table('tasks') as batch_op:
+        batch_op.drop_column('sync_seq')
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('tombstone_floor')
+        batch_op.drop_column('sync_seq')
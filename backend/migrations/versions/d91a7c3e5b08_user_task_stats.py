@@ -0,0 +1,40 @@
+"""Per-user task counters
+
+Revision ID: d91a7c3e5b08
+Revises: c4e81f0a6d25
+Create Date: 2026-02-17 09:26:51.204117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd91a7c3e5b08'
+down_revision = 'c4e81f0a6d25'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Rows are created on each user's first write or by `flask stats reconcile`
+    op.create_table('user_task_stats',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.Column('pending', sa.Integer(), nullable=False),
+    sa.Column('entrada', sa.Integer(), nullable=False),
+    sa.Column('fazendo', sa.Integer(), nullable=False),
+    sa.Column('concluida', sa.Integer(), nullable=False),
+    sa.Column('pending_alta', sa.Integer(), nullable=False),
+    sa.Column('pending_media', sa.Integer(), nullable=False),
+    sa.Column('pending_baixa', sa.Integer(), nullable=False),
+    sa.Column('overdue', sa.Integer(), nullable=False),
+    sa.Column('due_today', sa.Integer(), nullable=False),
+    sa.Column('as_of', sa.Date(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade():
+    op.drop_table('user_task_stats')
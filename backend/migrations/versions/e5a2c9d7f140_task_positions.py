@@ -0,0 +1,67 @@
+"""Fractional ordering key for tasks inside their Kanban column
+
+Revision ID: e5a2c9d7f140
+Revises: d91a7c3e5b08
+Create Date: 2026-03-02 11:12:40.318204
+
+"""
+from itertools import groupby
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5a2c9d7f140'
+down_revision = 'd91a7c3e5b08'
+branch_labels = None
+depends_on = None
+
+DIGITS = '0123456789abcdefghijklmnopqrstuvwxyz'
+
+
+def spread_keys(count):
+    """
+    Frozen copy of app.utils.ordering.spread_keys as of this revision, so the
+    migration keeps producing the same keys whatever that module becomes.
+    """
+    base = len(DIGITS)
+    width = 1
+    while base ** width < (count + 1) * 4:
+        width += 1
+    # Head character: how many integer digits follow ("i" = 1, "j" = 2, ...)
+    head = DIGITS[base // 2 + width - 1]
+    step = base ** width // (count + 1)
+    keys = []
+    for i in range(1, count + 1):
+        value = i * step
+        digits = []
+        for _ in range(width):
+            value, digit = divmod(value, base)
+            digits.append(DIGITS[digit])
+        keys.append(head + ''.join(reversed(digits)))
+    return keys
+
+
+def upgrade():
+    op.add_column('tasks', sa.Column('position', sa.String(length=64), nullable=True))
+    op.create_index('ix_tasks_user_status_position', 'tasks', ['user_id', 'status', 'position'], unique=False)
+
+    # Existing columns keep the order they were listed in until now (creation order)
+    tasks = sa.table('tasks', sa.column('id', sa.Integer), sa.column('user_id', sa.Integer),
+                     sa.column('status', sa.String), sa.column('position', sa.String))
+    bind = op.get_bind()
+    rows = bind.execute(sa.select(tasks.c.id, tasks.c.user_id, tasks.c.status).order_by(
+        tasks.c.user_id, tasks.c.status, tasks.c.id
+    )).all()
+    for _, column in groupby(rows, key=lambda row: (row.user_id, row.status)):
+        ids = [row.id for row in column]
+        bind.execute(
+            tasks.update().where(tasks.c.id == sa.bindparam('task_id')).values(position=sa.bindparam('key')),
+            [{"task_id": task_id, "key": key} for task_id, key in zip(ids, spread_keys(len(ids)))]
+        )
+
+
+def downgrade():
+    op.drop_index('ix_tasks_user_status_position', table_name='tasks')
+    with op.batch_alter_table('tasks') as batch_op:
+        batch_op.drop_column('position')
@@ -0,0 +1,44 @@
+"""Archive table for old completed tasks
+
+Revision ID: f3b8d1e6a2c7
+Revises: e5a2c9d7f140
+Create Date: 2026-03-09 16:05:22.847391
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3b8d1e6a2c7'
+down_revision = 'e5a2c9d7f140'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('tasks_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('title', sa.String(length=200), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=True),
+    sa.Column('priority', sa.String(length=20), nullable=True),
+    sa.Column('due_date', sa.Date(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('position', sa.String(length=64), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_tasks_archive_user_status_position', 'tasks_archive', ['user_id', 'status', 'position'], unique=False)
+    op.create_index(op.f('ix_tasks_archive_archived_at'), 'tasks_archive', ['archived_at'], unique=False)
+    op.create_index('ix_tasks_status_updated', 'tasks', ['status', 'updated_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_tasks_status_updated', table_name='tasks')
+    op.drop_index(op.f('ix_tasks_archive_archived_at'), table_name='tasks_archive')
+    op.drop_index('ix_tasks_archive_user_status_position', table_name='tasks_archive')
+    op.drop_table('tasks_archive')
@@ -0,0 +1,33 @@
+"""
+Throughput of app.utils.date_parser.parse_date over typical voice commands.
+
+    python scripts/bench_date_parser.py [iterations]
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.date_parser import parse_date
+
+COMMANDS = [
+    "criar tarefa comprar pão amanhã",
+    "nova tarefa reunião com equipe na sexta-feira",
+    "mudar o prazo da tarefa relatório para dia 20 de março",
+    "criar tarefa pagar conta 05/02",
+    "entregar relatório daqui a três dias",
+    "concluir a segunda tarefa",
+    "listar todas as tarefas pendentes",
+    "agendar dentista semana que vem",
+]
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    timer = timeit.Timer(lambda: [parse_date(command) for command in COMMANDS])
+    best = min(timer.repeat(repeat=5, number=iterations // len(COMMANDS) or 1))
+    calls = (iterations // len(COMMANDS) or 1) * len(COMMANDS)
+    print(f"parse_date: {best / calls * 1e6:.1f} µs per command (best of 5, {calls} calls each)")
+
+if __name__ == '__main__':
+    main()
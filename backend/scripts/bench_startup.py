@@ -0,0 +1,47 @@
+"""
+Cold-start benchmark: time `create_app()` in fresh interpreters and check that
+the voice stack (speech_recognition, pydub, gTTS) stays unloaded.
+
+    python scripts/bench_startup.py [runs]
+"""
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+VOICE_MODULES = ('speech_recognition', 'pydub', 'gtts', 'edge_tts')
+
+_PROBE = f"""
+import sys, time
+start = time.perf_counter()
+from app import create_app
+create_app()
+elapsed = time.perf_counter() - start
+loaded = [m for m in {VOICE_MODULES!r} if m in sys.modules]
+print(elapsed, ",".join(loaded))
+"""
+
+def run_once():
+    output = subprocess.run(
+        [sys.executable, "-c", _PROBE], cwd=BACKEND_DIR,
+        capture_output=True, text=True, check=True
+    ).stdout.strip().splitlines()[-1]
+    elapsed, _, loaded = output.partition(" ")
+    return float(elapsed), [m for m in loaded.split(",") if m]
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    timings = []
+    for _ in range(runs):
+        elapsed, loaded = run_once()
+        if loaded:
+            print(f"Voice modules loaded at startup: {', '.join(loaded)}")
+            sys.exit(1)
+        timings.append(elapsed * 1000)
+    print(f"create_app() over {runs} runs: median {statistics.median(timings):.0f} ms, "
+          f"min {min(timings):.0f} ms, max {max(timings):.0f} ms")
+
+if __name__ == '__main__':
+    main()
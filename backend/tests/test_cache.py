@@ -0,0 +1,31 @@
+from app.utils.cache import MemoryBackend, _MISSING
+from app.utils.ttl_cache import TTLCache
+
+def test_ttl_cache_evicts_by_bytes():
+    cache = TTLCache(maxsize=100, maxbytes=10)
+    cache.set('a', 'xxxx')
+    cache.set('b', 'xxxx')
+    cache.set('c', 'xxxx')
+    assert cache.get('a') is None
+    assert cache.get('b') == 'xxxx' and cache.get('c') == 'xxxx'
+
+def test_ttl_cache_replacing_a_value_releases_its_bytes():
+    cache = TTLCache(maxsize=100, maxbytes=10)
+    cache.set('a', 'x' * 8)
+    cache.set('a', 'xx')
+    cache.set('b', 'x' * 8)
+    assert cache.get('a') == 'xx'
+    cache.pop('a')
+    cache.set('c', 'xx')
+    assert cache.get('b') == 'x' * 8
+
+def test_memory_backend_keeps_limited_namespaces_apart():
+    backend = MemoryBackend(2, 60, 'app', limits={'tts': {'maxbytes': 100}})
+    backend.set('app:profile:1', {'name': 'Ana'}, 60)
+    for n in range(5):
+        backend.set(f'app:tts:{n}', 'x' * 40, 60)
+    # Audio evicts only older audio, never the shared store's entries
+    assert backend.get('app:profile:1') == {'name': 'Ana'}
+    assert backend.get('app:tts:4') == 'x' * 40
+    assert backend.get('app:tts:3') == 'x' * 40
+    assert backend.get('app:tts:2') is _MISSING
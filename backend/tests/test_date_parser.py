@@ -0,0 +1,82 @@
+import random
+from datetime import date, timedelta
+import pytest
+from app.utils.date_parser import parse_date, strip_date
+
+# A Wednesday
+TODAY = date(2025, 1, 15)
+
+@pytest.mark.parametrize("text, expected", [
+    ("comprar pão hoje", date(2025, 1, 15)),
+    ("comprar pão amanhã", date(2025, 1, 16)),
+    ("comprar pão amanha", date(2025, 1, 16)),
+    ("comprar pão depois de amanhã", date(2025, 1, 17)),
+    ("reunião na sexta", date(2025, 1, 17)),
+    ("reunião segunda-feira", date(2025, 1, 20)),
+    ("reunião na quarta", date(2025, 1, 22)),
+    ("reunião terça que vem", date(2025, 1, 21)),
+    ("reunião na sexta da semana que vem", date(2025, 1, 24)),
+    ("entregar semana que vem", date(2025, 1, 20)),
+    ("entregar na próxima semana", date(2025, 1, 20)),
+    ("entregar daqui a 3 dias", date(2025, 1, 18)),
+    ("entregar daqui a dois dias", date(2025, 1, 17)),
+    ("entregar em 2 semanas", date(2025, 1, 29)),
+    ("pagar conta 20/03", date(2025, 3, 20)),
+    ("pagar conta 10/01", date(2026, 1, 10)),
+    ("pagar conta 05/02/2027", date(2027, 2, 5)),
+    ("pagar conta 05/02/27", date(2027, 2, 5)),
+    ("pagar conta dia 20", date(2025, 1, 20)),
+    ("pagar conta dia 10", date(2025, 2, 10)),
+    ("pagar conta dia 5 de março", date(2025, 3, 5)),
+    ("pagar conta 3 de janeiro", date(2026, 1, 3)),
+])
+def test_parses_date_expressions(text, expected):
+    match = parse_date(text, today=TODAY)
+    assert match is not None
+    assert match.date == expected
+
+@pytest.mark.parametrize("text", [
+    "comprar pão",
+    "excluir a segunda tarefa",
+    "marcar a segunda tarefa como concluída",
+    "mover para a segunda tarefa",
+    "pular para a terça opção",
+    "ler o capítulo 3",
+])
+def test_ignores_text_without_a_date(text):
+    assert parse_date(text, today=TODAY) is None
+
+def test_invalid_day_keeps_scanning():
+    match = parse_date("pagar 31/02 ou amanhã", today=TODAY)
+    assert match.date == date(2025, 1, 16)
+
+def test_strip_date_removes_connective():
+    text = "entregar relatório com prazo de até sexta-feira"
+    assert strip_date(text, parse_date(text, today=TODAY)) == "entregar relatório"
+
+def test_strip_date_keeps_surrounding_words():
+    text = "ligar para o banco amanhã de manhã"
+    assert strip_date(text, parse_date(text, today=TODAY)) == "ligar para o banco de manhã"
+
+# Word soup for the fuzz test: date vocabulary, near misses and filler
+_FUZZ_WORDS = [
+    "hoje", "amanhã", "amanha", "depois", "de", "dia", "daqui", "a", "em", "dentro", "semana", "semanas",
+    "que", "vem", "próxima", "na", "no", "para", "pra", "até", "o", "segunda", "terça", "quarta", "sexta",
+    "sábado", "domingo", "-feira", "feira", "tarefa", "tarefas", "janeiro", "fevereiro", "março", "dezembro",
+    "dois", "três", "vinte", "trinta", "0", "1", "12", "29", "30", "31", "32", "99", "999", "/", "//",
+    "00/00", "31/02", "29/02/2027", "12/13", "1/1/1", "comprar", "pão", "prazo", "com", "ç", "", "  ",
+]
+
+def test_fuzz_never_raises_and_span_is_inside_input():
+    rng = random.Random(20250115)
+    for _ in range(3000):
+        words = [rng.choice(_FUZZ_WORDS) for _ in range(rng.randint(0, 12))]
+        text = rng.choice([" ", "", "  "]).join(words)
+        today = TODAY + timedelta(days=rng.randint(-400, 400))
+        match = parse_date(text, today=today)
+        if match is None:
+            continue
+        assert 0 <= match.start < match.end <= len(text)
+        assert text[match.start:match.end] == match.text
+        assert isinstance(match.date, date)
+        assert isinstance(strip_date(text, match), str)
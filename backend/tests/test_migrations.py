@@ -0,0 +1,56 @@
+import os
+import pytest
+from flask_migrate import downgrade, upgrade
+from sqlalchemy import text
+from app import create_app
+from app.config import DevelopmentConfig, config
+from app.extensions import db
+from app.models.task import Task
+from app.models.user import User
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations')
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    class MigrationTestConfig(DevelopmentConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'ocastro.db'}"
+        SQLALCHEMY_BINDS = {}
+        RATE_LIMIT_ENABLED = False
+        ARCHIVE_INTERVAL = 0
+
+    monkeypatch.setitem(config, 'migration_test', MigrationTestConfig)
+    app = create_app('migration_test')
+    with app.app_context():
+        upgrade(directory=MIGRATIONS_DIR)
+        yield app
+        db.session.remove()
+
+def _add_task(title):
+    if db.session.get(User, 1) is None:
+        db.session.add(User(id=1, name="Ana", email="ana@example.com", password_hash="x"))
+    task = Task(user_id=1, title=title)
+    db.session.add(task)
+    db.session.commit()
+    return task
+
+def _search(app, query):
+    response = app.test_client().get(f"/api/tasks/search?q={query}")
+    assert response.status_code == 200
+    return [task["title"] for task in response.get_json()]
+
+def test_full_chain_keeps_search_triggers(app):
+    triggers = {row[0] for row in db.session.execute(text("SELECT name FROM sqlite_master WHERE type = 'trigger'"))}
+    assert {'tasks_fts_ai', 'tasks_fts_ad', 'tasks_fts_au'} <= triggers
+
+    task = _add_task("Reunião com equipe")
+    assert _search(app, "reun") == ["Reunião com equipe"]
+
+    task.title = "Planejamento trimestral"
+    db.session.commit()
+    assert _search(app, "reun") == []
+    assert _search(app, "planej") == ["Planejamento trimestral"]
+
+def test_downgrade_keeps_search_triggers(app):
+    downgrade(directory=MIGRATIONS_DIR, revision='f3b8d1e6a2c7')
+    _add_task("Reunião com equipe")
+    assert _search(app, "reun") == ["Reunião com equipe"]
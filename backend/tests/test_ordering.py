@@ -0,0 +1,57 @@
+import random
+import pytest
+from app.utils.ordering import key_between, spread_keys
+
+def test_first_key():
+    assert key_between(None, None) == 'i0'
+
+def test_appends_grow_logarithmically():
+    key = key_between(None, None)
+    keys = [key]
+    for _ in range(10000):
+        key = key_between(key, None)
+        keys.append(key)
+    assert keys == sorted(keys)
+    assert len(keys[-1]) == 4
+
+def test_prepends_stay_ordered():
+    key = key_between(None, None)
+    keys = [key]
+    for _ in range(2000):
+        key = key_between(None, key)
+        keys.append(key)
+    assert keys == sorted(keys, reverse=True)
+    assert len(set(keys)) == len(keys)
+    assert len(keys[-1]) <= 4
+
+def test_between_consecutive_integers_uses_a_fraction():
+    key = key_between('i3', 'i4')
+    assert 'i3' < key < 'i4'
+    assert key == 'i3i'
+
+def test_random_inserts_stay_ordered():
+    rng = random.Random(7)
+    keys = [key_between(None, None)]
+    for _ in range(2000):
+        i = rng.randint(0, len(keys))
+        a = keys[i - 1] if i > 0 else None
+        b = keys[i] if i < len(keys) else None
+        key = key_between(a, b)
+        assert (a is None or a < key) and (b is None or key < b)
+        keys.insert(i, key)
+    assert keys == sorted(keys)
+
+@pytest.mark.parametrize('count', [0, 1, 5, 8, 36, 500])
+def test_spread_keys_are_ordered_and_leave_room(count):
+    keys = spread_keys(count)
+    assert len(keys) == count
+    assert keys == sorted(keys)
+    assert len({len(key) for key in keys}) <= 1
+    for a, b in zip(keys, keys[1:]):
+        # An insert between neighbours needs no fraction
+        assert len(key_between(a, b)) == len(a)
+
+@pytest.mark.parametrize('a, b', [('i5', 'i5'), ('i6', 'i5'), ('i', None), ('i10', None), ('i1i0', None), ('I0', None)])
+def test_rejects_bad_keys(a, b):
+    with pytest.raises(ValueError):
+        key_between(a, b)
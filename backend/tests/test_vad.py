@@ -0,0 +1,45 @@
+import math
+from array import array
+from app.utils.vad import find_speech_bounds
+
+RATE = 16000
+
+def _pcm(segments):
+    """16-bit mono PCM from (duration_ms, amplitude, modulation_hz) segments of a 220 Hz tone."""
+    samples = array('h')
+    for duration_ms, amplitude, modulation_hz in segments:
+        for n in range(RATE * duration_ms // 1000):
+            t = n / RATE
+            envelope = 1.0
+            if modulation_hz:
+                envelope = 0.6 + 0.4 * math.sin(2 * math.pi * modulation_hz * t)
+            samples.append(int(amplitude * envelope * math.sin(2 * math.pi * 220 * t)))
+    return samples.tobytes()
+
+def test_silence_only_returns_none():
+    assert find_speech_bounds(_pcm([(1000, 0, 0)]), RATE) is None
+
+def test_speech_between_silences_is_trimmed():
+    bounds = find_speech_bounds(_pcm([(500, 0, 0), (1000, 8000, 0), (500, 0, 0)]), RATE, padding_ms=0)
+    assert bounds is not None
+    assert 450 <= bounds.start_ms <= 540
+    assert 1470 <= bounds.end_ms <= 1560
+
+def test_clip_without_silence_is_kept():
+    # No quiet stretch: the noise floor is the signal itself
+    pcm = _pcm([(2000, 8000, 0)])
+    assert find_speech_bounds(pcm, RATE) == (0, 2000)
+
+def test_modulated_signal_without_pauses_is_kept():
+    pcm = _pcm([(2000, 8000, 3)])
+    bounds = find_speech_bounds(pcm, RATE)
+    assert bounds is not None
+    assert bounds.start_ms == 0 and bounds.end_ms == 2000
+
+def test_quiet_hum_does_not_count_as_speech():
+    # A steady hum below min_rms sets the floor; speech has to clear noise_ratio times it
+    pcm = _pcm([(500, 250, 0), (1000, 8000, 0), (500, 250, 0)])
+    bounds = find_speech_bounds(pcm, RATE, padding_ms=0)
+    assert bounds is not None
+    assert 450 <= bounds.start_ms <= 540
+    assert 1470 <= bounds.end_ms <= 1560